@@ -0,0 +1,188 @@
+#apps\core\admission.py
+
+"""
+Объединение одинаковых вызовов и ограничение нагрузки на БД.
+
+single-flight: одновременные вызовы одной SQL-функции с одинаковыми
+параметрами выполняются один раз. Первый вызов берет блокировку в кэше
+(cache.add), остальные ждут его результат в кэше. При общем кэше (Redis)
+это работает между всеми процессами.
+
+Ограничение параллельности: не больше N одновременных выполнений
+одной функции (settings.REPORT_CONCURRENCY_LIMITS). Лишние вызовы ждут
+свободного слота до REPORT_QUEUE_WAIT секунд, затем получают ReportBusy
+("сервер занят, повторите").
+
+Блокировка и слоты хранят токен владельца: снимает ключ только тот, кто
+его занял (на Redis - атомарно скриптом), а пока execute() работает,
+фоновый поток продлевает ключи каждые REPORT_LOCK_TIMEOUT / 3 секунд.
+Так долгий отчет не теряет блокировку, а ключи упавшего процесса
+освобождаются сами через REPORT_LOCK_TIMEOUT.
+"""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.db_utils import get_data_version
+
+POLL_INTERVAL = 0.1
+
+# Снять / продлить ключ, только если в нем наш токен (Redis)
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class ReportBusy(Exception):
+    """Превышен лимит одновременных выполнений - запрос нужно повторить позже"""
+
+    def __init__(self, func_name):
+        super().__init__(f'Сервер занят выполнением {func_name}, повторите запрос')
+        self.func_name = func_name
+        self.retry_after = settings.REPORT_RETRY_AFTER
+
+
+def _flight_key(func_name, params, limit):
+    raw = json.dumps([func_name, params, limit, get_data_version()],
+                     sort_keys=True, default=str)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def _concurrency_limit(func_name):
+    limits = settings.REPORT_CONCURRENCY_LIMITS
+    return limits.get(func_name, limits.get('default'))
+
+
+def _redis_call(script, key, token, *args):
+    """
+    Выполняет скрипт сравнения токена на Redis.
+    Возвращает None, если кэш не Redis.
+    """
+    client_wrapper = getattr(cache, '_cache', None)
+    if client_wrapper is None or not hasattr(client_wrapper, 'get_client'):
+        return None
+    full_key = cache.make_and_validate_key(key)
+    client = client_wrapper.get_client(full_key, write=True)
+    value = client_wrapper._serializer.dumps(token)
+    return client.eval(script, 1, full_key, value, *args)
+
+
+def _release(key, token):
+    """Снимает ключ, только если он все еще принадлежит token"""
+    if _redis_call(_RELEASE_SCRIPT, key, token) is not None:
+        return
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def _renew(key, token):
+    """Продлевает ключ на REPORT_LOCK_TIMEOUT, если он принадлежит token"""
+    timeout = settings.REPORT_LOCK_TIMEOUT
+    if _redis_call(_RENEW_SCRIPT, key, token, timeout) is not None:
+        return
+    if cache.get(key) == token:
+        cache.touch(key, timeout)
+
+
+class _KeyRenewer:
+    """Фоновый поток, продлевающий занятые ключи, пока идет выполнение"""
+
+    def __init__(self, keys):
+        self.keys = keys  # [(key, token)]
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        interval = max(settings.REPORT_LOCK_TIMEOUT / 3, POLL_INTERVAL)
+        while not self.stopped.wait(interval):
+            for key, token in self.keys:
+                try:
+                    _renew(key, token)
+                except Exception as e:
+                    print(f"Ошибка продления блокировки {key}: {e}")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+
+def _acquire_slot(func_name, deadline, token):
+    """
+    Занимает один из слотов функции (ключи с таймаутом - слот упавшего
+    процесса освободится сам). Возвращает ключ слота или None по истечении deadline.
+    """
+    limit = _concurrency_limit(func_name)
+    if not limit:
+        return ''
+
+    while True:
+        for slot in range(limit):
+            slot_key = f'report_slot_{func_name}_{slot}'
+            if cache.add(slot_key, token, settings.REPORT_LOCK_TIMEOUT):
+                return slot_key
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(POLL_INTERVAL)
+
+
+def run_coalesced(func_name, params, limit, execute):
+    """
+    Выполняет execute() как единственный вызов (func_name, params, limit)
+    среди одновременных. Возвращает результат execute() или результат
+    уже выполняющегося такого же вызова. ReportBusy - если нет свободного слота.
+    """
+    key = _flight_key(func_name, params, limit)
+    lock_key = f'report_flight_lock_{key}'
+    result_key = f'report_flight_result_{key}'
+    deadline = time.monotonic() + settings.REPORT_QUEUE_WAIT
+    token = uuid.uuid4().hex
+
+    while True:
+        result = cache.get(result_key)
+        if result is not None:
+            return result
+
+        # Ведущий вызов: выполняет функцию и публикует результат
+        if cache.add(lock_key, token, settings.REPORT_LOCK_TIMEOUT):
+            try:
+                slot_key = _acquire_slot(func_name, deadline, token)
+                if slot_key is None:
+                    raise ReportBusy(func_name)
+                held = [(lock_key, token)]
+                if slot_key:
+                    held.append((slot_key, token))
+                try:
+                    with _KeyRenewer(held):
+                        result = execute()
+                finally:
+                    if slot_key:
+                        _release(slot_key, token)
+                cache.set(result_key, result, settings.REPORT_SHARED_RESULT_TIMEOUT)
+                return result
+            finally:
+                _release(lock_key, token)
+
+        # Такой же вызов уже выполняется - ждем его результат.
+        # Если ведущий завершился ошибкой, блокировка снимется и
+        # следующий ожидающий выполнит функцию сам.
+        if time.monotonic() >= deadline + settings.REPORT_LOCK_TIMEOUT:
+            raise ReportBusy(func_name)
+        time.sleep(POLL_INTERVAL)
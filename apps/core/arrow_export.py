@@ -0,0 +1,258 @@
+#apps\core\arrow_export.py
+
+"""
+Выгрузка результатов SQL-функций отчетов в колоночных форматах
+(Parquet, Arrow IPC) для BI-инструментов.
+Данные читаются серверным курсором порциями и записываются
+пакетами записей (RecordBatch) - весь результат в памяти не держится.
+Типы сохраняются: numeric -> decimal128, даты -> date32/timestamp.
+Масштаб numeric берется из описания колонки; у numeric без масштаба
+(обычно колонки результата функции) - по значениям первой порции,
+при нехватке точности decimal128 - decimal256. Значение, которое
+в масштаб не помещается, - ошибка выгрузки, а не округление.
+Первая порция готовится до начала ответа (stream_report): ошибка типов
+становится ответом с ошибкой, а не оборванным файлом.
+"""
+
+import itertools
+import json
+from decimal import Context, Decimal
+from django.db import connections
+
+from apps.core.replicas import get_read_alias
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+FORMATS = {
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.file', 'arrow'),
+}
+
+# OID типов PostgreSQL -> типы Arrow
+PG_TYPES = {
+    16: pa.bool_(),
+    20: pa.int64(),
+    21: pa.int16(),
+    23: pa.int32(),
+    700: pa.float32(),
+    701: pa.float64(),
+    25: pa.string(),
+    1042: pa.string(),
+    1043: pa.string(),
+    19: pa.string(),
+    1082: pa.date32(),
+    1083: pa.time64('us'),
+    1114: pa.timestamp('us'),
+    1184: pa.timestamp('us', tz='UTC'),
+}
+NUMERIC_OID = 1700
+JSON_OIDS = (114, 3802)
+DECIMAL_PRECISION = 38
+DECIMAL256_PRECISION = 76
+
+_decimal_context = Context(prec=DECIMAL256_PRECISION)
+
+
+def _decimal_digits(values):
+    """(целых знаков, знаков после запятой) - максимум по значениям колонки"""
+    integer_digits, scale = 0, 0
+    for value in values:
+        if isinstance(value, Decimal) and value.is_finite():
+            sign, digits, exponent = value.as_tuple()
+            scale = max(scale, -exponent)
+            integer_digits = max(integer_digits, len(digits) + exponent)
+    return integer_digits, scale
+
+
+def _decimal_type(values):
+    """Тип numeric без масштаба - по значениям первой порции"""
+    integer_digits, scale = _decimal_digits(values)
+    if integer_digits + scale <= DECIMAL_PRECISION:
+        return pa.decimal128(DECIMAL_PRECISION, scale)
+    return pa.decimal256(DECIMAL256_PRECISION, min(scale, DECIMAL256_PRECISION))
+
+
+def build_schema(description, rows=()):
+    """Схема Arrow по описанию колонок курсора (и первой порции строк)"""
+    fields = []
+    for index, column in enumerate(description):
+        name, type_code = column[0], column[1]
+        if type_code == NUMERIC_OID:
+            scale = column[5]
+            if scale is not None and 0 <= scale <= DECIMAL_PRECISION:
+                arrow_type = pa.decimal128(DECIMAL_PRECISION, scale)
+            else:
+                arrow_type = _decimal_type(row[index] for row in rows)
+        else:
+            arrow_type = PG_TYPES.get(type_code, pa.string())
+        fields.append(pa.field(name, arrow_type))
+    return pa.schema(fields)
+
+
+def _decimal_converter(field):
+    quantum = Decimal(1).scaleb(-field.type.scale)
+
+    def convert(value):
+        if not isinstance(value, Decimal):
+            return value
+        # quantize без потери знаков; если знаки теряются - ошибка, а не округление
+        result = value.quantize(quantum, context=_decimal_context) if value.is_finite() else value
+        if result != value:
+            raise ValueError(
+                f'Колонка {field.name}: значение {value} не помещается '
+                f'в decimal({field.type.precision}, {field.type.scale}): '
+                f'задайте в функции numeric(p, s) или round()'
+            )
+        return result
+    return convert
+
+
+def _column_converter(field, type_code):
+    """Приведение значений колонки к типу схемы (выбирается один раз на колонку)"""
+    if pa.types.is_decimal(field.type):
+        return _decimal_converter(field)
+    if type_code in JSON_OIDS:
+        return lambda v: json.dumps(v, ensure_ascii=False) if v is not None else None
+    if pa.types.is_string(field.type) and type_code not in PG_TYPES:
+        return lambda v: str(v) if v is not None else None
+    return None
+
+
+def _record_batch(schema, converters, rows):
+    arrays = []
+    for index, field in enumerate(schema):
+        values = [row[index] for row in rows]
+        if converters[index]:
+            values = [converters[index](v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _write_batches(func_name, params, output, fmt, batch_size):
+    """
+    Выполняет SQL-функцию отчета и записывает результат в output пакетами.
+    Генератор: после каждого записанного пакета возвращает число его строк.
+    """
+    params_json = json.dumps(params, ensure_ascii=False, default=str)
+
+    # Серверный курсор: строки приходят порциями по batch_size
+    # (чтение - на реплике, если она актуальна)
+    with connections[get_read_alias()].chunked_cursor() as cursor:
+        cursor.execute(f"SELECT * FROM {func_name}(%s)", [params_json])
+        rows = cursor.fetchmany(batch_size)
+        if not cursor.description:
+            return
+
+        schema = build_schema(cursor.description, rows)
+        converters = [
+            _column_converter(field, column[1])
+            for field, column in zip(schema, cursor.description)
+        ]
+
+        if fmt == 'parquet':
+            writer = pq.ParquetWriter(output, schema, compression='zstd')
+        else:
+            writer = pa.ipc.new_file(output, schema)
+
+        try:
+            while rows:
+                writer.write_batch(_record_batch(schema, converters, rows))
+                yield len(rows)
+                rows = cursor.fetchmany(batch_size)
+        finally:
+            writer.close()
+
+
+def write_report(func_name, params, sink, fmt='parquet', batch_size=50000):
+    """
+    Записывает результат отчета в sink (путь или файловый объект)
+    в формате parquet или arrow. Возвращает число выгруженных строк.
+    """
+    return sum(_write_batches(func_name, params, sink, fmt, batch_size))
+
+
+def _column_array(values):
+    """Колонка готового результата; разнотипные значения - строками"""
+    values = [json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+              for v in values]
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], pa.string())
+
+
+def write_rows(columns, rows, sink, fmt='parquet'):
+    """
+    Записывает готовый результат (колонки и строки-кортежи) в sink,
+    например результат фонового задания. Типы определяются по значениям.
+    """
+    values = list(zip(*rows)) if rows else [[] for _ in columns]
+    table = pa.Table.from_arrays([_column_array(column) for column in values],
+                                 names=list(columns))
+    if fmt == 'parquet':
+        pq.write_table(table, sink, compression='zstd')
+    else:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return len(rows)
+
+
+class ChunkSink:
+    """Файловый объект только для записи: накопленные байты забираются через take()"""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _stream_chunks(func_name, params, fmt, batch_size):
+    sink = ChunkSink()
+    output = pa.PythonFile(sink, mode='w')
+
+    # После каждой записанной порции отдаем накопленные байты
+    for _ in _write_batches(func_name, params, output, fmt, batch_size):
+        yield sink.take()
+    yield sink.take()
+
+
+def stream_report(func_name, params, fmt='parquet', batch_size=50000):
+    """
+    Байты файла выгрузки (итератор для StreamingHttpResponse).
+    Запрос, схема и первая порция выполняются сразу: ошибка (в том числе
+    значение, не помещающееся в тип) - исключение до отправки ответа.
+    """
+    chunks = _stream_chunks(func_name, params, fmt, batch_size)
+    try:
+        first = next(chunks)
+    except Exception:
+        chunks.close()
+        raise
+    return itertools.chain([first], chunks)
@@ -0,0 +1,142 @@
+#apps\core\autocomplete.py
+
+"""
+Поиск по вариантам значений фильтров (врачи, услуги и т.п.) для автодополнения.
+
+Индекс строится в памяти процесса из filter_types.sql_query и
+перестраивается при смене версии данных (даты импорта из МИС):
+- префиксный: отсортированный список слов вариантов, поиск через bisect;
+- триграммный: для опечаток и поиска по середине слова.
+Ранжирование: точное совпадение, начало названия, начала слов, затем
+похожесть по триграммам.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from itertools import chain
+
+from apps.core.db_utils import get_data_version
+
+TRIGRAM_MIN_SIMILARITY = 0.5  # доля триграмм запроса, найденных в варианте
+
+# filter_code -> (версия данных, OptionIndex)
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def normalize(text):
+    return ' '.join(str(text).lower().replace('ё', 'е').split())
+
+
+def trigrams(text):
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class OptionIndex:
+    """Индекс вариантов [{'value': ..., 'text': ...}, ...]"""
+
+    def __init__(self, options):
+        # Короткие названия выше: порядок вариантов задан заранее
+        options = [o for o in options if o['text']]
+        self.texts = [normalize(o['text']) for o in options]
+        order = sorted(range(len(options)), key=lambda i: (len(self.texts[i]), self.texts[i]))
+        self.options = [options[i] for i in order]
+        self.texts = [self.texts[i] for i in order]
+        self.by_value = {str(o['value']): o for o in self.options}
+
+        # Названия целиком и отдельные слова - для поиска по началу через bisect
+        self.text_keys, self.text_ids = self._sorted_keys(
+            (text, index) for index, text in enumerate(self.texts)
+        )
+        self.word_keys, self.word_ids = self._sorted_keys(
+            (word, index)
+            for index, text in enumerate(self.texts)
+            for word in set(text.split())
+        )
+
+        self.trigram_ids = defaultdict(list)
+        for index, text in enumerate(self.texts):
+            for trigram in trigrams(text):
+                self.trigram_ids[trigram].append(index)
+
+    @staticmethod
+    def _sorted_keys(pairs):
+        pairs = sorted(pairs)
+        return [key for key, index in pairs], [index for key, index in pairs]
+
+    def __len__(self):
+        return len(self.options)
+
+    @staticmethod
+    def _prefix_range(keys, prefix):
+        return bisect_left(keys, prefix), bisect_left(keys, prefix + '\uffff')
+
+    def _similar_ids(self, query, limit):
+        """
+        Похожие по триграммам (опечатки, середина слова): лучшие limit индексов
+        по доле триграмм запроса, найденных в варианте.
+        """
+        query_trigrams = trigrams(query)
+        shared = Counter(chain.from_iterable(
+            self.trigram_ids.get(trigram, ()) for trigram in query_trigrams
+        ))
+        min_shared = len(query_trigrams) * TRIGRAM_MIN_SIMILARITY
+        best = heapq.nsmallest(
+            limit,
+            ((-count, index) for index, count in shared.items() if count >= min_shared)
+        )
+        return [index for _, index in best]
+
+    def search(self, query, limit=20):
+        """Варианты, подходящие под query, лучшие первыми"""
+        query = normalize(query)
+        if not query:
+            return self.options[:limit]
+
+        # Название начинается с запроса (точное совпадение - самое короткое, первым)
+        lo, hi = self._prefix_range(self.text_keys, query)
+        found = sorted(self.text_ids[lo:hi])[:limit]
+
+        # Все слова запроса - начала слов варианта
+        if len(found) < limit:
+            candidates = None
+            for term in query.split():
+                lo, hi = self._prefix_range(self.word_keys, term)
+                ids = set(self.word_ids[lo:hi])
+                candidates = ids if candidates is None else candidates & ids
+            candidates.difference_update(found)
+            found += heapq.nsmallest(limit - len(found), candidates)
+
+        # Мало совпадений по началу слов - добавляем похожие
+        if len(found) < limit:
+            seen = set(found)
+            for index in self._similar_ids(query, limit):
+                if index not in seen:
+                    found.append(index)
+                    if len(found) == limit:
+                        break
+
+        return [self.options[index] for index in found]
+
+    def get(self, value):
+        """Вариант по значению (для подписи уже выбранного значения)"""
+        return self.by_value.get(str(value))
+
+
+def get_index(filter_code, load_options):
+    """
+    Индекс вариантов фильтра для текущей версии данных.
+    load_options() вызывается, только если индекса еще нет или данные обновились.
+    """
+    version = get_data_version()
+    cached = _indexes.get(filter_code)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    index = OptionIndex(load_options())
+    with _indexes_lock:
+        _indexes[filter_code] = (version, index)
+    return index
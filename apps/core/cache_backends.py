@@ -0,0 +1,221 @@
+#apps\core\cache_backends.py
+
+"""
+Бэкенды кэша с компактной сериализацией и учетом объема в байтах.
+
+CompressedSerializer - pickle + zlib для больших значений (> COMPRESS_MIN_BYTES).
+CompressedLRUCache - кэш в памяти процесса с бюджетом в байтах (MAX_BYTES)
+    и вытеснением давно не использованных значений (LRU).
+CompressedRedisCache - общий для всех процессов кэш в Redis с тем же
+    сжатием; бюджет и вытеснение задаются в Redis (maxmemory,
+    maxmemory-policy allkeys-lru).
+
+Оба бэкенда умеют отдавать статистику (get_stats) для страницы
+администрирования.
+"""
+
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache, RedisSerializer
+
+COMPRESSED_MARKER = b'Z'
+
+# Экземпляр бэкенда создается в каждом потоке - данные храним
+# на уровне модуля по LOCATION, как LocMemCache
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class CompressedSerializer(RedisSerializer):
+    """pickle, а для значений больше COMPRESS_MIN_BYTES - еще и zlib"""
+    COMPRESS_MIN_BYTES = 1024
+    COMPRESS_LEVEL = 3
+
+    def dumps(self, obj):
+        # Целые числа не сериализуются (атомарные incr/decr в Redis)
+        if type(obj) is int:
+            return obj
+        data = pickle.dumps(obj, self.protocol)
+        if len(data) > self.COMPRESS_MIN_BYTES:
+            data = COMPRESSED_MARKER + zlib.compress(data, self.COMPRESS_LEVEL)
+        return data
+
+    def loads(self, data):
+        if isinstance(data, int):
+            return data
+        if data[:1] == COMPRESSED_MARKER:
+            return pickle.loads(zlib.decompress(data[1:]))
+        return super().loads(data)
+
+
+class _LRUStore:
+    """Общие для всех потоков процесса данные CompressedLRUCache"""
+
+    def __init__(self):
+        self.data = OrderedDict()  # key -> (expire_at, value)
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0}
+
+
+class CompressedLRUCache(BaseCache):
+    """
+    Кэш в памяти процесса с ограничением по объему.
+    OPTIONS:
+        MAX_BYTES - бюджет в байтах (по умолчанию 64 МБ)
+    """
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._max_bytes = int(options.get('MAX_BYTES', 64 * 1024 * 1024))
+        self._serializer = CompressedSerializer()
+        with _stores_lock:
+            self._shared = _stores.setdefault(name, _LRUStore())
+        self._data = self._shared.data
+        self._lock = self._shared.lock
+        self._stats = self._shared.stats
+
+    @staticmethod
+    def _size(value):
+        return len(value) if isinstance(value, bytes) else 8
+
+    def _is_expired(self, key):
+        expire_at = self._data[key][0]
+        return expire_at is not None and expire_at <= time.time()
+
+    def _delete(self, key):
+        expire_at, value = self._data.pop(key)
+        self._shared.bytes -= self._size(value)
+
+    def _store(self, key, value, timeout):
+        if key in self._data:
+            self._delete(key)
+        size = self._size(value)
+        if size > self._max_bytes:
+            return False
+
+        expire_at = self.get_backend_timeout(timeout)
+        self._data[key] = (expire_at, value)
+        self._shared.bytes += size
+        self._stats['sets'] += 1
+
+        # Вытесняем давно не использованные значения, пока не уложимся в бюджет
+        while self._shared.bytes > self._max_bytes:
+            oldest = next(iter(self._data))
+            self._delete(oldest)
+            self._stats['evictions'] += 1
+        return True
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = self._serializer.dumps(value)
+        with self._lock:
+            if key in self._data and not self._is_expired(key):
+                return False
+            return self._store(key, value, timeout)
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if key not in self._data or self._is_expired(key):
+                if key in self._data:
+                    self._delete(key)
+                self._stats['misses'] += 1
+                return default
+            self._data.move_to_end(key)
+            self._stats['hits'] += 1
+            value = self._data[key][1]
+        return self._serializer.loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        value = self._serializer.dumps(value)
+        with self._lock:
+            self._store(key, value, timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if key not in self._data or self._is_expired(key):
+                return False
+            self._data[key] = (self.get_backend_timeout(timeout), self._data[key][1])
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if key not in self._data or self._is_expired(key):
+                raise ValueError(f"Key '{key}' not found")
+            expire_at, value = self._data[key]
+            new_value = self._serializer.loads(value) + delta
+            self._delete(key)
+            self._data[key] = (expire_at, self._serializer.dumps(new_value))
+            self._shared.bytes += self._size(self._data[key][1])
+        return new_value
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            return key in self._data and not self._is_expired(key)
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        with self._lock:
+            if key not in self._data:
+                return False
+            self._delete(key)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._shared.bytes = 0
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(
+                backend='Память процесса (LRU)',
+                entries=len(self._data),
+                bytes_used=self._shared.bytes,
+                max_bytes=self._max_bytes,
+            )
+        requests = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(100 * stats['hits'] / requests, 1) if requests else None
+        return stats
+
+
+class CompressedRedisCache(RedisCache):
+    """Redis со сжатием больших значений и статистикой из INFO"""
+
+    def __init__(self, server, params):
+        params = dict(params)
+        params['OPTIONS'] = {
+            'serializer': CompressedSerializer,
+            **params.get('OPTIONS', {}),
+        }
+        super().__init__(server, params)
+
+    def get_stats(self):
+        client = self._cache.get_client()
+        info = client.info()
+        hits = info.get('keyspace_hits', 0)
+        misses = info.get('keyspace_misses', 0)
+        requests = hits + misses
+        return {
+            'backend': 'Redis (общий для всех процессов)',
+            'hits': hits,
+            'misses': misses,
+            'sets': None,
+            'evictions': info.get('evicted_keys', 0),
+            'entries': client.dbsize(),
+            'bytes_used': info.get('used_memory', 0),
+            'max_bytes': info.get('maxmemory', 0) or None,
+            'hit_rate': round(100 * hits / requests, 1) if requests else None,
+        }
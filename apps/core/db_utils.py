@@ -4,7 +4,8 @@
 Утилиты для работы с БД, которые можно использовать ПОСЛЕ инициализации Django
 """
 
-from django.db import connection
+from datetime import datetime
+from django.db import connection, connections, transaction
 from django.utils import timezone
 from django.core.cache import cache
 
@@ -35,6 +36,56 @@ def get_month_name(month_number):
         # Если что-то пошло не так, возвращаем просто номер
         return f"Месяц {month_number}"
 
+def _as_datetime(value):
+    """date / datetime без зоны -> datetime с зоной (для сравнения дат импорта)"""
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def read_import_date(using='default'):
+    """
+    Дата последнего импорта без кэша: окончание последней успешной синхронизации
+    sync_mis, загрузившей строки (sync_syncrun), или solution_med.import_date(),
+    если она позже (импорт другими средствами). Запуски без новых строк
+    (sync_mis --loop) версию не меняют. Возвращает (дата или None, версия данных).
+    using - алиас БД (реплика проверяется так же, как основная).
+    """
+    dates = []
+    with connections[using].cursor() as cursor:
+        for query in (
+            "SELECT max(finished_at) FROM sync_syncrun WHERE status = 'success' AND row_count > 0",
+            "SELECT solution_med.import_date()",
+        ):
+            try:
+                with transaction.atomic(using=using):
+                    cursor.execute(query)
+                    row = cursor.fetchone()
+                if row and row[0]:
+                    dates.append(_as_datetime(row[0]))
+            except Exception as e:
+                print(f"Ошибка при получении версии данных: {e}")
+    import_date = max(dates) if dates else None
+    version = str(import_date).replace(' ', '_') if import_date else 'none'
+    return import_date, version
+
+
+def get_data_version():
+    """
+    Версия данных - дата последнего импорта из МИС (read_import_date).
+    Используется в ключах кэша: после синхронизации ключи меняются сами.
+    Результат кэшируется на минуту, чтобы не обращаться к БД на каждый запрос.
+    """
+    version = cache.get('data_version')
+    if version is None:
+        _, version = read_import_date()
+        cache.set('data_version', version, 60)
+    return version
+
 def get_all_active_rules():
     """
     Получает все активные правила из таблицы performance_grades
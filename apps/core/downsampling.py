@@ -0,0 +1,101 @@
+#apps\core\downsampling.py
+
+"""
+Прореживание рядов для графиков виджетов.
+Настраивается в sql_params виджета ключом "_downsample", например:
+    {"_downsample": {"method": "lttb", "points": 200}}
+Методы: lttb (Largest-Triangle-Three-Buckets, сохраняет форму ряда)
+и агрегация по корзинам: avg, min, max, sum.
+"""
+
+BUCKET_FUNCTIONS = {
+    'avg': lambda values: sum(values) / len(values),
+    'min': min,
+    'max': max,
+    'sum': sum,
+}
+
+
+def lttb_indices(values, threshold):
+    """
+    Индексы точек, отобранных алгоритмом LTTB.
+    По оси X используется порядковый номер точки (подписи могут быть текстом).
+    """
+    count = len(values)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    indices = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    selected = 0
+
+    for bucket in range(threshold - 2):
+        # Среднее следующей корзины - третья вершина треугольника
+        next_start = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / (next_end - next_start)
+
+        # Точка текущей корзины с наибольшей площадью треугольника
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        point_x, point_y = selected, values[selected]
+        best_area = -1
+        for index in range(start, end):
+            area = abs(
+                (point_x - avg_x) * (values[index] - point_y)
+                - (point_x - index) * (avg_y - point_y)
+            )
+            if area > best_area:
+                best_area = area
+                selected_in_bucket = index
+
+        indices.append(selected_in_bucket)
+        selected = selected_in_bucket
+
+    indices.append(count - 1)
+    return indices
+
+
+def bucket_aggregate(labels, values, threshold, method):
+    """Агрегация по threshold корзинам: подпись - первая подпись корзины"""
+    count = len(values)
+    if threshold >= count or threshold < 1:
+        return labels, values
+
+    aggregate = BUCKET_FUNCTIONS[method]
+    bucket_size = count / threshold
+    new_labels, new_values = [], []
+    for bucket in range(threshold):
+        start = int(bucket * bucket_size)
+        end = int((bucket + 1) * bucket_size)
+        new_labels.append(labels[start])
+        new_values.append(aggregate(values[start:end]))
+    return new_labels, new_values
+
+
+def downsample_series(labels, values, config):
+    """
+    Прореживает ряд (labels, values) по настройке виджета
+    {"method": ..., "points": ...}. Без настройки ряд возвращается как есть.
+    """
+    if not config:
+        return labels, values
+
+    method = config.get('method', 'lttb')
+    try:
+        points = int(config.get('points', 200))
+    except (ValueError, TypeError):
+        points = 200
+
+    if len(values) <= points:
+        return labels, values
+
+    if method == 'lttb':
+        indices = lttb_indices(values, points)
+        return [labels[i] for i in indices], [values[i] for i in indices]
+    if method in BUCKET_FUNCTIONS:
+        return bucket_aggregate(labels, values, points, method)
+
+    print(f"Неизвестный метод прореживания: {method}")
+    return labels, values
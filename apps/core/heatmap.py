@@ -0,0 +1,114 @@
+#apps\core\heatmap.py
+
+"""
+Тепловая карта виджета (widget_type = 'heatmap'), например врач × месяц.
+Настраивается в sql_params виджета:
+    {"_row_field": "doctor", "_value_field": "percent"}
+По умолчанию строки - x_field, значения - y_field. Если функция сама
+возвращает данные за год, колонку периода задает "_column_field";
+иначе функция считается месячной и вызывается за 12 месяцев года
+одним запросом (колонка p_month).
+
+Длинная таблица разворачивается в плотную матрицу средствами Arrow:
+строки и колонки кодируются индексами, ячейка матрицы находится по
+позиции row * число колонок + column. Цвет ячейки - номер диапазона
+из kpi.performance_grades (палитра передается один раз).
+"""
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+MONTH_FIELD = 'p_month'
+
+
+def heatmap_fields(widget, options):
+    """(поле строк, поле колонок или None для помесячного вызова, поле значений)"""
+    return (
+        options.get('_row_field') or widget['x_field'],
+        options.get('_column_field'),
+        options.get('_value_field') or widget['y_field'],
+    )
+
+
+def pivot_matrix(columns, rows, row_field, column_field, value_field, column_keys=None):
+    """
+    Длинная таблица -> (метки строк, ключи колонок, значения матрицы построчно).
+    Повторы (строка, колонка) усредняются, отсутствующие ячейки - None.
+    column_keys - фиксированный набор колонок (например, месяцы 1..12).
+    """
+    if not rows:
+        return [], list(column_keys or []), pa.array([], pa.float64())
+
+    data = list(zip(*rows))
+    table = pa.table({
+        'row': pc.cast(pa.array(data[columns.index(row_field)]), pa.string()),
+        'column': pa.array(data[columns.index(column_field)]),
+        'value': pc.cast(pa.array(data[columns.index(value_field)]), pa.float64()),
+    })
+    if column_keys is None:
+        column_keys = pc.unique(table['column'])
+        column_keys = pc.take(column_keys, pc.array_sort_indices(column_keys))
+    else:
+        column_keys = pa.array(column_keys, type=table['column'].type)
+        table = table.filter(pc.is_in(table['column'], value_set=column_keys))
+
+    table = table.group_by(['row', 'column']).aggregate([('value', 'mean')])
+    row_keys = pc.unique(table['row'])
+    row_keys = pc.take(row_keys, pc.array_sort_indices(row_keys))
+
+    row_index = pc.index_in(table['row'], value_set=row_keys)
+    column_index = pc.index_in(table['column'], value_set=column_keys)
+    positions = pc.add(
+        pc.multiply(pc.cast(row_index, pa.int64()), len(column_keys)),
+        pc.cast(column_index, pa.int64()),
+    )
+
+    # Для каждой ячейки - строка сгруппированной таблицы (или null)
+    cells = pa.array(range(len(row_keys) * len(column_keys)), pa.int64())
+    values = pc.take(table['value_mean'], pc.index_in(cells, value_set=positions))
+
+    return row_keys.to_pylist(), column_keys.to_pylist(), values
+
+
+def grade_indices(values, rules):
+    """
+    Номер диапазона оценки (kpi.performance_grades) для каждого значения.
+    Как get_color_for_percentage: первое подходящее правило по порядку.
+    """
+    grades = pa.nulls(len(values), pa.int32())
+    for index in reversed(range(len(rules))):
+        rule = rules[index]
+        matched = pc.greater_equal(values, rule['min_percent'])
+        if rule['max_percent'] is not None:
+            matched = pc.and_(matched, pc.less_equal(values, rule['max_percent']))
+        grades = pc.if_else(pc.fill_null(matched, False), index, grades)
+    return grades
+
+
+def heatmap_payload(columns, rows, row_field, column_field, value_field,
+                    column_keys=None, column_labels=None, rules=(), row_limit=None):
+    """Компактные данные тепловой карты для виджета"""
+    row_labels, column_keys, values = pivot_matrix(
+        columns, rows, row_field, column_field, value_field, column_keys
+    )
+    width = len(column_keys)
+    if row_limit:
+        row_labels = row_labels[:row_limit]
+        values = values.slice(0, len(row_labels) * width)
+
+    flat_values = pc.round(values, 1).to_pylist()
+    flat_grades = grade_indices(values, list(rules)).to_pylist()
+
+    def split(flat):
+        return [flat[i * width:(i + 1) * width] for i in range(len(row_labels))]
+
+    return {
+        'row_labels': row_labels,
+        'column_labels': [
+            (column_labels or {}).get(key, '—' if key is None else str(key))
+            for key in column_keys
+        ],
+        'matrix': split(flat_values),
+        'grades': split(flat_grades),
+        'palette': [rule['color'] for rule in rules],
+    }
@@ -0,0 +1,130 @@
+#apps\core\period_snapshots.py
+
+"""
+Результаты SQL-функций за замороженные (закрытые) месяцы.
+
+Месяц замораживается в админке (Закрытые периоды) или командой freeze_period:
+результаты всех отчетов и виджетов за месяц сохраняются в snapshots.PeriodSnapshot
+(pickle + zlib). После этого вызов функции с p_year/p_month замороженного месяца
+отдается из снимка, а вызов с другими фильтрами выполняется один раз
+и тоже сохраняется - данные закрытого месяца больше не меняются.
+"""
+
+import hashlib
+import json
+import pickle
+import zlib
+from django.apps import apps
+from django.core.cache import cache
+from django.db import IntegrityError
+
+FROZEN_CACHE_KEY = 'frozen_periods'
+FROZEN_CACHE_TIMEOUT = 60
+
+
+def _normalize(value):
+    # '2025' из адресной строки и 2025 из настроек виджета - один и тот же вызов
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return str(value)
+
+
+def params_key(params):
+    raw = json.dumps(_normalize(params), sort_keys=True, ensure_ascii=False)
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def call_period(params):
+    """(год, месяц) вызова или None"""
+    try:
+        return int(params['p_year']), int(params['p_month'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def frozen_periods():
+    """{(год, месяц): id замороженного периода}"""
+    periods = cache.get(FROZEN_CACHE_KEY)
+    if periods is None:
+        try:
+            FrozenPeriod = apps.get_model('snapshots', 'FrozenPeriod')
+            periods = {
+                (p['year'], p['month']): p['id']
+                for p in FrozenPeriod.objects.values('id', 'year', 'month')
+            }
+        except Exception as e:
+            print(f"Ошибка загрузки замороженных периодов: {e}")
+            periods = {}
+        cache.set(FROZEN_CACHE_KEY, periods, FROZEN_CACHE_TIMEOUT)
+    return periods
+
+
+def reset_frozen_periods():
+    cache.delete(FROZEN_CACHE_KEY)
+
+
+def pack(columns, rows):
+    return zlib.compress(pickle.dumps((columns, rows), pickle.HIGHEST_PROTOCOL))
+
+
+def unpack(data):
+    return pickle.loads(zlib.decompress(bytes(data)))
+
+
+def _frozen_period_id(params):
+    period = call_period(params)
+    return frozen_periods().get(period) if period else None
+
+
+def get_snapshot(func_name, params, limit=None):
+    """(columns, rows) из снимка или None, если месяц не заморожен или снимка нет"""
+    period_id = _frozen_period_id(params)
+    if not period_id:
+        return None
+    try:
+        PeriodSnapshot = apps.get_model('snapshots', 'PeriodSnapshot')
+        data = PeriodSnapshot.objects.filter(
+            period_id=period_id,
+            function_name=func_name,
+            params_key=params_key(params),
+            row_limit=limit or 0,
+        ).values_list('data', flat=True).first()
+    except Exception as e:
+        print(f"Ошибка чтения снимка {func_name}: {e}")
+        return None
+    return unpack(data) if data is not None else None
+
+
+def save_snapshot(period_id, func_name, params, limit, columns, rows, source=''):
+    """Сохраняет результат вызова (повторное сохранение того же вызова игнорируется)"""
+    PeriodSnapshot = apps.get_model('snapshots', 'PeriodSnapshot')
+    data = pack(columns, rows)
+    try:
+        PeriodSnapshot.objects.get_or_create(
+            period_id=period_id,
+            function_name=func_name,
+            params_key=params_key(params),
+            row_limit=limit or 0,
+            defaults={
+                'params': json.loads(json.dumps(params, default=str)),
+                'source': source,
+                'row_count': len(rows),
+                'size_bytes': len(data),
+                'data': data,
+            },
+        )
+    except IntegrityError:
+        pass
+
+
+def remember_result(func_name, params, limit, result):
+    """Результат живого вызова за замороженный месяц сохраняется как снимок"""
+    period_id = _frozen_period_id(params)
+    if not period_id:
+        return
+    try:
+        save_snapshot(period_id, func_name, params, limit, *result)
+    except Exception as e:
+        print(f"Ошибка сохранения снимка {func_name}: {e}")
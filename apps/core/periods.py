@@ -0,0 +1,226 @@
+#apps\core\periods.py
+
+"""
+Отчеты за диапазон месяцев (квартал, с начала года и т.п.).
+run_report - общая точка входа для страницы отчета и фоновых заданий.
+Диапазон разбивается на месяцы, результаты месяцев берутся из кэша
+(закрытые хранятся дольше и не зависят от версии данных), недостающие
+считаются параллельно, результаты объединяются с итогами и изменениями
+к предыдущему месяцу.
+В итогах суммируются только аддитивные показатели: доли и проценты
+пересчитываются из сумм (PERIOD_RATIO_COLUMNS) или остаются пустыми.
+"""
+
+import hashlib
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.db_utils import get_data_version
+from apps.core.period_snapshots import frozen_periods
+from apps.core.report_runner import execute_many, execute_report_function
+
+PERIOD_COLUMN = 'Период'
+DELTA_PREFIX = 'Δ '
+
+
+def parse_month(value):
+    """'2025-03' -> (2025, 3) или None"""
+    try:
+        year, month = (int(part) for part in str(value).split('-')[:2])
+    except (ValueError, TypeError):
+        return None
+    if not 1 <= month <= 12:
+        return None
+    return year, month
+
+
+def iter_months(start, end):
+    """Список (год, месяц) от start до end включительно"""
+    year, month = start
+    months = []
+    while (year, month) <= end:
+        months.append((year, month))
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return months
+
+
+def clip_range(start, end):
+    """
+    Диапазон не длиннее PERIOD_RANGE_MAX_MONTHS.
+    Возвращает (start, end, обрезан ли диапазон).
+    """
+    months = iter_months(start, end)
+    if len(months) <= settings.PERIOD_RANGE_MAX_MONTHS:
+        return start, end, False
+    return start, months[settings.PERIOD_RANGE_MAX_MONTHS - 1], True
+
+
+def is_past_month(year, month):
+    """Месяц уже закончился"""
+    today = date.today()
+    return (year, month) < (today.year, today.month)
+
+
+def is_closed_month(year, month):
+    """
+    Закрытый месяц - заморожен (Закрытые периоды) или закончился больше
+    PERIOD_CLOSE_GRACE_DAYS дней назад: до этого МИС еще вносит исправления.
+    """
+    if (year, month) in frozen_periods():
+        return True
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return date.today() >= next_month + timedelta(days=settings.PERIOD_CLOSE_GRACE_DAYS)
+
+
+def _month_cache_key(func_name, params, year, month):
+    # Открытый месяц (и период исправлений после него) - с версией данных.
+    # Закрытый - без нее, синхронизации его не пересчитывают; поправки
+    # в закрытом месяце вносятся заморозкой: в ключе id замороженного периода
+    if is_closed_month(year, month):
+        version = ['closed', frozen_periods().get((year, month))]
+    else:
+        version = get_data_version()
+    raw = json.dumps([func_name, params, year, month, version], sort_keys=True, default=str)
+    return 'period_month_' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _is_measure(column, value):
+    """Числовая колонка-показатель (идентификаторы не суммируются)"""
+    if isinstance(value, bool) or column.lower().endswith('id'):
+        return False
+    return isinstance(value, (int, float, Decimal))
+
+
+def _is_additive(column):
+    """Показатель можно суммировать за несколько месяцев (не доля, не процент, не среднее)"""
+    name = column.lower()
+    return column not in settings.PERIOD_RATIO_COLUMNS and not any(
+        marker in name for marker in settings.PERIOD_NON_ADDITIVE_MARKERS
+    )
+
+
+def _ratio_totals(columns, measures, total):
+    """Итоги долей из сумм числителя и знаменателя (PERIOD_RATIO_COLUMNS)"""
+    sums = {columns[i]: value for i, value in zip(measures, total)}
+    result = []
+    for i, value in zip(measures, total):
+        ratio = settings.PERIOD_RATIO_COLUMNS.get(columns[i])
+        if ratio:
+            numerator, denominator, factor = ratio
+            part, whole = sums.get(numerator), sums.get(denominator)
+            value = part * factor / whole if part is not None and whole else None
+        result.append(value)
+    return result
+
+
+def merge_period_results(months, results):
+    """
+    Объединяет помесячные результаты [(columns, rows), ...].
+    Возвращает словарь:
+        columns/rows - строки всех месяцев с колонкой периода и Δ показателей
+        totals_columns/totals - итоги за весь диапазон: суммы аддитивных
+        показателей, пересчитанные доли, пусто для остальных
+    """
+    columns = next((cols for cols, rows in results if cols), [])
+    all_rows = [row for cols, rows in results for row in rows]
+
+    measures = []
+    for index, column in enumerate(columns):
+        value = next((row[index] for row in all_rows if row[index] is not None), None)
+        if _is_measure(column, value):
+            measures.append(index)
+    keys = [index for index in range(len(columns)) if index not in measures]
+    additive = {index for index in measures if _is_additive(columns[index])}
+
+    merged_rows = []
+    previous = {}
+    totals = {}
+    for (year, month), (cols, rows) in zip(months, results):
+        for row in rows:
+            key = tuple(row[i] for i in keys)
+            prev_row = previous.get(key)
+            deltas = []
+            for i in measures:
+                if prev_row is None or row[i] is None or prev_row[i] is None:
+                    deltas.append(None)
+                else:
+                    deltas.append(row[i] - prev_row[i])
+            merged_rows.append((f'{year}-{month:02d}',) + tuple(row) + tuple(deltas))
+            previous[key] = row
+
+            total = totals.setdefault(key, [0 if i in additive else None for i in measures])
+            for position, i in enumerate(measures):
+                if i in additive and row[i] is not None:
+                    total[position] += row[i]
+
+    return {
+        'columns': [PERIOD_COLUMN] + columns + [DELTA_PREFIX + columns[i] for i in measures],
+        'rows': merged_rows,
+        'totals_columns': [columns[i] for i in keys] + [columns[i] for i in measures],
+        'totals': [
+            key + tuple(_ratio_totals(columns, measures, total))
+            for key, total in totals.items()
+        ],
+    }
+
+
+def uncached_months(func_name, params, start, end):
+    """Месяцы диапазона, которых нет в кэше (их придется считать)"""
+    months = iter_months(start, end)
+    return [
+        (year, month) for year, month in months
+        if not cache.has_key(_month_cache_key(func_name, params, year, month))
+    ]
+
+
+def run_period_range(func_name, params, start, end):
+    """
+    Выполняет SQL-функцию отчета за каждый месяц диапазона start..end
+    (p_year/p_month подставляются) и объединяет результаты.
+    Диапазон длиннее PERIOD_RANGE_MAX_MONTHS не выполняется (см. clip_range).
+    """
+    months = iter_months(start, end)
+    if len(months) > settings.PERIOD_RANGE_MAX_MONTHS:
+        raise ValueError(f'Диапазон больше {settings.PERIOD_RANGE_MAX_MONTHS} месяцев')
+
+    results = {}
+    missing = []
+    for year, month in months:
+        cached = cache.get(_month_cache_key(func_name, params, year, month))
+        if cached is not None:
+            results[(year, month)] = cached
+        else:
+            missing.append((year, month))
+
+    # Недостающие месяцы считаем параллельно
+    calls = [
+        (func_name, dict(params, p_year=year, p_month=month), None)
+        for year, month in missing
+    ]
+    for (year, month), outcome in zip(missing, execute_many(calls)):
+        if isinstance(outcome, Exception):
+            raise outcome
+        results[(year, month)] = outcome
+        timeout = settings.PERIOD_CACHE_TIMEOUT if is_closed_month(year, month) else 300
+        cache.set(_month_cache_key(func_name, params, year, month), outcome, timeout)
+
+    return merge_period_results(months, [results[m] for m in months])
+
+
+def run_report(report, filter_values, period_range=None):
+    """
+    Выполняет отчет за месяц или за диапазон месяцев.
+    Возвращает (columns, rows, totals_columns, totals).
+    """
+    if not period_range:
+        columns, rows = execute_report_function(report['func'], filter_values)
+        return columns, rows, [], []
+
+    params = {k: v for k, v in filter_values.items() if k not in ('p_year', 'p_month')}
+    result = run_period_range(report['func'], params, *period_range)
+    return result['columns'], result['rows'], result['totals_columns'], result['totals']
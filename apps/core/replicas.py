@@ -0,0 +1,93 @@
+#apps\core\replicas.py
+
+"""
+Чтение отчетов, виджетов и списков фильтров с реплик БД KPI.
+
+Реплики задаются в .env (REPLICA_DB_HOST, можно несколько через запятую)
+и попадают в DATABASES под именами replica_1, replica_2, ...
+Реплика используется, только если она доступна и не отстает:
+дата импорта (apps.core.db_utils.read_import_date) на ней совпадает с основной БД.
+Иначе запрос выполняется на основной БД.
+Запись (планы, пользователи, админка) всегда идет в основную БД.
+"""
+
+import itertools
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections, InterfaceError, OperationalError
+
+from apps.core.db_utils import read_import_date
+
+REPLICA_PREFIX = 'replica_'
+
+_rotation = itertools.count()
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias.startswith(REPLICA_PREFIX)]
+
+
+def _replica_import_date(alias):
+    """Дата импорта на реплике в формате get_data_version()"""
+    _, version = read_import_date(using=alias)
+    return version
+
+
+def _mark_replica(alias, is_fresh):
+    cache.set(f'replica_fresh_{alias}', is_fresh, settings.REPLICA_CHECK_INTERVAL)
+
+
+def reset_replica_checks():
+    """Сразу после синхронизации реплики проверяются заново"""
+    cache.delete_many([f'replica_fresh_{alias}' for alias in replica_aliases()])
+
+
+def is_replica_fresh(alias):
+    """Реплика доступна и содержит последнюю загрузку (проверка кэшируется)"""
+    is_fresh = cache.get(f'replica_fresh_{alias}')
+    if is_fresh is None:
+        try:
+            # Основная БД читается без кэша версии: после синхронизации
+            # отстающая реплика не должна пройти проверку
+            _, primary_version = read_import_date()
+            is_fresh = _replica_import_date(alias) == primary_version
+            if not is_fresh:
+                print(f"Реплика {alias} отстает от основной БД")
+        except Exception as e:
+            print(f"Реплика {alias} недоступна: {e}")
+            connections[alias].close()
+            is_fresh = False
+        _mark_replica(alias, is_fresh)
+    return is_fresh
+
+
+def get_read_alias():
+    """Имя БД для чтения: актуальная реплика (по очереди) или default"""
+    aliases = replica_aliases()
+    if not aliases:
+        return 'default'
+
+    start = next(_rotation) % len(aliases)
+    for alias in aliases[start:] + aliases[:start]:
+        if is_replica_fresh(alias):
+            return alias
+    return 'default'
+
+
+def run_read_query(query):
+    """
+    Выполняет query(conn) на подключении для чтения.
+    Если реплика отказала во время запроса, она исключается
+    до следующей проверки, а запрос повторяется на основной БД.
+    """
+    alias = get_read_alias()
+    if alias == 'default':
+        return query(connection)
+
+    try:
+        return query(connections[alias])
+    except (OperationalError, InterfaceError) as e:
+        print(f"Ошибка реплики {alias}, запрос выполнен на основной БД: {e}")
+        connections[alias].close()
+        _mark_replica(alias, False)
+        return query(connection)
@@ -0,0 +1,33 @@
+#apps\core\report_cost.py
+
+"""
+Оценка времени выполнения SQL-функций по прошлым вызовам.
+После каждого вызова в кэше сохраняется время для этого набора параметров
+и скользящее среднее по функции (для параметров, с которыми функция
+еще не вызывалась). По оценке долгие отчеты отправляются в фон (apps/jobs).
+"""
+
+from django.core.cache import cache
+
+from apps.core.period_snapshots import params_key
+
+COST_TIMEOUT = 7 * 24 * 3600
+AVERAGE_WEIGHT = 0.3  # вес последнего вызова в скользящем среднем
+
+
+def record_duration(func_name, params, duration_ms):
+    cache.set(f'report_cost_{func_name}_{params_key(params)}', duration_ms, COST_TIMEOUT)
+
+    average_key = f'report_cost_{func_name}'
+    average = cache.get(average_key)
+    if average is not None:
+        duration_ms = average + AVERAGE_WEIGHT * (duration_ms - average)
+    cache.set(average_key, duration_ms, COST_TIMEOUT)
+
+
+def estimate_ms(func_name, params):
+    """Ожидаемое время вызова в мс или None, если функция еще не вызывалась"""
+    duration_ms = cache.get(f'report_cost_{func_name}_{params_key(params)}')
+    if duration_ms is None:
+        duration_ms = cache.get(f'report_cost_{func_name}')
+    return duration_ms
@@ -0,0 +1,248 @@
+#apps\core\report_runner.py
+
+"""
+Выполнение SQL-функций отчетов и виджетов (kpi.reports, kpi.dashboard_widgets).
+Все функции принимают один параметр - JSON с фильтрами.
+МОЖНО вызывать только после полной инициализации Django!
+"""
+
+import contextvars
+import json
+import time
+from datetime import date, datetime, time as day_time
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from apps.core.admission import run_coalesced
+from apps.core.period_snapshots import get_snapshot, remember_result
+from apps.core.replicas import run_read_query
+from apps.core.request_profile import run_profiled
+from apps.core.report_cost import record_duration
+from apps.core.slow_calls import note_call
+
+# Общий пул потоков для параллельных вызовов (создается при первом обращении).
+# Каждый поток держит свое подключение к БД, как отдельный запрос Django.
+_executor = None
+
+
+def execute_report_function(func_name, params, limit=None, months=None):
+    """
+    Вызывает SQL-функцию отчета с параметрами params (dict).
+    limit - ограничение числа строк (применяется в БД, LIMIT).
+    months - номера месяцев: месячная функция вызывается за каждый месяц
+    одним запросом, первая колонка результата - p_month.
+    Возвращает кортеж (columns, rows), где rows - список кортежей.
+    Одновременные одинаковые вызовы выполняются один раз,
+    при перегрузке функции - исключение ReportBusy.
+    За замороженные месяцы результат берется из снимка (apps.core.period_snapshots).
+    """
+    if months:
+        return run_coalesced(
+            func_name, dict(params, _months=list(months)), limit,
+            lambda: _fetch_report_function(func_name, params, limit, months),
+        )
+
+    # Закрытый (замороженный) месяц - из снимка, без вызова функции
+    snapshot = get_snapshot(func_name, params, limit)
+    if snapshot is not None:
+        return snapshot
+
+    result = run_coalesced(
+        func_name, params, limit,
+        lambda: _fetch_report_function(func_name, params, limit),
+    )
+    remember_result(func_name, params, limit, result)
+    return result
+
+
+def _function_arg_type(conn, func_name):
+    """Тип параметра функции (json или jsonb) - для явного приведения"""
+    cache_key = f'report_arg_type_{func_name}'
+    arg_type = cache.get(cache_key)
+    if arg_type is None:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT format_type(p.proargtypes[0], NULL) FROM pg_proc p WHERE p.oid = %s::regproc",
+                [func_name]
+            )
+            row = cursor.fetchone()
+        arg_type = row[0] if row and row[0] in ('json', 'jsonb', 'text') else 'json'
+        cache.set(cache_key, arg_type, 3600)
+    return arg_type
+
+
+def _fetch_report_function(func_name, params, limit, months=None):
+    params_json = json.dumps(params, ensure_ascii=False, default=str)
+
+    # Только чтение - выполняется на реплике, если она актуальна
+    def query(conn):
+        started = time.monotonic()
+        with conn.cursor() as cursor:
+            if months:
+                # Все месяцы одним запросом: LATERAL-вызов с параметрами каждого месяца
+                month_params = [
+                    json.dumps(dict(params, p_month=month), ensure_ascii=False, default=str)
+                    for month in months
+                ]
+                sql = (
+                    f"SELECT m.p_month, f.* "
+                    f"FROM unnest(%s::int[], %s::text[]) AS m(p_month, params) "
+                    f"CROSS JOIN LATERAL {func_name}(m.params::{_function_arg_type(conn, func_name)}) AS f"
+                )
+                sql_params = [list(months), month_params]
+            else:
+                sql = f"SELECT * FROM {func_name}(%s)"
+                sql_params = [params_json]
+            if limit:
+                sql += " LIMIT %s"
+                sql_params.append(limit)
+            cursor.execute(sql, sql_params)
+
+            if cursor.description:
+                result = [col[0] for col in cursor.description], cursor.fetchall()
+            else:
+                result = [], []
+
+        # Медленный вызов - план сохраняется в фоне (для одиночных вызовов);
+        # время запоминается для оценки долгих отчетов
+        if not months:
+            duration_ms = (time.monotonic() - started) * 1000
+            note_call(func_name, params, limit, duration_ms, conn.alias)
+            if not limit:
+                record_duration(func_name, params, duration_ms)
+        return result
+
+    return run_read_query(query)
+
+
+def _format_decimal(value):
+    """Decimal: целые без дробной части, остальные - 2 знака после запятой"""
+    if value is None:
+        return value
+    return f"{float(value):.2f}" if value % 1 else f"{int(value)}"
+
+
+def get_column_formatters(rows):
+    """
+    Определяет форматирование для каждой колонки по первому непустому значению.
+    Возвращает список функций форматирования (None - выводить как есть).
+    """
+    if not rows:
+        return []
+
+    formatters = [None] * len(rows[0])
+    undetected = set(range(len(formatters)))
+    for row in rows:
+        for index in list(undetected):
+            value = row[index]
+            if value is not None:
+                if isinstance(value, Decimal):
+                    formatters[index] = _format_decimal
+                undetected.discard(index)
+        if not undetected:
+            break
+    return formatters
+
+
+def format_rows_for_display(rows):
+    """Форматирует строки результата для таблицы (список кортежей)"""
+    formatted = [
+        (index, formatter)
+        for index, formatter in enumerate(get_column_formatters(rows))
+        if formatter
+    ]
+    if not formatted:
+        return rows
+
+    result = []
+    for row in rows:
+        row = list(row)
+        for index, formatter in formatted:
+            row[index] = formatter(row[index])
+        result.append(tuple(row))
+    return result
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def _to_float(value):
+    return float(value) if value is not None else None
+
+
+def compact_rows(rows):
+    """
+    Строки для компактного JSON: списки значений, Decimal -> число,
+    даты -> строки ISO. Преобразование выбирается один раз на колонку.
+    """
+    if not rows:
+        return []
+
+    converters = []
+    for index in range(len(rows[0])):
+        value = next((row[index] for row in rows if row[index] is not None), None)
+        if isinstance(value, Decimal):
+            converters.append((index, _to_float))
+        elif isinstance(value, (date, datetime, day_time)):
+            converters.append((index, _isoformat))
+
+    result = []
+    for row in rows:
+        row = list(row)
+        for index, converter in converters:
+            row[index] = converter(row[index])
+        result.append(row)
+    return result
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.REPORT_PARALLEL_WORKERS,
+            thread_name_prefix='report-runner',
+        )
+    return _executor
+
+
+def _execute_in_worker(call):
+    """Вызов в потоке пула: подключение живет по тем же правилам, что и в запросе"""
+    close_old_connections()
+    try:
+        return run_profiled(execute_report_function, *call)
+    finally:
+        close_old_connections()
+
+
+def _call_key(func_name, params, limit, months=None):
+    return (func_name, json.dumps(params, sort_keys=True, default=str), limit,
+            tuple(months or ()))
+
+
+def execute_many(calls):
+    """
+    Параллельно выполняет несколько вызовов [(func_name, params, limit[, months]), ...].
+    Одинаковые вызовы выполняются один раз.
+    Возвращает список в том же порядке: (columns, rows) или объект исключения.
+    """
+    futures = {}
+    for call in calls:
+        key = _call_key(*call)
+        if key not in futures:
+            # Копия контекста запроса (профилирование, apps.core.request_profile)
+            futures[key] = _get_executor().submit(
+                contextvars.copy_context().run, _execute_in_worker, call
+            )
+
+    results = []
+    for call in calls:
+        future = futures[_call_key(*call)]
+        try:
+            results.append(future.result())
+        except Exception as e:
+            results.append(e)
+    return results
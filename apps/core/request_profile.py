@@ -0,0 +1,90 @@
+#apps\core\request_profile.py
+
+"""
+Профилирование запроса вместе с потоками пула.
+
+cProfile и execute_wrapper действуют только в своем потоке, а отчеты
+и виджеты выполняются параллельно в пуле report_runner.execute_many.
+На время профилируемого запроса (monitoring.middleware.ProfilingMiddleware)
+в контексте лежит ProfileSession: задачи пула получают копию контекста,
+профилируются в своем потоке, а статистика и время SQL добавляются к запросу.
+"""
+
+import cProfile
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from django.db import connections
+
+_session = ContextVar('profile_session', default=None)
+
+
+class SqlTimer:
+    """execute_wrapper: суммарное время и самые долгие запросы (из всех потоков)"""
+
+    def __init__(self):
+        self.total = 0.0
+        self.count = 0
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            with self.lock:
+                self.total += duration
+                self.count += 1
+                self.queries.append((duration, f"[{context['connection'].alias}] {sql}"))
+
+    def slowest(self, limit=10):
+        return sorted(self.queries, reverse=True)[:limit]
+
+
+class ProfileSession:
+    """Профиль одного запроса: SQL всех потоков и cProfile задач пула"""
+
+    def __init__(self):
+        self.sql_timer = SqlTimer()
+        self.profilers = []
+        self.worker_calls = 0
+        self.lock = threading.Lock()
+
+    def wrap_connections(self, stack):
+        # Подключения потоковые: в каждом потоке оборачиваются свои
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(self.sql_timer))
+
+    def run(self, func, *args):
+        """Выполняет func в потоке пула под cProfile и учетом SQL"""
+        profiler = cProfile.Profile()
+        with ExitStack() as stack:
+            self.wrap_connections(stack)
+            profiler.enable()
+            try:
+                return func(*args)
+            finally:
+                profiler.disable()
+                with self.lock:
+                    self.profilers.append(profiler)
+                    self.worker_calls += 1
+
+
+def start_session():
+    session = ProfileSession()
+    return session, _session.set(session)
+
+
+def end_session(token):
+    _session.reset(token)
+
+
+def run_profiled(func, *args):
+    """func(*args); внутри профилируемого запроса - с профилированием потока"""
+    session = _session.get()
+    if session is None:
+        return func(*args)
+    return session.run(func, *args)
@@ -0,0 +1,144 @@
+#apps\core\slow_calls.py
+
+"""
+Сохранение планов медленных вызовов SQL-функций отчетов и виджетов.
+
+Если вызов дольше порога (SlowCallThreshold или SLOW_CALL_THRESHOLD_MS),
+то с вероятностью SLOW_CALL_SAMPLE_RATE и не чаще раза
+в SLOW_CALL_EXPLAIN_INTERVAL для функции в отдельном потоке выполняется
+EXPLAIN (ANALYZE, BUFFERS) с теми же параметрами. Результат сохраняется
+в monitoring.SlowCall и доступен в админке.
+
+План самой функции показывает только Function Scan, поэтому, если
+расширение auto_explain можно загрузить, планы запросов внутри функции
+собираются из уведомлений (auto_explain.log_level = notice).
+"""
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections, transaction, DatabaseError
+
+from apps.core.db_utils import get_data_version
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='slow-explain')
+_pending = threading.Semaphore(settings.SLOW_CALL_MAX_PENDING)
+
+AUTO_EXPLAIN_SETTINGS = [
+    "SET LOCAL auto_explain.log_min_duration = 0",
+    "SET LOCAL auto_explain.log_analyze = on",
+    "SET LOCAL auto_explain.log_buffers = on",
+    "SET LOCAL auto_explain.log_nested_statements = on",
+    "SET LOCAL auto_explain.log_level = notice",
+]
+
+
+def get_threshold(func_name):
+    """Порог в мс для функции (None - планы не сохраняются)"""
+    thresholds = cache.get('slow_call_thresholds')
+    if thresholds is None:
+        try:
+            SlowCallThreshold = apps.get_model('monitoring', 'SlowCallThreshold')
+            thresholds = {
+                t.function_name: (t.threshold_ms if t.is_enabled else None)
+                for t in SlowCallThreshold.objects.all()
+            }
+        except Exception as e:
+            print(f"Ошибка загрузки порогов медленных вызовов: {e}")
+            thresholds = {}
+        cache.set('slow_call_thresholds', thresholds, 300)
+
+    return thresholds.get(func_name, settings.SLOW_CALL_THRESHOLD_MS)
+
+
+def note_call(func_name, params, limit, duration_ms, alias='default'):
+    """Учитывает завершенный вызов; медленный - ставит в очередь на EXPLAIN"""
+    threshold = get_threshold(func_name)
+    if threshold is None or duration_ms < threshold:
+        return
+    if random.random() >= settings.SLOW_CALL_SAMPLE_RATE:
+        return
+    # Один план на функцию за интервал (для всех процессов при общем кэше)
+    if not cache.add(f'slow_call_explain_{func_name}', 1, settings.SLOW_CALL_EXPLAIN_INTERVAL):
+        return
+    # Очередь ограничена - при наплыве медленных вызовов лишние пропускаем
+    if not _pending.acquire(blocking=False):
+        return
+
+    _executor.submit(_capture, func_name, params, limit, duration_ms, threshold, alias)
+
+
+def _capture(func_name, params, limit, duration_ms, threshold, alias):
+    close_old_connections()
+    try:
+        plan, nested_plans, explain_ms, error = '', '', None, ''
+        try:
+            plan, nested_plans, explain_ms = explain_call(func_name, params, limit, alias)
+        except Exception as e:
+            error = str(e)
+
+        SlowCall = apps.get_model('monitoring', 'SlowCall')
+        SlowCall.objects.create(
+            function_name=func_name,
+            params=json.loads(json.dumps(params, default=str)),
+            row_limit=limit,
+            duration_ms=duration_ms,
+            threshold_ms=threshold,
+            explain_duration_ms=explain_ms,
+            database=alias,
+            data_version=get_data_version(),
+            plan=plan,
+            nested_plans=nested_plans,
+            error=error,
+        )
+    except Exception as e:
+        print(f"Ошибка сохранения медленного вызова {func_name}: {e}")
+    finally:
+        _pending.release()
+        close_old_connections()
+
+
+def explain_call(func_name, params, limit, alias='default'):
+    """
+    EXPLAIN (ANALYZE, BUFFERS) вызова функции.
+    Выполняется в транзакции, которая откатывается.
+    Возвращает (план, планы вложенных запросов, время в мс).
+    """
+    params_json = json.dumps(params, ensure_ascii=False, default=str)
+    query = f"EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM {func_name}(%s)"
+    query_params = [params_json]
+    if limit:
+        query += " LIMIT %s"
+        query_params.append(limit)
+
+    conn = connections[alias]
+    with transaction.atomic(using=alias):
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s",
+                           [settings.SLOW_CALL_EXPLAIN_TIMEOUT_MS])
+
+            use_auto_explain = True
+            try:
+                with transaction.atomic(using=alias):
+                    cursor.execute("LOAD 'auto_explain'")
+                    for statement in AUTO_EXPLAIN_SETTINGS:
+                        cursor.execute(statement)
+            except DatabaseError:
+                use_auto_explain = False
+
+            notices = conn.connection.notices
+            del notices[:]
+            started = time.monotonic()
+            cursor.execute(query, query_params)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+            explain_ms = (time.monotonic() - started) * 1000
+            nested_plans = ''.join(notices) if use_auto_explain else ''
+
+        transaction.set_rollback(True, using=alias)
+
+    return plan, nested_plans, explain_ms
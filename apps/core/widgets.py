@@ -0,0 +1,104 @@
+#apps\core\widgets.py
+
+"""
+Виджеты активного дашборда (kpi.dashboards, kpi.dashboard_widgets):
+определения, параметры вызова SQL-функций и общий план вызовов.
+Используются страницей дашборда, заморозкой периодов, событиями
+синхронизации и замерами функций.
+"""
+
+import json
+from django.db import connection
+
+from apps.core.heatmap import heatmap_fields
+
+
+def get_active_dashboard():
+    """Активный дашборд (id, code, name) или None"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, code, name
+            FROM kpi.dashboards
+            WHERE is_active = true
+            ORDER BY sort_order
+            LIMIT 1
+        """)
+        return cursor.fetchone()
+
+
+YEAR_MONTHS = tuple(range(1, 13))
+
+WIDGET_FIELDS = [
+    'code', 'name', 'widget_type', 'chart_type',
+    'sql_function_name', 'sql_params',
+    'x_field', 'y_field', 'limit_records', 'width', 'height',
+]
+
+
+def get_dashboard_widgets(dashboard_id):
+    """Виджеты дашборда в порядке sort_order (список словарей)"""
+    query = f"""
+        SELECT {', '.join(WIDGET_FIELDS)}
+        FROM kpi.dashboard_widgets
+        WHERE dashboard_id = %s
+        ORDER BY sort_order
+    """
+    
+    with connection.cursor() as cursor:
+        cursor.execute(query, [dashboard_id])
+        return [dict(zip(WIDGET_FIELDS, row)) for row in cursor.fetchall()]
+
+
+def widget_config(widget):
+    """sql_params виджета: ключи с "_" - настройки отображения, а не параметры SQL"""
+    config = json.loads(widget['sql_params']) if widget['sql_params'] else {}
+    params = {k: v for k, v in config.items() if not k.startswith('_')}
+    options = {k: v for k, v in config.items() if k.startswith('_')}
+    return params, options
+
+
+def widget_params(widget, p_year, p_month):
+    """Параметры вызова SQL-функции виджета"""
+    params, options = widget_config(widget)
+    params['p_year'] = p_year
+    params['p_month'] = p_month
+    return params
+
+
+def widget_limit(widget):
+    """Ограничение числа строк виджета (передается в SQL как LIMIT)"""
+    limit_records = widget['limit_records']
+    return limit_records if limit_records and limit_records > 0 else None
+
+
+def plan_widget_calls(widgets, p_year, p_month):
+    """
+    План вызовов SQL-функций виджетов: виджеты с одинаковой функцией и
+    параметрами получают один общий вызов (LIMIT - наибольший в группе,
+    без ограничения - если хотя бы одному виджету нужны все строки).
+    Возвращает {code виджета: (func_name, params, limit)}.
+    """
+    groups = {}
+    for widget in widgets:
+        params = widget_params(widget, p_year, p_month)
+        limit = widget_limit(widget)
+        months = None
+        if widget['widget_type'] == 'heatmap':
+            # Тепловая карта: LIMIT - по строкам матрицы, месячная функция - за весь год
+            limit = None
+            if not heatmap_fields(widget, widget_config(widget)[1])[1]:
+                params.pop('p_month')
+                months = YEAR_MONTHS
+        key = (widget['sql_function_name'], json.dumps(params, sort_keys=True, default=str), months)
+        group = groups.setdefault(key, {'params': params, 'limits': [], 'codes': []})
+        group['limits'].append(limit)
+        group['codes'].append(widget['code'])
+    
+    plan = {}
+    for (func_name, _, months), group in groups.items():
+        limits = group['limits']
+        limit = None if None in limits else max(limits)
+        call = (func_name, group['params'], limit) + ((months,) if months else ())
+        for code in group['codes']:
+            plan[code] = call
+    return plan
@@ -0,0 +1,278 @@
+# apps/dashboard/api.py
+
+"""
+REST API отчетов (версия 1): /api/v1/reports/
+
+    GET /api/v1/reports/                    - доступные пользователю отчеты и их фильтры
+    GET /api/v1/reports/<id>/data/          - строки отчета
+
+Параметры data/:
+    фильтры отчета          - как на странице отчета (year, month, department, ...)
+    fields=a,b              - только перечисленные колонки
+    ordering=-a,b           - сортировка (минус - по убыванию)
+    filter.a=1              - отбор строк: filter.<колонка>[__оператор]=значение,
+                              операторы: ne, gt, gte, lt, lte, contains, in (через запятую), isnull
+    page_size=500, offset=  - страницы по смещению (next/previous в ответе)
+
+Проекция, сортировка, отбор и LIMIT/OFFSET выполняются в SQL вокруг вызова
+функции, клиент получает только нужный срез. Функция выполняется для каждой
+страницы заново, поэтому ссылки next/previous содержат версию данных (version):
+если между страницами прошла синхронизация, ответ 409 - строки могли
+сместиться, загрузку нужно начать с первой страницы. Правила ролей те же, что на странице
+отчета: врачу доступны только отчеты для врачей и только свои данные (p_man_id).
+"""
+
+import json
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.core.admission import ReportBusy, run_coalesced
+from apps.core.db_utils import get_data_version
+from apps.core.replicas import run_read_query
+from apps.core.report_runner import compact_rows
+from apps.dashboard.serializers import ReportSerializer
+from apps.dashboard.views import (
+    _get_available_reports, _get_filters_config, _collect_filter_values,
+)
+
+FILTER_PREFIX = 'filter.'
+FILTER_OPERATORS = {
+    '': '{column} = %s',
+    'ne': '{column} <> %s',
+    'gt': '{column} > %s',
+    'gte': '{column} >= %s',
+    'lt': '{column} < %s',
+    'lte': '{column} <= %s',
+    'contains': '{column}::text ILIKE %s',
+    'in': '{column}::text = ANY(%s)',
+    'isnull': '{column} IS NULL',
+}
+
+
+class DataChanged(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'Данные обновились после загрузки первой страницы, начните заново'
+    default_code = 'data_changed'
+
+
+def _like_pattern(value):
+    """Подстрока для ILIKE: %, _ и \\ ищутся как обычные символы"""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'%{escaped}%'
+
+
+def _get_report(user, report_id):
+    for report in _get_available_reports(user):
+        if str(report['id']) == str(report_id):
+            return report
+    raise NotFound('Отчет не найден')
+
+
+def _function_columns(conn, func_name, params_json):
+    """
+    Колонки результата SQL-функции: из описания функции (RETURNS TABLE / OUT),
+    иначе - пустым вызовом. Кэшируются на час.
+    """
+    cache_key = f'report_columns_{func_name}'
+    columns = cache.get(cache_key)
+    if columns is not None:
+        return columns
+
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute("""
+                SELECT p.proargnames, p.proargmodes
+                FROM pg_proc p
+                WHERE p.oid = %s::regproc
+            """, [func_name])
+            row = cursor.fetchone()
+        except Exception:
+            row = None
+
+        if row and row[0] and row[1]:
+            columns = [name for name, mode in zip(row[0], row[1]) if mode in ('o', 't')]
+        else:
+            cursor.execute(f"SELECT * FROM {func_name}(%s) LIMIT 0", [params_json])
+            columns = [col[0] for col in cursor.description or []]
+
+    cache.set(cache_key, columns, 3600)
+    return columns
+
+
+def _parse_fields(query, columns):
+    fields = [f.strip() for f in query.get('fields', '').split(',') if f.strip()]
+    unknown = [f for f in fields if f not in columns]
+    if unknown:
+        raise ValidationError({'fields': f"Неизвестные колонки: {', '.join(unknown)}"})
+    return fields or columns
+
+
+def _parse_ordering(query, columns):
+    ordering = []
+    for item in query.get('ordering', '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+        column = item.lstrip('-')
+        if column not in columns:
+            raise ValidationError({'ordering': f"Неизвестная колонка: {column}"})
+        ordering.append((column, item.startswith('-')))
+    return ordering
+
+
+def _parse_row_filters(query, columns):
+    """filter.<колонка>[__оператор]=значение -> [(шаблон SQL, колонка, параметр)]"""
+    conditions = []
+    for key in query:
+        if not key.startswith(FILTER_PREFIX):
+            continue
+        column, _, operator = key[len(FILTER_PREFIX):].partition('__')
+        if column not in columns:
+            raise ValidationError({key: f"Неизвестная колонка: {column}"})
+        if operator not in FILTER_OPERATORS:
+            raise ValidationError({key: f"Неизвестный оператор: {operator}"})
+
+        value = query.get(key)
+        if operator == 'in':
+            value = [v.strip() for v in value.split(',')]
+        elif operator == 'contains':
+            value = _like_pattern(value)
+        elif operator == 'isnull':
+            template = FILTER_OPERATORS['isnull'] if value.lower() in ('1', 'true') \
+                else '{column} IS NOT NULL'
+            conditions.append((template, column, None))
+            continue
+        conditions.append((FILTER_OPERATORS[operator], column, value))
+    return conditions
+
+
+def _parse_offset(query):
+    try:
+        return max(int(query.get('offset', 0)), 0)
+    except (ValueError, TypeError):
+        raise ValidationError({'offset': 'Ожидается целое число'})
+
+
+def _page_size(query):
+    try:
+        size = int(query.get('page_size', settings.API_PAGE_SIZE))
+    except (ValueError, TypeError):
+        size = settings.API_PAGE_SIZE
+    return min(max(size, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def build_report_query(conn, func_name, fields, ordering, conditions, offset, limit):
+    """
+    SELECT выбранных колонок из результата функции с отбором и сортировкой.
+    WITH ORDINALITY сохраняет порядок строк функции - страницы стабильны.
+    """
+    quote = conn.ops.quote_name
+    where = []
+    params = []
+    for template, column, value in conditions:
+        where.append(template.format(column=f'r.{quote(column)}'))
+        if value is not None:
+            params.append(value)
+
+    order = [f'r.{quote(column)}{" DESC" if desc else ""}' for column, desc in ordering]
+    order.append('r.ordinality')
+
+    query = (
+        f"SELECT {', '.join(f'r.{quote(f)}' for f in fields)} "
+        f"FROM {func_name}(%s) WITH ORDINALITY AS r"
+    )
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {', '.join(order)} LIMIT %s OFFSET %s"
+    return query, params + [limit, offset]
+
+
+class ReportListView(APIView):
+    """Отчеты, доступные пользователю, с описанием фильтров"""
+
+    def get(self, request):
+        reports = []
+        for report in _get_available_reports(request.user):
+            reports.append({
+                'id': report['id'],
+                'code': report['code'],
+                'name': report['name'],
+                'filters': [
+                    {
+                        'code': fc[0],
+                        'name': fc[1],
+                        'param_name': fc[11],
+                        'multiple': bool(fc[9]),
+                        'required': bool(fc[13]),
+                    }
+                    for fc in _get_filters_config(report['id'])
+                ],
+            })
+        return Response({'results': ReportSerializer(reports, many=True).data})
+
+
+class ReportDataView(APIView):
+    """Строки отчета: проекция, сортировка, отбор и страницы - в SQL"""
+
+    def get(self, request, report_id):
+        query = request.query_params
+        report = _get_report(request.user, report_id)
+        filters_config = _get_filters_config(report['id'])
+        filter_values = _collect_filter_values(query, request.user, filters_config)
+        params_json = json.dumps(filter_values, ensure_ascii=False, default=str)
+
+        offset = _parse_offset(query)
+        page_size = _page_size(query)
+        data_version = get_data_version()
+        if query.get('version') and query.get('version') != data_version:
+            raise DataChanged()
+
+        def fetch(conn):
+            columns = _function_columns(conn, report['func'], params_json)
+            fields = _parse_fields(query, columns)
+            sql, sql_params = build_report_query(
+                conn, report['func'], fields,
+                _parse_ordering(query, columns),
+                _parse_row_filters(query, columns),
+                offset, page_size + 1,
+            )
+            with conn.cursor() as cursor:
+                cursor.execute(sql, [params_json] + sql_params)
+                return fields, cursor.fetchall()
+
+        # Одинаковые запросы выполняются один раз, с ограничением нагрузки на функцию
+        call_key = dict(filter_values, _api={k: query.getlist(k) for k in sorted(query)})
+        try:
+            fields, rows = run_coalesced(
+                report['func'], call_key, page_size, lambda: run_read_query(fetch)
+            )
+        except ValidationError:
+            raise
+        except ReportBusy as e:
+            return Response({'detail': str(e)}, status=503,
+                            headers={'Retry-After': str(e.retry_after)})
+        except Exception as e:
+            print(f"Ошибка API отчета {report['code']}: {e}")
+            return Response({'detail': str(e)}, status=500)
+
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        def page_url(new_offset):
+            url_query = query.copy()
+            url_query['offset'] = new_offset
+            url_query['version'] = data_version
+            return request.build_absolute_uri(f'{request.path}?{url_query.urlencode()}')
+
+        return Response({
+            'report': {'id': report['id'], 'code': report['code'], 'name': report['name']},
+            'version': data_version,
+            'columns': fields,
+            'rows': compact_rows(rows),
+            'next': page_url(offset + page_size) if has_next else None,
+            'previous': page_url(max(offset - page_size, 0)) if offset else None,
+        })
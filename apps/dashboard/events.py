@@ -0,0 +1,250 @@
+# apps/dashboard/events.py
+
+"""
+Уведомления открытых страниц о новой синхронизации с МИС (Server-Sent Events).
+
+Один наблюдатель на процесс раз в SYNC_EVENTS_POLL_INTERVAL секунд читает
+дату импорта (apps.core.db_utils.read_import_date). Когда дата меняется, всем подключенным страницам
+процесса уходит событие "sync": новая дата и коды виджетов, данные которых
+могли измениться (функция виджета читает таблицу, загруженную последней
+синхронизацией, в том числе через вложенные функции и представления).
+Если это определить нельзя (например, импорт выполнен не через sync_mis),
+список не передается и страница обновляет все виджеты.
+
+Поток держится открытым под ASGI (kpi_core/asgi.py; python main.py с
+WEB_ASGI=1). Под WSGI ответ содержит только текущее состояние, и браузер
+переподключается через SYNC_EVENTS_WSGI_RETRY секунд - короткий опрос
+без перезагрузки страницы и виджетов.
+"""
+
+import asyncio
+import json
+import re
+from datetime import datetime
+from asgiref.sync import sync_to_async
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections, connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import formats, timezone
+
+from apps.core.db_utils import read_import_date
+from apps.core.widgets import get_active_dashboard, get_dashboard_widgets
+
+OBJECT_RE = re.compile(r'\b([a-z_]\w*)\.([a-z_]\w*)\b', re.IGNORECASE)
+SYSTEM_SCHEMAS = ['pg_catalog', 'information_schema']
+
+
+class SyncWatcher:
+    """Опрос даты импорта и рассылка события подписчикам (очередям asyncio)"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.version = None
+        self.event = None
+        self.checked_at = None
+        self.task = None
+        self.lock = asyncio.Lock()
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self.subscribers.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    async def run(self):
+        # Наблюдатель работает, пока есть подключенные страницы
+        while self.subscribers:
+            try:
+                await self.check()
+            except Exception as e:
+                print(f"Ошибка проверки синхронизации: {e}")
+            await asyncio.sleep(settings.SYNC_EVENTS_POLL_INTERVAL)
+
+    async def check(self):
+        # Проверка при подключении и фоновый опрос не рассылают событие дважды
+        async with self.lock:
+            await self._check()
+
+    async def _check(self):
+        previous_check = self.checked_at
+        checked_at = timezone.now()
+        import_date, version = await sync_to_async(_read_import_date, thread_sensitive=False)()
+        self.checked_at = checked_at
+        if version == self.version:
+            return
+
+        known = self.version is not None
+        self.version = version
+        # Ключи кэша сразу переходят на новую версию, не дожидаясь истечения
+        cache.set('data_version', version, 60)
+
+        widgets = None
+        if known and previous_check:
+            widgets = await sync_to_async(_affected_widgets, thread_sensitive=False)(previous_check)
+        self.event = sync_event(import_date, version, widgets)
+        if known:
+            for queue in list(self.subscribers):
+                queue.put_nowait(self.event)
+
+
+watcher = SyncWatcher()
+
+
+def _read_import_date():
+    close_old_connections()
+    try:
+        return read_import_date()
+    finally:
+        close_old_connections()
+
+
+def sync_event(import_date, version, widgets=None):
+    """Данные события: версия, дата для бейджа, коды виджетов (None - все)"""
+    if isinstance(import_date, datetime) and timezone.is_aware(import_date):
+        import_date = timezone.localtime(import_date)
+    return {
+        'version': version,
+        'last_sync': formats.localize(import_date) if import_date else '',
+        'widgets': widgets,
+    }
+
+
+def _object_sources(cursor):
+    """{schema.name: исходный текст} функций и представлений"""
+    cursor.execute("""
+        SELECT n.nspname || '.' || p.proname, p.prosrc
+        FROM pg_proc p
+        JOIN pg_namespace n ON n.oid = p.pronamespace
+        WHERE n.nspname <> ALL(%s)
+        UNION ALL
+        SELECT schemaname || '.' || viewname, definition
+        FROM pg_views
+        WHERE schemaname <> ALL(%s)
+    """, [SYSTEM_SCHEMAS, SYSTEM_SCHEMAS])
+    sources = {}
+    for name, source in cursor.fetchall():
+        # Перегруженные функции - один текст на имя
+        sources[name.lower()] = sources.get(name.lower(), '') + (source or '')
+    return sources
+
+
+def _reads_tables(name, sources, table_res, seen):
+    """Функция или представление читает одну из таблиц (с учетом вложенных объектов)"""
+    if name in seen:
+        return False
+    seen.add(name)
+    source = sources.get(name, '')
+    if any(table_re.search(source) for table_re in table_res):
+        return True
+    return any(
+        _reads_tables(f'{schema}.{object_name}'.lower(), sources, table_res, seen)
+        for schema, object_name in OBJECT_RE.findall(source)
+        if f'{schema}.{object_name}'.lower() in sources
+    )
+
+
+def _affected_widgets(since):
+    """
+    Коды виджетов активного дашборда, данные которых изменила синхронизация,
+    завершенная после since; None - неизвестно, обновлять все.
+    """
+    close_old_connections()
+    try:
+        SyncRun = apps.get_model('sync', 'SyncRun')
+        SyncTable = apps.get_model('sync', 'SyncTable')
+        run = SyncRun.objects.filter(status='success', row_count__gt=0, finished_at__gte=since).first()
+        if run is None:
+            return None
+        tables = list(SyncTable.objects.filter(
+            last_synced_at__gte=run.started_at, last_row_count__gt=0,
+        ).values_list('target_table', flat=True))
+
+        # Имя таблицы со схемой или без нее (если схема в search_path)
+        table_res = [
+            re.compile(r'\b' + r'\.'.join(map(re.escape, table.lower().split('.'))) + r'\b', re.IGNORECASE)
+            for table in tables
+        ] + [
+            re.compile(r'(?<![\w.])' + re.escape(table.lower().split('.')[-1]) + r'\b', re.IGNORECASE)
+            for table in tables
+        ]
+
+        dashboard = get_active_dashboard()
+        widgets = get_dashboard_widgets(dashboard[0]) if dashboard else []
+        with connection.cursor() as cursor:
+            sources = _object_sources(cursor)
+
+        affected = []
+        for widget in widgets:
+            func_name = widget['sql_function_name'].lower()
+            # Текст функции недоступен - считаем, что данные изменились
+            if func_name not in sources or _reads_tables(func_name, sources, table_res, set()):
+                affected.append(widget['code'])
+        return affected
+    except Exception as e:
+        print(f"Ошибка определения затронутых виджетов: {e}")
+        return None
+    finally:
+        close_old_connections()
+
+
+def _format(event, data):
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"id: {data['version']}\nevent: {event}\ndata: {payload}\n\n"
+
+
+def _client_version(request):
+    # После переподключения браузер передает id последнего события
+    return request.headers.get('Last-Event-ID') or request.GET.get('version')
+
+
+async def _stream(queue, client_version):
+    try:
+        yield f"retry: {settings.SYNC_EVENTS_RETRY * 1000}\n\n"
+        # Синхронизация прошла, пока страница загружалась или была отключена
+        if watcher.event and client_version and watcher.event['version'] != client_version:
+            yield _format('sync', dict(watcher.event, widgets=None))
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), settings.SYNC_EVENTS_HEARTBEAT)
+                yield _format('sync', event)
+            except asyncio.TimeoutError:
+                # Комментарий держит соединение открытым через прокси
+                yield ": ping\n\n"
+    finally:
+        watcher.unsubscribe(queue)
+
+
+def _response(content):
+    response = (StreamingHttpResponse(content, content_type='text/event-stream')
+                if not isinstance(content, str)
+                else HttpResponse(content, content_type='text/event-stream'))
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx не буферизует поток
+    return response
+
+
+@login_required
+async def sync_events(request):
+    """Поток событий синхронизации для открытых страниц"""
+    client_version = _client_version(request)
+
+    if not isinstance(request, ASGIRequest):
+        # WSGI: текущее состояние и переподключение через SYNC_EVENTS_WSGI_RETRY
+        import_date, version = await sync_to_async(read_import_date)()
+        content = f"retry: {settings.SYNC_EVENTS_WSGI_RETRY * 1000}\n\n"
+        if client_version and version != client_version:
+            content += _format('sync', sync_event(import_date, version))
+        return _response(content)
+
+    queue = watcher.subscribe()
+    if watcher.version is None:
+        await watcher.check()
+    return _response(_stream(queue, client_version))
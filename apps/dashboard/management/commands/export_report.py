@@ -0,0 +1,64 @@
+# apps/dashboard/management/commands/export_report.py
+
+from datetime import datetime
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.core.arrow_export import FORMATS, write_report
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка результатов отчетов kpi.reports в Parquet / Arrow IPC'
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--report', help='Код отчета (kpi.reports.report_code)')
+        target.add_argument('--all', action='store_true',
+                            help='Все активные отчеты за период (по файлу на отчет)')
+        parser.add_argument('--year', type=int, default=datetime.now().year)
+        parser.add_argument('--month', type=int, default=datetime.now().month)
+        parser.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                            help='Дополнительный параметр SQL-функции (можно несколько раз)')
+        parser.add_argument('--format', choices=sorted(FORMATS), default='parquet')
+        parser.add_argument('--output', required=True,
+                            help='Файл (для --report) или каталог (для --all)')
+        parser.add_argument('--batch-size', type=int, default=50000)
+
+    def handle(self, *args, **options):
+        params = {'p_year': options['year'], 'p_month': options['month']}
+        for item in options['param']:
+            if '=' not in item:
+                raise CommandError(f'Параметр должен иметь вид KEY=VALUE: {item}')
+            key, value = item.split('=', 1)
+            params[key] = value
+
+        query = "SELECT report_code, sql_function_name FROM kpi.reports WHERE is_active = true"
+        query_params = []
+        if options['report']:
+            query += " AND report_code = %s"
+            query_params.append(options['report'])
+        query += " ORDER BY sort_order"
+
+        with connection.cursor() as cursor:
+            cursor.execute(query, query_params)
+            reports = cursor.fetchall()
+        if not reports:
+            raise CommandError('Отчеты не найдены')
+
+        extension = FORMATS[options['format']][1]
+        output = Path(options['output'])
+        if options['all']:
+            output.mkdir(parents=True, exist_ok=True)
+
+        for report_code, func_name in reports:
+            path = output
+            if options['all']:
+                path = output / (
+                    f"{report_code}_{options['year']}_{options['month']:02d}.{extension}"
+                )
+            row_count = write_report(
+                func_name, params, str(path),
+                fmt=options['format'], batch_size=options['batch_size'],
+            )
+            self.stdout.write(self.style.SUCCESS(f'✅ {report_code}: {row_count} строк → {path}'))
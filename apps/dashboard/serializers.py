@@ -0,0 +1,20 @@
+# apps/dashboard/serializers.py
+
+from rest_framework import serializers
+
+
+class ReportFilterSerializer(serializers.Serializer):
+    """Фильтр отчета: код GET-параметра и параметр SQL-функции"""
+    code = serializers.CharField()
+    name = serializers.CharField()
+    param_name = serializers.CharField()
+    multiple = serializers.BooleanField()
+    required = serializers.BooleanField()
+
+
+class ReportSerializer(serializers.Serializer):
+    """Отчет из реестра kpi.reports"""
+    id = serializers.IntegerField()
+    code = serializers.CharField()
+    name = serializers.CharField()
+    filters = ReportFilterSerializer(many=True, required=False)
@@ -1,14 +1,38 @@
 # apps/dashboard/views.py
 
+import hashlib
 import json
 from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 from django.contrib.auth.decorators import login_required
 from django.db import connection
 from django.utils import timezone
 from datetime import datetime
-from apps.core.db_utils import get_months_from_db, get_month_name
-from django.http import JsonResponse
+from apps.core.admission import ReportBusy
+from apps.core.db_utils import (
+    get_months_from_db, get_month_name, get_data_version, get_all_active_rules, read_import_date,
+)
+from apps.core.arrow_export import FORMATS, stream_report, write_rows
+from apps.core.autocomplete import get_index
+from apps.core.downsampling import downsample_series
+from apps.core.heatmap import MONTH_FIELD, heatmap_fields, heatmap_payload
+from apps.core.periods import clip_range, parse_month, run_report
+from apps.core.replicas import run_read_query
+from apps.core.widgets import (
+    YEAR_MONTHS, get_active_dashboard, get_dashboard_widgets, plan_widget_calls,
+    widget_config, widget_limit,
+)
+from apps.core.report_runner import (
+    execute_report_function, execute_many, format_rows_for_display, compact_rows,
+)
+from django.http import HttpResponse, JsonResponse, QueryDict, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+from django.conf import settings
 from django.core.cache import cache
+from jobs.runner import (
+    find_or_submit, get_user_job, job_payload, load_result, needs_background,
+)
 
 @login_required
 def dashboard_home(request):
@@ -118,23 +142,20 @@ def dashboard_home(request):
     
     return render(request, 'dashboard/accountant_dashboard.html', context)
 
-#умная фильтрация
-@login_required
-def unified_plan_fact(request):
-    """
-    УНИВЕРСАЛЬНАЯ страница отчетов.
-    Все настройки берутся из БД (таблицы reports, report_filters, filter_types)
-    """
-    user = request.user
-    
-    # 1. Получаем все активные отчеты
+def _is_doctor_user(user):
+    """Врач - не заведующий и не суперпользователь"""
+    return not (user.is_accountant() or user.is_superuser)
+
+
+def _get_available_reports(user):
+    """Активные отчеты, доступные пользователю (в порядке sort_order)"""
     with connection.cursor() as cursor:
         query = """
             SELECT id, report_code, report_name, sql_function_name
             FROM kpi.reports
             WHERE is_active = true
         """
-        if not (user.is_accountant() or user.is_superuser):
+        if _is_doctor_user(user):
             query += " AND available_for_doctors = true"
         query += " ORDER BY sort_order"
         cursor.execute(query)
@@ -147,30 +168,24 @@ def unified_plan_fact(request):
                 'name': row[2],
                 'func': row[3]
             })
-    
-    if not reports:
-        return render(request, 'dashboard/access_denied.html', {
-            'message': 'В системе не настроено ни одного отчета'
-        })
-    
-    # 2. Определяем текущий отчет (из GET или первый)
+        return reports
+
+
+def _select_report(reports, report_id):
+    """Отчет из списка по id (если не найден - первый)"""
     try:
-        current_report_id = int(request.GET.get('report_id', reports[0]['id']))
+        report_id = int(report_id)
     except (ValueError, TypeError):
-        current_report_id = reports[0]['id']
+        return reports[0]
     
-    # Находим текущий отчет в списке
-    current_report = None
     for r in reports:
-        if r['id'] == current_report_id:
-            current_report = r
-            break
-    
-    if not current_report:
-        current_report = reports[0]
-        current_report_id = reports[0]['id']
-    
-    # 3. Получаем настройки фильтров для текущего отчета
+        if r['id'] == report_id:
+            return r
+    return reports[0]
+
+
+def _get_filters_config(report_id):
+    """Настройки фильтров отчета (kpi.report_filters + kpi.filter_types)"""
     with connection.cursor() as cursor:
         cursor.execute("""
             SELECT 
@@ -192,11 +207,49 @@ def unified_plan_fact(request):
             JOIN kpi.filter_types ft ON rf.filter_type_id = ft.id
             WHERE rf.report_id = %s
             ORDER BY rf.display_order
-        """, [current_report_id])
+        """, [report_id])
         
-        filters_config = cursor.fetchall()
-    
-    # 4. Собираем данные для фильтров (для шаблона)
+        return cursor.fetchall()
+
+
+def _fetch_options(conn, options_sql):
+    """Варианты значений фильтра: [{'value': ..., 'text': ...}, ...]"""
+    with conn.cursor() as cursor:
+        cursor.execute(options_sql)
+        return [{'value': row[0], 'text': row[1]} for row in cursor.fetchall()]
+
+
+def _get_filter_options_sql(filter_code):
+    """sql_query типа фильтра (None - у фильтра нет списка значений)"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT sql_query FROM kpi.filter_types WHERE filter_code = %s",
+            [filter_code]
+        )
+        row = cursor.fetchone()
+    if row and row[0] and row[0].strip():
+        return row[0]
+    return None
+
+
+def _get_options_index(filter_code, options=None):
+    """
+    Индекс автодополнения фильтра для текущей версии данных.
+    options - уже загруженные варианты (иначе выполняется sql_query фильтра).
+    """
+    def load_options():
+        if options is not None:
+            return options
+        options_sql = _get_filter_options_sql(filter_code)
+        if not options_sql:
+            raise LookupError(f"У фильтра {filter_code} нет списка значений")
+        return run_read_query(lambda conn: _fetch_options(conn, options_sql))
+
+    return get_index(filter_code, load_options)
+
+
+def _build_filters_for_template(filters_config):
+    """Фильтры для шаблона вместе со списками значений (выполняет sql_query фильтров)"""
     filters_for_template = []
     
     for fc in filters_config:
@@ -218,19 +271,27 @@ def unified_plan_fact(request):
         # Если это фильтр со списком значений
         if fc[2] and fc[2].strip():
             try:
-                with connection.cursor() as cursor2:
-                    cursor2.execute(fc[2])
-                    filter_info['options'] = [
-                        {'value': row[0], 'text': row[1]}
-                        for row in cursor2.fetchall()
-                    ]
+                filter_info['options'] = run_read_query(
+                    lambda conn: _fetch_options(conn, fc[2])
+                )
             except Exception as e:
                 print(f"Ошибка при загрузке фильтра {fc[0]}: {e}")
                 filter_info['options'] = []
+
+            # Большой список не встраиваем в страницу - поиск с автодополнением
+            options = filter_info['options']
+            if fc[5] == 'select' and len(options) > settings.AUTOCOMPLETE_MIN_OPTIONS:
+                _get_options_index(fc[0], options)
+                filter_info['autocomplete'] = True
+                filter_info['options'] = []
         
         filters_for_template.append(filter_info)
 
-    # === СБОР ЗНАЧЕНИЙ ФИЛЬТРОВ (ТОЛЬКО ОДИН РАЗ) ===
+    return filters_for_template
+
+
+def _collect_filter_values(query, user, filters_config):
+    """Значения фильтров из GET-параметров -> параметры SQL-функции"""
     filter_values = {}
     
     for fc in filters_config:
@@ -239,71 +300,403 @@ def unified_plan_fact(request):
         is_multiple = fc[9]    # is_multiple
         
         if is_multiple:
-            values = request.GET.getlist(filter_code)
+            values = query.getlist(filter_code)
             if values:
                 filter_values[param_name] = values
         else:
-            value = request.GET.get(filter_code)
+            value = query.get(filter_code)
             if value:
                 filter_values[param_name] = value
     
     # Если пользователь - врач (не заведующий и не суперюзер)
-    if not (user.is_accountant() or user.is_superuser):
+    if _is_doctor_user(user):
         # Проверяем, есть ли в этом отчете фильтр по врачу
         has_doctor_filter = any(fc[0] == 'doctor' for fc in filters_config)
         
         if has_doctor_filter and user.manid:
             # Принудительно подставляем ID врача
             filter_values['p_man_id'] = user.manid
+        elif has_doctor_filter:
+            # Врач без привязки к сотруднику не выбирает чужие данные
+            for fc in filters_config:
+                if fc[0] == 'doctor':
+                    filter_values.pop(fc[11], None)
     
     # Если есть год и месяц в фильтрах, убедимся что они есть
     if 'year' in [fc[0] for fc in filters_config] and 'p_year' not in filter_values:
         filter_values['p_year'] = datetime.now().year
     if 'month' in [fc[0] for fc in filters_config] and 'p_month' not in filter_values:
         filter_values['p_month'] = datetime.now().month
+
+    return filter_values
+
+
+def _params_query(params, filters_config):
+    """
+    Параметры элемента пакета ({param_name или filter_code: значение})
+    -> QueryDict для _collect_filter_values: остаются только фильтры отчета.
+    """
+    query = QueryDict(mutable=True)
+    for fc in filters_config:
+        filter_code, param_name, is_multiple = fc[0], fc[11], fc[9]
+        value = params.get(param_name, params.get(filter_code))
+        if value is None or value == '':
+            continue
+        values = value if isinstance(value, list) else [value]
+        if not is_multiple:
+            values = values[:1]
+        query.setlist(filter_code, [str(v) for v in values])
+    return query
+
+
+def _has_period_filters(filters_config):
+    """У отчета есть фильтры года и месяца - можно строить за диапазон"""
+    codes = {fc[0] for fc in filters_config}
+    return 'year' in codes and 'month' in codes
+
+
+def _parse_period_range(query, filters_config):
+    """
+    Диапазон месяцев из period_from/period_to (YYYY-MM).
+    Возвращает (диапазон или None, обрезан ли до PERIOD_RANGE_MAX_MONTHS).
+    """
+    if not _has_period_filters(filters_config):
+        return None, False
+    start = parse_month(query.get('period_from'))
+    end = parse_month(query.get('period_to'))
+    if not start or not end:
+        return None, False
+    start, end, clipped = clip_range(*sorted((start, end)))
+    return (start, end), clipped
+
+
+def _busy_response(error):
+    """503 с подсказкой повторить запрос (превышен лимит выполнений функции)"""
+    response = JsonResponse({
+        'success': False,
+        'busy': True,
+        'error': str(error),
+        'retry_after': error.retry_after,
+    }, status=503)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
+
+def _user_role_key(user):
+    """Роль пользователя для ключей кэша"""
+    if user.is_superuser:
+        return 'superuser'
+    return str(user.role_id or 'none')
+
+
+def _render_filters_panel(report_id, user, filters_config):
+    """HTML панели фильтров отчета (из кэша, если версия данных не менялась)"""
+    cache_key = (
+        f'report_filters_{report_id}_{_user_role_key(user)}_{get_data_version()}'
+    )
+    panel = cache.get(cache_key)
+    
+    if panel is None:
+        panel = render_to_string('dashboard/report_filters_panel.html', {
+            'current_report_id': report_id,
+            'filters': _build_filters_for_template(filters_config),
+            'has_period_filters': _has_period_filters(filters_config),
+        })
+        cache.set(cache_key, panel, settings.FILTER_PANEL_CACHE_TIMEOUT)
+    
+    return mark_safe(panel)
+
+
+@login_required
+def filter_options(request, filter_code):
+    """
+    Варианты фильтра для автодополнения:
+        ?q=иван&limit=20  - поиск по началу слов и похожим написаниям
+        ?value=123        - подпись уже выбранного значения
+    """
+    try:
+        index = _get_options_index(filter_code)
+    except LookupError:
+        return JsonResponse({'results': [], 'error': 'Фильтр не найден'}, status=404)
+    except Exception as e:
+        print(f"Ошибка при загрузке фильтра {filter_code}: {e}")
+        return JsonResponse({'results': [], 'error': str(e)}, status=500)
+
+    value = request.GET.get('value')
+    if value is not None:
+        option = index.get(value)
+        return JsonResponse({'results': [option] if option else []})
+
+    try:
+        limit = int(request.GET.get('limit', settings.AUTOCOMPLETE_LIMIT))
+    except ValueError:
+        limit = settings.AUTOCOMPLETE_LIMIT
+    limit = min(max(limit, 1), settings.AUTOCOMPLETE_MAX_LIMIT)
+
+    return JsonResponse({'results': index.search(request.GET.get('q', ''), limit)})
+
+
+#умная фильтрация
+@login_required
+def unified_plan_fact(request):
+    """
+    УНИВЕРСАЛЬНАЯ страница отчетов.
+    Все настройки берутся из БД (таблицы reports, report_filters, filter_types)
+    """
+    user = request.user
+    
+    # 1. Получаем все активные отчеты
+    reports = _get_available_reports(user)
+    
+    if not reports:
+        return render(request, 'dashboard/access_denied.html', {
+            'message': 'В системе не настроено ни одного отчета'
+        })
+    
+    # 2. Определяем текущий отчет (из GET или первый)
+    current_report = _select_report(reports, request.GET.get('report_id'))
+    current_report_id = current_report['id']
+    
+    # 3. Получаем настройки фильтров для текущего отчета
+    filters_config = _get_filters_config(current_report_id)
+    
+    # 4. Панель фильтров: HTML со списками значений кэшируется по отчету,
+    # роли пользователя и версии данных. Выбранные значения подставляются
+    # в браузере из адресной строки.
+    filters_panel = _render_filters_panel(current_report_id, user, filters_config)
+
+    # === СБОР ЗНАЧЕНИЙ ФИЛЬТРОВ (ТОЛЬКО ОДИН РАЗ) ===
+    filter_values = _collect_filter_values(request.GET, user, filters_config)
+    period_range, period_clipped = _parse_period_range(request.GET, filters_config)
+    
+    # Режим отрисовки: server - HTML-таблица, client - страница без данных,
+    # строки загружаются компактным JSON и рисуются виртуальной таблицей
+    render_mode = 'client' if request.GET.get('render') == 'client' else 'server'
+    toggle_query = request.GET.copy()
+    if render_mode == 'client':
+        toggle_query.pop('render', None)
+    else:
+        toggle_query['render'] = 'client'
+    
+    # === ФОНОВОЕ ВЫПОЛНЕНИЕ ===
+    # Долгий отчет (по настройке или оценке времени) выполняется в фоне:
+    # страница опрашивает статус задания и открывает готовый результат
+    job = _report_job(request, current_report, filter_values, period_range)
+    rows_query = request.GET.copy()
+    if job:
+        rows_query['job'] = job.id
+    background_query = request.GET.copy()
+    background_query.pop('job', None)
+    background_query['background'] = '1'
     
     # === ВЫЗОВ SQL ФУНКЦИИ ===
-    data = []
+    # Строки остаются кортежами в порядке columns, форматирование
+    # значений выбирается один раз на колонку
+    rows = []
     columns = []
+    totals = []
+    totals_columns = []
+    busy = None
     
-    try:
-        # Преобразуем в JSON
-        filter_json = json.dumps(filter_values, ensure_ascii=False)
+    if render_mode == 'server' and (job is None or job.status == 'done'):
+        try:
+            if job:
+                columns, rows, totals_columns, totals = load_result(job)
+            else:
+                columns, rows, totals_columns, totals = run_report(
+                    current_report, filter_values, period_range
+                )
+            rows = format_rows_for_display(rows)
+            totals = format_rows_for_display(totals)
         
-        # Вызываем функцию
-        with connection.cursor() as cursor:
-            cursor.execute(
-                f"SELECT * FROM {current_report['func']}(%s)",
-                [filter_json]
-            )
-            
-            if cursor.description:
-                columns = [col[0] for col in cursor.description]
-                for row in cursor.fetchall():
-                    row_dict = {}
-                    for i, col in enumerate(columns):
-                        row_dict[col] = row[i]
-                    data.append(row_dict)
-    
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
+        except ReportBusy as e:
+            busy = e
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
     
     # 5. Контекст для шаблона
     context = {
         'reports': reports,
         'current_report_id': current_report_id,
         'current_report': current_report,
-        'filters': filters_for_template,
+        'filters_panel': filters_panel,
         'columns': columns,
-        'data': data,
+        'rows': rows,
+        'totals_columns': totals_columns,
+        'totals': totals,
+        'period_range': period_range,
+        'period_clipped': period_clipped,
+        'period_max_months': settings.PERIOD_RANGE_MAX_MONTHS,
+        'busy': busy,
+        'job': job,
+        'job_poll_interval': settings.REPORT_JOB_POLL_INTERVAL,
+        'rows_query': rows_query.urlencode(),
+        'background_query': background_query.urlencode(),
+        'render_mode': render_mode,
+        'render_toggle_query': toggle_query.urlencode(),
         'current_user': user,
         'is_doctor_user': not (user.is_accountant() or user.is_superuser),
         'months': get_months_from_db(),
         'years': range(2025, datetime.now().year + 2),
     }
     
-    return render(request, 'dashboard/dynamic_comparison.html', context)
+    response = render(request, 'dashboard/dynamic_comparison.html', context,
+                      status=503 if busy else 200)
+    if busy:
+        response['Retry-After'] = str(busy.retry_after)
+    return response
+
+def _report_job(request, report, filter_values, period_range):
+    """Фоновое задание отчета: по ?job=ID, по ?background=1 или по оценке времени"""
+    try:
+        job_id = request.GET.get('job')
+        if job_id:
+            return get_user_job(request.user, job_id)
+        if request.GET.get('background') == '1' or needs_background(report, filter_values, period_range):
+            return find_or_submit(request.user, report, filter_values, period_range)
+    except Exception as e:
+        print(f"Ошибка фонового задания отчета {report['code']}: {e}")
+    return None
+
+
+def _job_not_ready_response(job):
+    """Ответ API, если задание не найдено или еще не готово"""
+    if job is None:
+        return JsonResponse({'success': False, 'error': 'Задание не найдено'}, status=404)
+    return JsonResponse(dict(job_payload(job), success=False,
+                             error=job.error or 'Отчет еще формируется'), status=409)
+
+
+@login_required
+def report_job_status(request, job_id):
+    """Статус фонового задания отчета (опрашивается страницей отчета)"""
+    job = get_user_job(request.user, job_id)
+    if job is None:
+        return JsonResponse({'success': False, 'error': 'Задание не найдено'}, status=404)
+    return JsonResponse(dict(job_payload(job), success=True))
+
+
+@login_required
+def report_rows(request):
+    """
+    API: строки отчета компактным JSON для виртуальной таблицы.
+    Параметры те же, что у unified_plan_fact, плюс offset/limit для постраничной загрузки.
+    С ?job=ID строки берутся из результата фонового задания.
+    Ответ: {"columns": [...], "rows": [[...], ...], "total": N, "offset": K,
+            "totals_columns": [...], "totals": [[...]]} (итоги - для диапазона месяцев)
+    """
+    user = request.user
+    if request.GET.get('job'):
+        return _job_rows(request)
+    
+    reports = _get_available_reports(user)
+    if not reports:
+        return JsonResponse({'success': False, 'error': 'Отчет не найден'}, status=404)
+    
+    report = _select_report(reports, request.GET.get('report_id'))
+    filters_config = _get_filters_config(report['id'])
+    filter_values = _collect_filter_values(request.GET, user, filters_config)
+    period_range, _ = _parse_period_range(request.GET, filters_config)
+    
+    # Полный результат кэшируется, чтобы страницы не пересчитывали отчет
+    cache_key = 'report_rows_' + hashlib.md5(
+        json.dumps([report['func'], filter_values, period_range, get_data_version()],
+                   sort_keys=True, default=str).encode()
+    ).hexdigest()
+    result = cache.get(cache_key)
+    
+    if result is None:
+        try:
+            columns, rows, totals_columns, totals = run_report(
+                report, filter_values, period_range
+            )
+        except ReportBusy as e:
+            return _busy_response(e)
+        except Exception as e:
+            print(f"Ошибка отчета {report['code']}: {e}")
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+        result = (columns, compact_rows(rows), totals_columns, compact_rows(totals))
+        cache.set(cache_key, result, 300)
+    
+    return _rows_page(request, *result)
+
+
+def _job_rows(request):
+    """Строки готового фонового задания (распакованный результат кэшируется)"""
+    job = get_user_job(request.user, request.GET.get('job'))
+    if job is None or job.status != 'done':
+        return _job_not_ready_response(job)
+    
+    cache_key = f'report_job_rows_{job.id}'
+    result = cache.get(cache_key)
+    if result is None:
+        columns, rows, totals_columns, totals = load_result(job)
+        result = (columns, compact_rows(rows), totals_columns, compact_rows(totals))
+        cache.set(cache_key, result, 300)
+    return _rows_page(request, *result)
+
+
+def _rows_page(request, columns, rows, totals_columns=(), totals=()):
+    """Страница строк для виртуальной таблицы (offset/limit из запроса) и итоги"""
+    try:
+        offset = max(int(request.GET.get('offset', 0)), 0)
+        limit = int(request.GET.get('limit', 0))
+    except (ValueError, TypeError):
+        offset, limit = 0, 0
+    
+    page = rows[offset:offset + limit] if limit > 0 else rows[offset:]
+    return JsonResponse({
+        'success': True,
+        'columns': columns,
+        'rows': page,
+        'total': len(rows),
+        'offset': offset,
+        'totals_columns': list(totals_columns),
+        'totals': list(totals),
+    })
+
+@login_required
+def export_report(request):
+    """
+    Выгрузка отчета в Parquet или Arrow IPC (format=parquet|arrow).
+    Параметры те же, что у unified_plan_fact. Файл формируется потоком.
+    """
+    user = request.user
+    reports = _get_available_reports(user)
+    if not reports:
+        return JsonResponse({'success': False, 'error': 'Отчет не найден'}, status=404)
+    
+    fmt = request.GET.get('format', 'parquet')
+    if fmt not in FORMATS:
+        return JsonResponse({'success': False, 'error': 'Неизвестный формат'}, status=400)
+    
+    report = _select_report(reports, request.GET.get('report_id'))
+    content_type, extension = FORMATS[fmt]
+    
+    # Результат фонового задания уже готов - функция не вызывается повторно
+    if request.GET.get('job'):
+        job = get_user_job(user, request.GET.get('job'))
+        if job is None or job.status != 'done':
+            return _job_not_ready_response(job)
+        columns, rows, _, _ = load_result(job)
+        response = HttpResponse(content_type=content_type)
+        write_rows(columns, rows, response, fmt)
+        response['Content-Disposition'] = f'attachment; filename="{job.report_code}.{extension}"'
+        return response
+    
+    filters_config = _get_filters_config(report['id'])
+    filter_values = _collect_filter_values(request.GET, user, filters_config)
+    
+    # Первая порция готовится до ответа: ошибка - статус 500, а не оборванный файл
+    try:
+        content = stream_report(report['func'], filter_values, fmt)
+    except Exception as e:
+        print(f"Ошибка выгрузки отчета {report['code']}: {e}")
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{report["code"]}.{extension}"'
+    return response
 
 def smart_redirect(request):
     """
@@ -368,59 +761,37 @@ def get_report_config(request):
     
     return JsonResponse({'filters': filters})
 
+@login_required
 def get_report_data(request):
-    """API для получения данных отчета"""
+    """
+    API для получения данных отчета.
+    Принимаются только фильтры отчета (по filter_code или param_name),
+    врачу фильтр по врачу подставляется принудительно.
+    """
     try:
         report_id = request.GET.get('report_id')
+        report = next((r for r in _get_available_reports(request.user)
+                       if str(r['id']) == report_id), None)
+        if report is None:
+            return JsonResponse({'success': False, 'error': 'Отчет не найден'})
         
-        # Получаем функцию отчета из БД
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                SELECT sql_function_name 
-                FROM kpi.reports 
-                WHERE id = %s
-            """, [report_id])
-            result = cursor.fetchone()
-            if not result:
-                return JsonResponse({'success': False, 'error': 'Отчет не найден'})
-            
-            func_name = result[0]
+        # Параметры - только из настроек фильтров отчета
+        filters_config = _get_filters_config(report['id'])
+        query = _params_query(dict(request.GET.lists()), filters_config)
+        params = _collect_filter_values(query, request.user, filters_config)
         
-        # Собираем все параметры из GET в JSON
-        params = {}
-        for key, value in request.GET.items():
-            if key != 'report_id':
-                # Проверяем, может ли это быть массивом
-                if key in request.GET.getlist(key) and len(request.GET.getlist(key)) > 1:
-                    params[key] = request.GET.getlist(key)
-                else:
-                    params[key] = value
+        # Вызываем функцию (за замороженный месяц - из снимка)
+        columns, rows = execute_report_function(report['func'], params)
+        data = [dict(zip(columns, row)) for row in rows]
         
-        # Вызываем функцию
-        with connection.cursor() as cursor:
-            cursor.execute(f"SELECT * FROM {func_name}(%s)", [json.dumps(params)])
-            
-            if cursor.description:
-                columns = [col[0] for col in cursor.description]
-                data = []
-                for row in cursor.fetchall():
-                    row_dict = {}
-                    for i, col in enumerate(columns):
-                        row_dict[col] = row[i]
-                    data.append(row_dict)
-                
-                return JsonResponse({
-                    'success': True,
-                    'columns': columns,
-                    'data': data
-                })
-            else:
-                return JsonResponse({
-                    'success': True,
-                    'columns': [],
-                    'data': []
-                })
+        return JsonResponse({
+            'success': True,
+            'columns': columns,
+            'data': data
+        })
                 
+    except ReportBusy as e:
+        return _busy_response(e)
     except Exception as e:
         import traceback
         print(traceback.format_exc())
@@ -430,26 +801,96 @@ def get_report_data(request):
         })
 
 
-def dynamic_dashboard(request):
-    """Новый динамический дашборд (настраивается через БД)"""
-    from django.db import connection
-    from datetime import datetime
-    import json
+def _parse_period(request):
+    """Год и месяц из GET-параметров (по умолчанию - текущие)"""
+    p_year = request.GET.get('year', datetime.now().year)
+    p_month = request.GET.get('month', datetime.now().month)
+    
+    try:
+        p_year = int(p_year)
+        p_month = int(p_month)
+    except (ValueError, TypeError):
+        p_year = datetime.now().year
+        p_month = datetime.now().month
+    
+    return p_year, p_month
+
+
+def _heatmap_payload(widget, columns, rows):
+    """Матрица тепловой карты с номерами диапазонов оценок (kpi.performance_grades)"""
+    params, options = widget_config(widget)
+    row_field, column_field, value_field = heatmap_fields(widget, options)
+    column_keys = column_labels = None
+    if not column_field:
+        column_field, column_keys = MONTH_FIELD, YEAR_MONTHS
+        column_labels = dict(get_months_from_db())
+    
+    if not rows or not {row_field, column_field, value_field} <= set(columns):
+        rows = []
+    return heatmap_payload(
+        columns, rows, row_field, column_field, value_field,
+        column_keys=column_keys,
+        column_labels=column_labels,
+        rules=get_all_active_rules(),
+        row_limit=widget_limit(widget),
+    )
+
+
+def _widget_payload(widget, columns, rows):
+    """Готовит данные виджета для отрисовки из результата SQL-функции"""
+    if widget['widget_type'] == 'heatmap':
+        return {
+            'code': widget['code'],
+            'type': widget['widget_type'],
+            'chart_type': widget['chart_type'],
+            **_heatmap_payload(widget, columns, rows),
+        }
+    
+    limit_records = widget_limit(widget)
+    if limit_records:
+        rows = rows[:limit_records]
     
+    payload = {
+        'code': widget['code'],
+        'type': widget['widget_type'],
+        'chart_type': widget['chart_type'],
+    }
+    if widget['widget_type'] != 'chart':
+        return dict(payload, columns=columns, rows=rows)
+    
+    # График получает только подписи и значения ряда, без строк результата;
+    # длинные ряды прореживаются на сервере
+    labels = []
+    values = []
+    x_field, y_field = widget['x_field'], widget['y_field']
+    if rows and x_field in columns and y_field in columns:
+        x_index = columns.index(x_field)
+        y_index = columns.index(y_field)
+        labels = [str(row[x_index]) for row in rows]
+        values = [float(row[y_index] or 0) for row in rows]
+        params, options = widget_config(widget)
+        labels, values = downsample_series(labels, values, options.get('_downsample'))
+    return dict(payload, labels=labels, values=values)
+
+
+def _widget_cache_key(code, p_year, p_month):
+    # После синхронизации виджеты сразу считаются заново (страница получает событие sync)
+    return f'dashboard_widget_{code}_{p_year}_{p_month}_{get_data_version()}'
+
+
+@login_required
+def dynamic_dashboard(request):
+    """
+    Новый динамический дашборд (настраивается через БД).
+    Страница отдается сразу (фильтры, дата синхронизации, каркас виджетов),
+    данные каждого виджета браузер загружает отдельно через widget_data.
+    """
     # Если не заведующий и не админ - редирект на данные врача
     if not (request.user.is_accountant() or request.user.is_superuser):
         return redirect('plan_fact')
     
     # Получаем активный дашборд
-    with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT id, code, name
-            FROM kpi.dashboards
-            WHERE is_active = true
-            ORDER BY sort_order
-            LIMIT 1
-        """)
-        dashboard = cursor.fetchone()
+    dashboard = get_active_dashboard()
     
     if not dashboard:
         return render(request, 'dashboard/access_denied.html', {
@@ -458,91 +899,23 @@ def dynamic_dashboard(request):
     
     dashboard_id, dashboard_code, dashboard_name = dashboard
     
-    # Получаем виджеты дашборда
-    with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT code, name, widget_type, chart_type,
-                   sql_function_name, sql_params,
-                   x_field, y_field, limit_records, width, height
-            FROM kpi.dashboard_widgets
-            WHERE dashboard_id = %s
-            ORDER BY sort_order
-        """, [dashboard_id])
-        widgets = cursor.fetchall()
-    
-    # Параметры из GET
-    p_year = request.GET.get('year', datetime.now().year)
-    p_month = request.GET.get('month', datetime.now().month)
-    
-    try:
-        p_year = int(p_year)
-        p_month = int(p_month)
-    except:
-        p_year = datetime.now().year
-        p_month = datetime.now().month
-
-    # Получаем дату последней синхронизации
-    last_sync = None
-    with connection.cursor() as cursor:
-        cursor.execute("""
-            select solution_med.import_date()
-        """)
-        row = cursor.fetchone()
-        if row and row[0]:
-            last_sync = row[0]
-    
-    # Создаём ключ для кэша (зависит от пользователя, года, месяца)
-    cache_key = f'dashboard_{request.user.pk}_{p_year}_{p_month}'
+    # Только описание виджетов - без выполнения SQL-функций
+    widgets = [
+        {
+            'code': widget['code'],
+            'name': widget['name'],
+            'type': widget['widget_type'],
+            'chart_type': widget['chart_type'],
+            'width': widget['width'] or 6,
+            'height': widget['height'] or 400,
+        }
+        for widget in get_dashboard_widgets(dashboard_id)
+    ]
     
-    # Пробуем получить данные из кэша
-    widgets_data = cache.get(cache_key)
-
-    if widgets_data is None:
+    p_year, p_month = _parse_period(request)
 
-        widgets_data = []
-        for widget in widgets:
-            (code, name, widget_type, chart_type,
-            sql_function_name, sql_params,
-            x_field, y_field, limit_records, width, height) = widget
-            
-            params = json.loads(sql_params) if sql_params else {}
-            params['p_year'] = p_year
-            params['p_month'] = p_month
-            
-            data = []
-            try:
-                params_json = json.dumps(params)
-                with connection.cursor() as cursor:
-                    cursor.execute(f"SELECT * FROM {sql_function_name}(%s)", [params_json])
-                    columns = [col[0] for col in cursor.description]
-                    for row in cursor.fetchall():
-                        data.append(dict(zip(columns, row)))
-                    if limit_records and limit_records > 0:
-                        data = data[:limit_records]
-            except Exception as e:
-                print(f"Ошибка виджета {code}: {e}")
-                data = []
-            
-            labels = []
-            values = []
-            if data and x_field and y_field:
-                labels = [str(row.get(x_field, '')) for row in data]
-                values = [float(row.get(y_field, 0)) for row in data]
-            
-            widgets_data.append({
-                'code': code,
-                'name': name,
-                'type': widget_type,
-                'chart_type': chart_type,
-                'width': width or 6,
-                'height': height or 400,
-                'data': data,
-                'labels': json.dumps(labels),
-                'values': json.dumps(values),
-            })
-        
-        # Сохраняем в кэш на 5 минут
-        cache.set(cache_key, widgets_data, 300)
+    # Дата последней синхронизации; версия - для событий sync (apps/dashboard/events.py)
+    last_sync, data_version = read_import_date()
     
     # Месяцы для фильтра
     months = []
@@ -553,13 +926,189 @@ def dynamic_dashboard(request):
     years = range(2024, datetime.now().year + 2)
     
     context = {
-        'widgets': widgets_data,
+        'widgets': widgets,
         'year': p_year,
         'month': p_month,
         'months': months,
         'years': years,
         'current_user': request.user,
         'last_sync': last_sync,
+        'data_version': data_version,
     }
     
-    return render(request, 'dashboard/dashboard_dynamic.html', context)
\ No newline at end of file
+    return render(request, 'dashboard/dashboard_dynamic.html', context)
+
+
+@login_required
+def widget_data(request, code):
+    """API: данные одного виджета активного дашборда (JSON)"""
+    if not (request.user.is_accountant() or request.user.is_superuser):
+        return JsonResponse({'success': False, 'error': 'Доступ запрещен'}, status=403)
+    
+    p_year, p_month = _parse_period(request)
+    
+    # Ключ кэша зависит от виджета, года и месяца
+    cache_key = _widget_cache_key(code, p_year, p_month)
+    payload = cache.get(cache_key)
+    
+    if payload is None:
+        dashboard = get_active_dashboard()
+        widgets = get_dashboard_widgets(dashboard[0]) if dashboard else []
+        plan = plan_widget_calls(widgets, p_year, p_month)
+        if code not in plan:
+            return JsonResponse({'success': False, 'error': 'Виджет не найден'}, status=404)
+        
+        # Один вызов на группу виджетов с одинаковой функцией и параметрами
+        call = plan[code]
+        try:
+            columns, rows = execute_report_function(*call)
+        except ReportBusy as e:
+            return _busy_response(e)
+        except Exception as e:
+            print(f"Ошибка виджета {code}: {e}")
+            return JsonResponse({'success': False, 'error': str(e)}, status=500)
+        
+        # Данные всех виджетов группы сохраняем в кэш на 5 минут
+        for widget in widgets:
+            if plan[widget['code']] != call:
+                continue
+            widget_payload = _widget_payload(widget, columns, rows)
+            cache.set(_widget_cache_key(widget['code'], p_year, p_month), widget_payload, 300)
+            if widget['code'] == code:
+                payload = widget_payload
+    
+    return JsonResponse({'success': True, **payload})
+
+
+def _batch_period(params):
+    """Год и месяц элемента пакета (year/month или p_year/p_month)"""
+    try:
+        p_year = int(params.get('year', params.get('p_year', datetime.now().year)))
+        p_month = int(params.get('month', params.get('p_month', datetime.now().month)))
+    except (ValueError, TypeError):
+        p_year = datetime.now().year
+        p_month = datetime.now().month
+    return p_year, p_month
+
+
+@login_required
+@require_POST
+def batch_data(request):
+    """
+    API: данные нескольких отчетов и виджетов за один запрос.
+    Тело запроса (JSON):
+        {"items": [
+            {"id": "a", "report_id": 3, "params": {"p_year": 2025, "p_month": 5}},
+            {"id": "b", "widget": "top_doctors", "params": {"year": 2025, "month": 5}}
+        ]}
+    Параметры отчета проверяются по его фильтрам, как на странице отчета
+    (лишние отбрасываются, фильтр врача подставляется принудительно).
+    Проверки доступа выполняются один раз для всего пакета, SQL-функции -
+    параллельно. Ответ содержит результат или ошибку для каждого элемента.
+    """
+    user = request.user
+    
+    try:
+        items = json.loads(request.body or '{}').get('items')
+    except (ValueError, AttributeError):
+        items = None
+    
+    if not isinstance(items, list) or not items:
+        return JsonResponse({'success': False, 'error': 'Не передан список items'}, status=400)
+    if len(items) > settings.REPORT_BATCH_MAX_ITEMS:
+        return JsonResponse({
+            'success': False,
+            'error': f'Не более {settings.REPORT_BATCH_MAX_ITEMS} элементов в запросе'
+        }, status=400)
+    
+    # Метаданные загружаем один раз на весь пакет
+    reports = {r['id']: r for r in _get_available_reports(user)}
+    
+    # Настройки фильтров - один раз на отчет пакета
+    filters_configs = {}
+    
+    widgets = {}
+    if not _is_doctor_user(user):
+        dashboard = get_active_dashboard()
+        if dashboard:
+            widgets = {w['code']: w for w in get_dashboard_widgets(dashboard[0])}
+    
+    # Планы вызовов виджетов по периодам (общие вызовы для групп виджетов)
+    widget_plans = {}
+    
+    # Проверяем элементы и собираем вызовы
+    results = []
+    calls = []
+    pending = []  # (индекс результата, виджет или None, ключ кэша)
+    
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({'id': None, 'success': False, 'error': 'Некорректный элемент'})
+            continue
+        
+        result = {'id': item.get('id', index)}
+        results.append(result)
+        params = item.get('params') or {}
+        if not isinstance(params, dict):
+            result.update(success=False, error='params должен быть объектом')
+            continue
+        
+        if 'widget' in item:
+            widget = widgets.get(item['widget'])
+            if not widget:
+                result.update(success=False, error='Виджет не найден')
+                continue
+            
+            p_year, p_month = _batch_period(params)
+            cache_key = _widget_cache_key(widget['code'], p_year, p_month)
+            payload = cache.get(cache_key)
+            if payload is not None:
+                result.update(success=True, **payload)
+                continue
+            
+            if (p_year, p_month) not in widget_plans:
+                widget_plans[(p_year, p_month)] = plan_widget_calls(
+                    widgets.values(), p_year, p_month
+                )
+            calls.append(widget_plans[(p_year, p_month)][widget['code']])
+            pending.append((index, widget, cache_key))
+        else:
+            try:
+                report = reports.get(int(item.get('report_id')))
+            except (ValueError, TypeError):
+                report = None
+            if not report:
+                result.update(success=False, error='Отчет не найден')
+                continue
+            
+            # Те же фильтры, что на странице отчета: только настроенные
+            # параметры, врач видит только свои данные
+            if report['id'] not in filters_configs:
+                filters_configs[report['id']] = _get_filters_config(report['id'])
+            filters_config = filters_configs[report['id']]
+            params = _collect_filter_values(_params_query(params, filters_config), user, filters_config)
+            
+            calls.append((report['func'], params, None))
+            pending.append((index, None, None))
+    
+    # Выполняем все SQL-функции пакета параллельно
+    for (index, widget, cache_key), outcome in zip(pending, execute_many(calls)):
+        result = results[index]
+        if isinstance(outcome, ReportBusy):
+            result.update(success=False, busy=True, error=str(outcome),
+                          retry_after=outcome.retry_after)
+            continue
+        if isinstance(outcome, Exception):
+            print(f"Ошибка пакетного запроса ({result['id']}): {outcome}")
+            result.update(success=False, error=str(outcome))
+            continue
+        
+        columns, rows = outcome
+        if widget:
+            payload = _widget_payload(widget, columns, rows)
+            cache.set(cache_key, payload, 300)
+            result.update(success=True, **payload)
+        else:
+            result.update(success=True, columns=columns, rows=rows)
+    
+    return JsonResponse({'success': True, 'results': results})
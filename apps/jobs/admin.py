@@ -0,0 +1,48 @@
+# apps/jobs/admin.py
+
+from django.contrib import admin
+from django.core.cache import cache
+
+from .models import BackgroundReport, ReportJob
+
+
+@admin.register(BackgroundReport)
+class BackgroundReportAdmin(admin.ModelAdmin):
+    list_display = ['report_code', 'mode', 'threshold_ms', 'comment']
+    list_editable = ['mode', 'threshold_ms']
+    search_fields = ['report_code', 'comment']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        cache.delete('background_report_modes')
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        cache.delete('background_report_modes')
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        cache.delete('background_report_modes')
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'report_code', 'user', 'status', 'backend',
+                    'duration_display', 'row_count', 'size_bytes']
+    list_filter = ['status', 'backend', 'report_code']
+    search_fields = ['report_code', 'function_name', 'user__login']
+    date_hierarchy = 'created_at'
+    exclude = ['result', 'totals']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('result', 'totals')
+
+    def duration_display(self, obj):
+        return f"{obj.duration_ms / 1000:.1f} с" if obj.duration_ms is not None else '—'
+    duration_display.short_description = 'Время'
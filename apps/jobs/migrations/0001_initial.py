@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_code', models.CharField(help_text='kpi.reports.report_code', max_length=100, unique=True, verbose_name='Код отчета')),
+                ('mode', models.CharField(choices=[('always', 'Всегда в фоне'), ('auto', 'По оценке времени'), ('never', 'Никогда')], default='always', max_length=10, verbose_name='Режим')),
+                ('threshold_ms', models.IntegerField(blank=True, help_text='Для режима "по оценке времени"; пусто - REPORT_BACKGROUND_THRESHOLD_MS', null=True, verbose_name='Порог, мс')),
+                ('comment', models.CharField(blank=True, max_length=255, verbose_name='Комментарий')),
+            ],
+            options={
+                'verbose_name': 'Фоновый режим отчета',
+                'verbose_name_plural': 'Фоновые режимы отчетов',
+                'ordering': ['report_code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_id', models.IntegerField(verbose_name='Отчет (kpi.reports.id)')),
+                ('report_code', models.CharField(max_length=100, verbose_name='Код отчета')),
+                ('function_name', models.CharField(max_length=200, verbose_name='SQL-функция')),
+                ('params', models.JSONField(default=dict, verbose_name='Параметры')),
+                ('period_range', models.JSONField(blank=True, null=True, verbose_name='Диапазон месяцев')),
+                ('params_key', models.CharField(db_index=True, max_length=32, verbose_name='Ключ параметров')),
+                ('data_version', models.CharField(blank=True, max_length=50, verbose_name='Версия данных')),
+                ('status', models.CharField(choices=[('queued', 'В очереди'), ('running', 'Выполняется'), ('done', 'Готов'), ('failed', 'Ошибка')], db_index=True, default='queued', max_length=10, verbose_name='Статус')),
+                ('backend', models.CharField(blank=True, help_text='celery или local (поток веб-процесса)', max_length=10, verbose_name='Исполнитель')),
+                ('task_id', models.CharField(blank=True, max_length=100, verbose_name='Задача celery')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Начато')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Завершено')),
+                ('duration_ms', models.FloatField(blank=True, null=True, verbose_name='Время выполнения, мс')),
+                ('row_count', models.IntegerField(blank=True, null=True, verbose_name='Строк')),
+                ('size_bytes', models.IntegerField(blank=True, null=True, verbose_name='Размер, байт')),
+                ('result', models.BinaryField(null=True, verbose_name='Результат')),
+                ('totals', models.BinaryField(null=True, verbose_name='Итоги за диапазон')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Фоновое задание отчета',
+                'verbose_name_plural': 'Фоновые задания отчетов',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
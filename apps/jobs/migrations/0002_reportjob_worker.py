@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='worker',
+            field=models.CharField(blank=True, help_text='Для local: сервер и PID веб-процесса (host:pid)', max_length=100, verbose_name='Процесс'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# apps/jobs/models.py
+
+from django.conf import settings
+from django.db import models
+
+class BackgroundReport(models.Model):
+    """Режим выполнения отчета: всегда в фоне, по оценке времени или никогда"""
+    MODE_CHOICES = [
+        ('always', 'Всегда в фоне'),
+        ('auto', 'По оценке времени'),
+        ('never', 'Никогда'),
+    ]
+
+    report_code = models.CharField(max_length=100, unique=True, verbose_name='Код отчета',
+                                   help_text='kpi.reports.report_code')
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default='always', verbose_name='Режим')
+    threshold_ms = models.IntegerField(null=True, blank=True, verbose_name='Порог, мс',
+                                       help_text='Для режима "по оценке времени"; пусто - REPORT_BACKGROUND_THRESHOLD_MS')
+    comment = models.CharField(max_length=255, blank=True, verbose_name='Комментарий')
+
+    class Meta:
+        ordering = ['report_code']
+        verbose_name = 'Фоновый режим отчета'
+        verbose_name_plural = 'Фоновые режимы отчетов'
+
+    def __str__(self):
+        return f"{self.report_code}: {self.get_mode_display()}"
+
+
+class ReportJob(models.Model):
+    """Задание на выполнение отчета в фоне; результат - колонки и строки (zlib)"""
+    STATUS_CHOICES = [
+        ('queued', 'В очереди'),
+        ('running', 'Выполняется'),
+        ('done', 'Готов'),
+        ('failed', 'Ошибка'),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                             related_name='report_jobs', verbose_name='Пользователь')
+    report_id = models.IntegerField(verbose_name='Отчет (kpi.reports.id)')
+    report_code = models.CharField(max_length=100, verbose_name='Код отчета')
+    function_name = models.CharField(max_length=200, verbose_name='SQL-функция')
+    params = models.JSONField(default=dict, verbose_name='Параметры')
+    period_range = models.JSONField(null=True, blank=True, verbose_name='Диапазон месяцев')
+    params_key = models.CharField(max_length=32, db_index=True, verbose_name='Ключ параметров')
+    data_version = models.CharField(max_length=50, blank=True, verbose_name='Версия данных')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued',
+                              db_index=True, verbose_name='Статус')
+    backend = models.CharField(max_length=10, blank=True, verbose_name='Исполнитель',
+                               help_text='celery или local (поток веб-процесса)')
+    task_id = models.CharField(max_length=100, blank=True, verbose_name='Задача celery')
+    worker = models.CharField(max_length=100, blank=True, verbose_name='Процесс',
+                              help_text='Для local: сервер и PID веб-процесса (host:pid)')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Создано')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Начато')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Завершено')
+    duration_ms = models.FloatField(null=True, blank=True, verbose_name='Время выполнения, мс')
+    row_count = models.IntegerField(null=True, blank=True, verbose_name='Строк')
+    size_bytes = models.IntegerField(null=True, blank=True, verbose_name='Размер, байт')
+    result = models.BinaryField(null=True, verbose_name='Результат')
+    totals = models.BinaryField(null=True, verbose_name='Итоги за диапазон')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Фоновое задание отчета'
+        verbose_name_plural = 'Фоновые задания отчетов'
+
+    def __str__(self):
+        return f"{self.report_code} ({self.get_status_display()}, {self.created_at:%d.%m.%Y %H:%M})"
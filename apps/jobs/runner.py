@@ -0,0 +1,295 @@
+# apps/jobs/runner.py
+
+"""
+Фоновое выполнение долгих отчетов.
+
+Отчет уходит в фон, если так настроено в админке (Фоновые режимы отчетов)
+или если ожидаемое время выполнения (apps.core.report_cost) больше порога.
+Задание выполняет celery (CELERY_BROKER_URL в .env, запуск
+celery -A kpi_core worker), без брокера - пул потоков веб-процесса.
+Страница отчета опрашивает статус задания и показывает готовый
+результат виртуальной таблицей (строки отдаются страницами).
+
+Одинаковое задание пользователя (отчет, фильтры, версия данных) не
+создается повторно. Задание, которое не завершилось за REPORT_JOB_TIMEOUT,
+считается прерванным. Локальное задание погибает вместе с веб-процессом
+(перезапуск после WEB_MAX_REQUESTS запросов, обновление): у задания
+записан процесс (host:pid), и если на этом сервере его больше нет, задание
+сразу помечается прерванным - при опросе статуса и при запуске пула
+в новом процессе.
+"""
+
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+from apps.core.admission import ReportBusy
+from apps.core.db_utils import get_data_version
+from apps.core.period_snapshots import get_snapshot, pack, params_key, unpack
+from apps.core.periods import run_report, uncached_months
+from apps.core.report_cost import estimate_ms
+
+from .models import BackgroundReport, ReportJob
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+_local_executor = None
+
+
+def background_modes():
+    """{код отчета: (режим, порог в мс)}"""
+    modes = cache.get('background_report_modes')
+    if modes is None:
+        try:
+            modes = {
+                r.report_code: (r.mode, r.threshold_ms)
+                for r in BackgroundReport.objects.all()
+            }
+        except Exception as e:
+            print(f"Ошибка загрузки режимов фоновых отчетов: {e}")
+            modes = {}
+        cache.set('background_report_modes', modes, 300)
+    return modes
+
+
+def estimate_report_ms(func_name, filter_values, period_range=None):
+    """Ожидаемое время отчета в мс или None, если оценить нельзя"""
+    if not period_range:
+        if get_snapshot(func_name, filter_values) is not None:
+            return 0
+        return estimate_ms(func_name, filter_values)
+
+    # Диапазон: считаются только месяцы, которых нет в кэше, параллельно
+    params = {k: v for k, v in filter_values.items() if k not in ('p_year', 'p_month')}
+    months = uncached_months(func_name, params, *period_range)
+    estimates = [
+        estimate_ms(func_name, dict(params, p_year=year, p_month=month))
+        for year, month in months
+    ]
+    if not estimates:
+        return 0
+    if None in estimates:
+        return None
+    return sum(estimates) / min(len(estimates), settings.REPORT_PARALLEL_WORKERS)
+
+
+def needs_background(report, filter_values, period_range=None):
+    mode, threshold_ms = background_modes().get(report['code'], ('auto', None))
+    if mode != 'auto':
+        return mode == 'always'
+    estimate = estimate_report_ms(report['func'], filter_values, period_range)
+    return estimate is not None and estimate >= (threshold_ms or settings.REPORT_BACKGROUND_THRESHOLD_MS)
+
+
+def _job_key(func_name, filter_values, period_range):
+    return params_key([func_name, filter_values, period_range or []])
+
+
+def _worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _worker_alive(worker):
+    """Процесс локального задания работает (процессы других серверов не проверяются)"""
+    host, _, pid = worker.rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _is_stale(job):
+    if job.status not in ACTIVE_STATUSES:
+        return False
+    if job.backend == 'local' and job.worker and not _worker_alive(job.worker):
+        return True
+    deadline = timezone.now() - timedelta(seconds=settings.REPORT_JOB_TIMEOUT)
+    return job.created_at < deadline
+
+
+def _mark_interrupted(job_ids):
+    ReportJob.objects.filter(id__in=job_ids, status__in=ACTIVE_STATUSES).update(
+        status='failed', finished_at=timezone.now(),
+        error='Задание прервано (превышено время выполнения или перезапуск сервера)',
+    )
+
+
+def refresh_status(job):
+    """Зависшее задание помечается прерванным"""
+    if _is_stale(job):
+        _mark_interrupted([job.id])
+        job.refresh_from_db()
+    return job
+
+
+def fail_orphaned_jobs():
+    """Локальные задания завершившихся процессов этого сервера - прерванные"""
+    jobs = (ReportJob.objects
+            .filter(status__in=ACTIVE_STATUSES, backend='local',
+                    worker__startswith=f'{socket.gethostname()}:')
+            .values_list('id', 'worker'))
+    _mark_interrupted([job_id for job_id, worker in jobs if not _worker_alive(worker)])
+
+
+def cleanup_jobs():
+    """Удаляет задания старше REPORT_JOB_KEEP_HOURS"""
+    border = timezone.now() - timedelta(hours=settings.REPORT_JOB_KEEP_HOURS)
+    ReportJob.objects.filter(created_at__lt=border).delete()
+
+
+def find_or_submit(user, report, filter_values, period_range=None):
+    """Готовое или выполняющееся задание с теми же параметрами, иначе новое"""
+    key = _job_key(report['func'], filter_values, period_range)
+    data_version = get_data_version()
+    job = (ReportJob.objects
+           .filter(user=user, params_key=key, data_version=data_version)
+           .exclude(status='failed')
+           .defer('result', 'totals')
+           .first())
+    if job and refresh_status(job).status != 'failed':
+        return job
+
+    cleanup_jobs()
+    job = ReportJob.objects.create(
+        user=user,
+        report_id=report['id'],
+        report_code=report['code'],
+        function_name=report['func'],
+        params=filter_values,
+        period_range=period_range,
+        params_key=key,
+        data_version=data_version,
+    )
+    dispatch(job)
+    return job
+
+
+def _get_local_executor():
+    global _local_executor
+    if _local_executor is None:
+        # Новый процесс: задания предыдущих (перезапущенных) процессов уже не выполнятся
+        try:
+            fail_orphaned_jobs()
+        except Exception as e:
+            print(f"Ошибка проверки прерванных заданий: {e}")
+        _local_executor = ThreadPoolExecutor(
+            max_workers=settings.REPORT_JOB_LOCAL_WORKERS,
+            thread_name_prefix='report-job',
+        )
+    return _local_executor
+
+
+def _run_local(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def dispatch(job):
+    """Ставит задание в очередь celery или в локальный пул потоков"""
+    if settings.CELERY_BROKER_URL:
+        try:
+            from jobs.tasks import run_report_job
+            task = run_report_job.delay(job.id)
+            ReportJob.objects.filter(id=job.id).update(backend='celery', task_id=task.id)
+            return
+        except Exception as e:
+            print(f"Очередь celery недоступна, задание {job.id} выполняется локально: {e}")
+
+    ReportJob.objects.filter(id=job.id).update(backend='local', worker=_worker_id())
+    _get_local_executor().submit(_run_local, job.id)
+
+
+def _execute(job):
+    report = {'code': job.report_code, 'func': job.function_name}
+    period_range = tuple(tuple(month) for month in job.period_range) if job.period_range else None
+    deadline = time.monotonic() + settings.REPORT_JOB_TIMEOUT
+
+    # В фоне занятость функции - не ошибка: ждем свободного слота
+    while True:
+        try:
+            return run_report(report, job.params, period_range)
+        except ReportBusy as e:
+            if time.monotonic() + e.retry_after >= deadline:
+                raise
+            time.sleep(e.retry_after)
+
+
+def run_job(job_id):
+    """Выполняет задание (в процессе celery или в потоке веб-процесса)"""
+    # Повторная доставка задачи не запускает выполнение второй раз
+    started = ReportJob.objects.filter(id=job_id, status='queued').update(
+        status='running', started_at=timezone.now()
+    )
+    if not started:
+        return
+
+    job = ReportJob.objects.defer('result', 'totals').get(id=job_id)
+    started_at = time.monotonic()
+    try:
+        columns, rows, totals_columns, totals = _execute(job)
+    except Exception as e:
+        print(f"Ошибка фонового отчета {job.report_code}: {e}")
+        ReportJob.objects.filter(id=job_id).update(
+            status='failed', finished_at=timezone.now(), error=str(e),
+            duration_ms=(time.monotonic() - started_at) * 1000,
+        )
+        return
+
+    result = pack(columns, rows)
+    ReportJob.objects.filter(id=job_id).update(
+        status='done',
+        finished_at=timezone.now(),
+        duration_ms=(time.monotonic() - started_at) * 1000,
+        row_count=len(rows),
+        size_bytes=len(result),
+        result=result,
+        totals=pack(totals_columns, totals),
+    )
+
+
+def get_user_job(user, job_id):
+    """Задание пользователя или None"""
+    try:
+        job = ReportJob.objects.defer('result', 'totals').get(id=int(job_id), user=user)
+    except (ReportJob.DoesNotExist, ValueError, TypeError):
+        return None
+    return refresh_status(job)
+
+
+def load_result(job):
+    """(columns, rows, totals_columns, totals) готового задания"""
+    data = ReportJob.objects.filter(id=job.id).values_list('result', 'totals').first()
+    if not data or data[0] is None:
+        return [], [], [], []
+    columns, rows = unpack(data[0])
+    totals_columns, totals = unpack(data[1]) if data[1] is not None else ([], [])
+    return columns, rows, totals_columns, totals
+
+
+def job_payload(job):
+    """Статус задания для опроса со страницы отчета"""
+    now = timezone.now()
+    return {
+        'id': job.id,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'report_code': job.report_code,
+        'elapsed_seconds': round(((job.finished_at or now) - job.created_at).total_seconds()),
+        'duration_ms': job.duration_ms,
+        'row_count': job.row_count,
+        'error': job.error,
+    }
@@ -0,0 +1,12 @@
+# apps/jobs/tasks.py
+
+"""Задачи celery (находятся через autodiscover_tasks в kpi_core/celery.py)"""
+
+from celery import shared_task
+
+from .runner import run_job
+
+
+@shared_task(ignore_result=True)
+def run_report_job(job_id):
+    run_job(job_id)
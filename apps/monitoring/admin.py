@@ -0,0 +1,197 @@
+# apps/monitoring/admin.py
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.db.models import Avg, Count, Max
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from .advisor import AdvisorUnavailable, build_report
+from .models import SlowCallThreshold, SlowCall, RequestProfile
+
+
+@admin.register(SlowCallThreshold)
+class SlowCallThresholdAdmin(admin.ModelAdmin):
+    list_display = ['function_name', 'threshold_ms', 'is_enabled', 'comment']
+    list_editable = ['threshold_ms', 'is_enabled']
+    search_fields = ['function_name', 'comment']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        cache.delete('slow_call_thresholds')
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        cache.delete('slow_call_thresholds')
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        cache.delete('slow_call_thresholds')
+
+
+@admin.register(SlowCall)
+class SlowCallAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'function_name', 'duration_display', 'threshold_ms',
+                    'database', 'data_version', 'plan_captured']
+    list_filter = ['function_name', 'database', 'created_at']
+    search_fields = ['function_name', 'plan']
+    date_hierarchy = 'created_at'
+    change_list_template = 'admin/slowcall_changelist.html'
+    readonly_fields = ['created_at', 'function_name', 'params', 'row_limit', 'duration_ms',
+                       'threshold_ms', 'explain_duration_ms', 'database', 'data_version',
+                       'plan_display', 'nested_plans_display', 'error']
+
+    fieldsets = (
+        ('Вызов', {
+            'fields': ('created_at', 'function_name', 'params', 'row_limit',
+                       'duration_ms', 'threshold_ms', 'database', 'data_version')
+        }),
+        ('План выполнения', {
+            'fields': ('explain_duration_ms', 'plan_display', 'nested_plans_display', 'error'),
+        }),
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('advisor/', self.admin_site.admin_view(self.advisor_view),
+                 name='monitoring_slowcall_advisor'),
+        ]
+        return custom_urls + urls
+
+    def advisor_view(self, request):
+        """Советы по индексам: pg_stat_statements и статистика таблиц"""
+        order = 'mean' if request.GET.get('order') == 'mean' else 'total'
+        report, error = None, None
+        try:
+            report = build_report(order=order)
+        except AdvisorUnavailable as e:
+            error = str(e)
+        except Exception as e:
+            print(f"Ошибка советника по индексам: {e}")
+            error = str(e)
+
+        return render(request, 'admin/index_advisor.html', {
+            **self.admin_site.each_context(request),
+            'title': 'Советы по индексам',
+            'opts': self.model._meta,
+            'order': order,
+            'report': report,
+            'error': error,
+        })
+
+    def changelist_view(self, request, extra_context=None):
+        # Сводка по функциям: сколько медленных вызовов и насколько
+        extra_context = extra_context or {}
+        extra_context['summary'] = (
+            SlowCall.objects.values('function_name')
+            .annotate(calls=Count('id'), avg_ms=Avg('duration_ms'), max_ms=Max('duration_ms'))
+            .order_by('-max_ms')[:20]
+        )
+        return super().changelist_view(request, extra_context)
+
+    def duration_display(self, obj):
+        return f"{obj.duration_ms:.0f} мс"
+    duration_display.short_description = 'Время'
+    duration_display.admin_order_field = 'duration_ms'
+
+    def plan_captured(self, obj):
+        return not obj.error
+    plan_captured.boolean = True
+    plan_captured.short_description = 'План снят'
+
+    def plan_display(self, obj):
+        return format_html('<pre style="white-space: pre-wrap;">{}</pre>', obj.plan or '—')
+    plan_display.short_description = 'План (EXPLAIN ANALYZE, BUFFERS)'
+
+    def nested_plans_display(self, obj):
+        return format_html('<pre style="white-space: pre-wrap;">{}</pre>', obj.nested_plans or '—')
+    nested_plans_display.short_description = 'Планы запросов внутри функции'
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = ['created_at', 'method', 'path', 'status_code', 'total_display',
+                    'sql_ms_display', 'sql_count', 'template_ms_display', 'python_ms_display',
+                    'download_link']
+    list_filter = ['view_name', 'created_at']
+    search_fields = ['path', 'view_name']
+    fieldsets = (
+        ('Запрос', {
+            'fields': ('created_at', 'user', 'method', 'path', 'view_name', 'status_code')
+        }),
+        ('Время', {
+            'fields': ('total_ms', 'sql_ms', 'sql_count', 'template_ms', 'python_ms',
+                       'download_link'),
+            'description': 'SQL внутри шаблонов входит и в SQL, и в шаблоны - '
+                           'время Python считается приблизительно.',
+        }),
+        ('Подробности', {
+            'fields': ('top_functions_display', 'slow_queries_display'),
+        }),
+    )
+    readonly_fields = ['created_at', 'user', 'method', 'path', 'view_name', 'status_code',
+                       'total_ms', 'sql_ms', 'sql_count', 'template_ms', 'python_ms',
+                       'download_link', 'top_functions_display', 'slow_queries_display']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path('<int:profile_id>/download/', self.admin_site.admin_view(self.download),
+                 name='monitoring_requestprofile_download'),
+        ]
+        return custom_urls + urls
+
+    def download(self, request, profile_id):
+        """Файл .prof: snakeviz file.prof или flameprof file.prof > flame.svg"""
+        profile = get_object_or_404(RequestProfile, pk=profile_id)
+        response = HttpResponse(bytes(profile.stats_data), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="profile_{profile.pk}.prof"'
+        return response
+
+    def download_link(self, obj):
+        url = reverse('admin:monitoring_requestprofile_download', args=[obj.pk])
+        return format_html('<a href="{}">📥 .prof</a>', url)
+    download_link.short_description = 'Файл профиля'
+
+    def total_display(self, obj):
+        return f"{obj.total_ms:.0f} мс"
+    total_display.short_description = 'Всего'
+    total_display.admin_order_field = 'total_ms'
+
+    def sql_ms_display(self, obj):
+        return f"{obj.sql_ms:.0f} мс"
+    sql_ms_display.short_description = 'SQL'
+    sql_ms_display.admin_order_field = 'sql_ms'
+
+    def template_ms_display(self, obj):
+        return f"{obj.template_ms:.0f} мс"
+    template_ms_display.short_description = 'Шаблоны'
+    template_ms_display.admin_order_field = 'template_ms'
+
+    def python_ms_display(self, obj):
+        return f"{obj.python_ms:.0f} мс"
+    python_ms_display.short_description = 'Python'
+    python_ms_display.admin_order_field = 'python_ms'
+
+    def top_functions_display(self, obj):
+        return format_html('<pre style="white-space: pre; overflow-x: auto;">{}</pre>', obj.top_functions or '—')
+    top_functions_display.short_description = 'Самые затратные функции (cProfile)'
+
+    def slow_queries_display(self, obj):
+        return format_html('<pre style="white-space: pre-wrap;">{}</pre>', obj.slow_queries or '—')
+    slow_queries_display.short_description = 'Самые долгие SQL-запросы'
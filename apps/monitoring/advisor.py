@@ -0,0 +1,309 @@
+# apps/monitoring/advisor.py
+
+"""
+Советы по индексам на основе статистики PostgreSQL
+(админка: Медленные вызовы -> Советы по индексам; manage.py index_advisor).
+
+- самые затратные запросы из pg_stat_statements по схемам приложения
+  (INDEX_ADVISOR_SCHEMAS), с привязкой к отчетам и виджетам: по имени
+  функции в тексте запроса или по таблицам, которые функция читает;
+- большие таблицы, которые чаще читаются последовательно, чем по индексу,
+  с колонкой-кандидатом из условий затратных запросов;
+- индексы, которые ни разу не использовались с момента сброса статистики.
+
+Статистика собирается с основной БД и всех реплик (replica_* в DATABASES):
+на репликах идут чтения отчетов, и индекс, нужный реплике, на основной БД
+выглядит неиспользуемым. Удаление предлагается, только если индекс не
+использовался ни на одной БД, а недоступные реплики пропускаются с пометкой.
+
+Для запросов внутри функций нужен pg_stat_statements.track = all.
+"""
+
+import re
+from collections import defaultdict
+from django.conf import settings
+from django.db import connections
+
+from apps.core.replicas import replica_aliases
+
+PREDICATE_RE = re.compile(
+    r'(?:\w+\.)?(\w+)\s*(?:=|<>|!=|<=|>=|<|>|\bIN\b|\bBETWEEN\b|\bI?LIKE\b|\bIS\b)',
+    re.IGNORECASE,
+)
+JOIN_RIGHT_RE = re.compile(r'=\s*(?:\w+\.)?([a-z_]\w*)', re.IGNORECASE)
+ANALYZED_STATEMENTS = 500  # запросов, по условиям которых ищутся колонки для индексов
+
+
+class AdvisorUnavailable(Exception):
+    """pg_stat_statements не установлен или недоступен"""
+
+
+def _object_re(schemas):
+    return re.compile(r'\b(' + '|'.join(map(re.escape, schemas)) + r')\.(\w+)', re.IGNORECASE)
+
+
+def _referenced(text, object_re):
+    return {f'{schema.lower()}.{name.lower()}' for schema, name in object_re.findall(text or '')}
+
+
+def _time_columns(cursor):
+    """Имена колонок времени: total_exec_time (PostgreSQL 13+) или total_time"""
+    cursor.execute("SELECT * FROM pg_stat_statements LIMIT 0")
+    columns = {col[0] for col in cursor.description}
+    if 'total_exec_time' in columns:
+        return 'total_exec_time', 'mean_exec_time'
+    return 'total_time', 'mean_time'
+
+
+def _fetch_statements(cursor, schemas, limit, order):
+    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_stat_statements'")
+    if not cursor.fetchone():
+        raise AdvisorUnavailable(
+            'Расширение pg_stat_statements не установлено: добавьте его в '
+            'shared_preload_libraries и выполните CREATE EXTENSION pg_stat_statements'
+        )
+    total_column, mean_column = _time_columns(cursor)
+    order_column = mean_column if order == 'mean' else total_column
+
+    cursor.execute(f"""
+        SELECT s.queryid, s.query, s.calls, s.{total_column}, s.{mean_column}, s.rows,
+               s.shared_blks_hit, s.shared_blks_read
+        FROM pg_stat_statements s
+        WHERE s.dbid = (SELECT oid FROM pg_database WHERE datname = current_database())
+          AND s.query ~* %s
+        ORDER BY s.{order_column} DESC
+        LIMIT %s
+    """, [r'\m(' + '|'.join(schemas) + r')\.', limit])
+
+    fields = ['queryid', 'query', 'calls', 'total_ms', 'mean_ms', 'rows',
+              'shared_hit', 'shared_read']
+    return [dict(zip(fields, row)) for row in cursor.fetchall()]
+
+
+def _fetch_owners(cursor):
+    """{функция: [подписи отчетов и виджетов]}"""
+    owners = defaultdict(list)
+    cursor.execute("SELECT report_code, sql_function_name FROM kpi.reports WHERE is_active = true")
+    for code, func_name in cursor.fetchall():
+        owners[func_name.lower()].append(f'отчет {code}')
+    cursor.execute("SELECT code, sql_function_name FROM kpi.dashboard_widgets")
+    for code, func_name in cursor.fetchall():
+        owners[func_name.lower()].append(f'виджет {code}')
+    return owners
+
+
+def _fetch_function_tables(cursor, schemas, object_re):
+    """{функция: таблицы и функции, упомянутые в ее исходном тексте}"""
+    cursor.execute("""
+        SELECT n.nspname || '.' || p.proname, p.prosrc
+        FROM pg_proc p
+        JOIN pg_namespace n ON n.oid = p.pronamespace
+        WHERE n.nspname = ANY(%s)
+    """, [list(schemas)])
+    tables = defaultdict(set)
+    for func_name, source in cursor.fetchall():
+        tables[func_name.lower()] |= _referenced(source, object_re)
+    return tables
+
+
+def _attribute(statement, owners, function_tables, tables, object_re):
+    """Отчеты и виджеты, к которым относится запрос"""
+    referenced = _referenced(statement['query'], object_re)
+    direct = [label for func_name in referenced & set(owners) for label in owners[func_name]]
+    if direct:
+        return direct, 'вызов функции'
+
+    statement_tables = referenced & tables
+    if not statement_tables:
+        return [], ''
+    labels = [
+        label
+        for func_name, labels in owners.items()
+        if statement_tables <= function_tables.get(func_name, set())
+        for label in labels
+    ]
+    return labels, 'по таблицам функции'
+
+
+def _fetch_tables(cursor, schemas):
+    cursor.execute("""
+        SELECT s.schemaname || '.' || s.relname, s.relid, s.seq_scan, s.seq_tup_read,
+               COALESCE(s.idx_scan, 0), s.n_live_tup, pg_total_relation_size(s.relid)
+        FROM pg_stat_user_tables s
+        WHERE s.schemaname = ANY(%s)
+    """, [list(schemas)])
+    fields = ['table', 'relid', 'seq_scan', 'seq_tup_read', 'idx_scan', 'rows', 'size']
+    return {row[0].lower(): dict(zip(fields, row)) for row in cursor.fetchall()}
+
+
+def _fetch_table_columns(cursor, relid):
+    """{колонка: n_distinct из pg_stats}, ведущие колонки индексов"""
+    cursor.execute("""
+        SELECT a.attname, st.n_distinct
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_stats st ON st.schemaname = n.nspname AND st.tablename = c.relname
+                             AND st.attname = a.attname
+        WHERE a.attrelid = %s AND a.attnum > 0 AND NOT a.attisdropped
+    """, [relid])
+    columns = {name.lower(): n_distinct for name, n_distinct in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT a.attname
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = %s
+    """, [relid])
+    indexed = {row[0].lower() for row in cursor.fetchall()}
+    return columns, indexed
+
+
+def _candidate_column(statements, table, columns, indexed, object_re):
+    """Колонка из условий запросов к таблице с наибольшим суммарным временем"""
+    weights = defaultdict(float)
+    for statement in statements:
+        if table not in _referenced(statement['query'], object_re):
+            continue
+        names = PREDICATE_RE.findall(statement['query']) + JOIN_RIGHT_RE.findall(statement['query'])
+        for name in {n.lower() for n in names}:
+            if name not in columns or name in indexed:
+                continue
+            n_distinct = columns[name]
+            # Колонки с парой значений (флаги) индексировать бесполезно
+            if n_distinct is not None and 0 < n_distinct <= 2:
+                continue
+            weights[name] += statement['total_ms'] or 0
+
+    if not weights:
+        return None
+    return max(weights, key=weights.get)
+
+
+def _missing_indexes(cursor, statements, tables, object_re, min_rows):
+    suggestions = []
+    for table, stats in sorted(tables.items(), key=lambda item: -item[1]['seq_tup_read']):
+        if stats['rows'] < min_rows or stats['seq_scan'] <= stats['idx_scan']:
+            continue
+        columns, indexed = _fetch_table_columns(cursor, stats['relid'])
+        column = _candidate_column(statements, table, columns, indexed, object_re)
+        suggestions.append(dict(
+            stats,
+            column=column,
+            sql=f'CREATE INDEX CONCURRENTLY ON {table} ({column});' if column else '',
+        ))
+    return suggestions
+
+
+def _fetch_index_scans(cursor, schemas):
+    """{индекс: таблица, размер, idx_scan} для индексов, которые можно удалить"""
+    cursor.execute("""
+        SELECT s.schemaname || '.' || s.relname, s.schemaname || '.' || s.indexrelname,
+               pg_relation_size(s.indexrelid), s.idx_scan
+        FROM pg_stat_user_indexes s
+        JOIN pg_index i ON i.indexrelid = s.indexrelid
+        WHERE s.schemaname = ANY(%s)
+          AND NOT i.indisunique AND NOT i.indisprimary
+    """, [list(schemas)])
+    fields = ['table', 'index', 'size', 'idx_scan']
+    return {row[1].lower(): dict(zip(fields, row)) for row in cursor.fetchall()}
+
+
+def _unused_indexes(index_scans, complete):
+    """
+    Индексы без чтений на всех БД (index_scans - суммы по БД).
+    complete=False - часть реплик недоступна, удаление не предлагается.
+    """
+    unused = sorted(
+        (item for item in index_scans.values() if not item['idx_scan']),
+        key=lambda item: -item['size'],
+    )
+    return [
+        {'table': item['table'], 'index': item['index'], 'size': item['size'],
+         'sql': f"DROP INDEX CONCURRENTLY {item['index']};" if complete else ''}
+        for item in unused
+    ]
+
+
+def _merge_counters(target, source, counters):
+    """Складывает счетчики статистики одной БД с уже собранными"""
+    for key, item in source.items():
+        if key not in target:
+            target[key] = dict(item)
+        else:
+            for counter in counters:
+                target[key][counter] += item[counter]
+
+
+def advisor_aliases():
+    """БД KPI, с которых собирается статистика: основная и реплики"""
+    return ['default'] + replica_aliases()
+
+
+def _collect(alias, schemas, limit, order):
+    """Статистика одной БД: запросы, таблицы, индексы, время сброса"""
+    with connections[alias].cursor() as cursor:
+        statements = _fetch_statements(cursor, schemas, limit, order)
+        tables = _fetch_tables(cursor, schemas)
+        index_scans = _fetch_index_scans(cursor, schemas)
+        cursor.execute("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+        row = cursor.fetchone()
+    for statement in statements:
+        statement['database'] = alias
+    return statements, tables, index_scans, row[0] if row else None
+
+
+def build_report(aliases=None, limit=20, order='total'):
+    """
+    Отчет советника: {'statements', 'missing', 'unused', 'databases', 'skipped'}.
+    aliases - БД для сбора статистики (по умолчанию основная и все реплики),
+    order - 'total' (суммарное время) или 'mean' (среднее время вызова).
+    Каталог (функции, колонки, размеры) читается с основной БД:
+    реплики - ее физические копии.
+    """
+    schemas = settings.INDEX_ADVISOR_SCHEMAS
+    object_re = _object_re(schemas)
+    sort_key = 'mean_ms' if order == 'mean' else 'total_ms'
+
+    analyzed, tables, index_scans = [], {}, {}
+    databases, skipped = [], []
+    for alias in aliases or advisor_aliases():
+        try:
+            alias_statements, alias_tables, alias_indexes, stats_reset = _collect(
+                alias, schemas, max(limit, ANALYZED_STATEMENTS), order
+            )
+        except Exception as e:
+            # Без основной БД отчет не построить; реплика пропускается
+            if alias == 'default':
+                raise
+            print(f"Советник по индексам: БД {alias} пропущена: {e}")
+            connections[alias].close()
+            skipped.append({'alias': alias, 'error': str(e)})
+            continue
+        analyzed.extend(alias_statements)
+        _merge_counters(tables, alias_tables, ['seq_scan', 'seq_tup_read', 'idx_scan'])
+        _merge_counters(index_scans, alias_indexes, ['idx_scan'])
+        databases.append({'alias': alias, 'stats_reset': stats_reset})
+
+    analyzed.sort(key=lambda statement: -(statement[sort_key] or 0))
+    statements = analyzed[:limit]
+
+    with connections['default'].cursor() as cursor:
+        owners = _fetch_owners(cursor)
+        function_tables = _fetch_function_tables(cursor, schemas, object_re)
+
+        for statement in statements:
+            statement['owners'], statement['attribution'] = _attribute(
+                statement, owners, function_tables, set(tables), object_re
+            )
+
+        missing = _missing_indexes(cursor, analyzed, tables, object_re,
+                                   settings.INDEX_ADVISOR_MIN_ROWS)
+
+    return {
+        'statements': statements,
+        'missing': missing,
+        'unused': _unused_indexes(index_scans, complete=not skipped),
+        'databases': databases,
+        'skipped': skipped,
+    }
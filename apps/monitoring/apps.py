@@ -0,0 +1,8 @@
+# apps/monitoring/apps.py
+
+from django.apps import AppConfig
+
+class MonitoringConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'monitoring'
+    verbose_name = 'Мониторинг производительности'
@@ -0,0 +1,249 @@
+# apps/monitoring/benchmark.py
+
+"""
+Замеры SQL-функций отчетов и виджетов (manage.py benchmark_functions).
+
+Для каждой функции из kpi.reports и kpi.dashboard_widgets собираются наборы
+параметров: сгенерированные (последние месяцы + значения фильтров по умолчанию,
+sql_params виджетов), записанные (параметры медленных вызовов из SlowCall)
+и, при необходимости, из JSON-файла. Каждый набор выполняется несколько раз
+через EXPLAIN (ANALYZE, BUFFERS, TIMING OFF, FORMAT JSON) в откатываемой
+транзакции: время выполнения и буферы берутся из плана.
+
+Результаты сравниваются с базовой линией (JSON-файл): регрессия - медиана
+времени или число прочитанных буферов выросли больше чем на порог.
+"""
+
+import hashlib
+import json
+import statistics
+from datetime import datetime
+from django.apps import apps
+from django.db import connections, transaction
+
+from apps.core.periods import iter_months
+from apps.core.widgets import WIDGET_FIELDS, widget_limit, widget_params
+
+BUFFER_FIELDS = {
+    'shared_hit': 'Shared Hit Blocks',
+    'shared_read': 'Shared Read Blocks',
+    'temp_read': 'Temp Read Blocks',
+    'temp_written': 'Temp Written Blocks',
+}
+
+
+def _case(kind, name, func_name, params, limit=None, source='generated'):
+    raw = json.dumps([func_name, params, limit], sort_keys=True, default=str)
+    return {
+        'key': f"{func_name}:{hashlib.md5(raw.encode()).hexdigest()[:10]}",
+        'kind': kind,
+        'name': name,
+        'func': func_name,
+        'params': json.loads(json.dumps(params, default=str)),
+        'limit': limit,
+        'source': source,
+    }
+
+
+def _last_months(count):
+    now = datetime.now()
+    index = now.year * 12 + now.month - 1 - (count - 1)
+    return iter_months((index // 12, index % 12 + 1), (now.year, now.month))
+
+
+def _report_cases(conn, months):
+    with conn.cursor() as cursor:
+        cursor.execute("""
+            SELECT id, report_code, sql_function_name
+            FROM kpi.reports
+            WHERE is_active = true
+            ORDER BY sort_order
+        """)
+        reports = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT report_id, param_name, default_value
+            FROM kpi.report_filters
+            WHERE default_value IS NOT NULL AND default_value <> ''
+        """)
+        defaults = {}
+        for report_id, param_name, default_value in cursor.fetchall():
+            if param_name not in ('p_year', 'p_month'):
+                defaults.setdefault(report_id, {})[param_name] = default_value
+
+    cases = []
+    for report_id, report_code, func_name in reports:
+        for year, month in months:
+            params = dict(defaults.get(report_id, {}), p_year=year, p_month=month)
+            cases.append(_case('report', report_code, func_name, params))
+    return cases
+
+
+def _widget_cases(conn, months):
+    with conn.cursor() as cursor:
+        cursor.execute(f"""
+            SELECT {', '.join(WIDGET_FIELDS)}
+            FROM kpi.dashboard_widgets w
+            JOIN kpi.dashboards d ON d.id = w.dashboard_id
+            WHERE d.is_active = true
+            ORDER BY d.sort_order, w.sort_order
+        """)
+        widgets = [dict(zip(WIDGET_FIELDS, row)) for row in cursor.fetchall()]
+
+    cases = []
+    for widget in widgets:
+        for year, month in months:
+            cases.append(_case(
+                'widget', widget['code'], widget['sql_function_name'],
+                widget_params(widget, year, month), widget_limit(widget),
+            ))
+    return cases
+
+
+def _recorded_cases(func_names, per_function):
+    """Параметры реальных медленных вызовов (monitoring.SlowCall)"""
+    SlowCall = apps.get_model('monitoring', 'SlowCall')
+    cases = []
+    for func_name in func_names:
+        seen = set()
+        calls = SlowCall.objects.filter(function_name=func_name).order_by('-created_at')
+        for call in calls.values('params', 'row_limit')[:per_function * 5]:
+            case = _case('recorded', func_name, func_name, call['params'],
+                         call['row_limit'], source='slow_calls')
+            if case['key'] not in seen:
+                seen.add(case['key'])
+                cases.append(case)
+            if len(seen) >= per_function:
+                break
+    return cases
+
+
+def _file_cases(path):
+    """
+    Наборы параметров из файла:
+    {"kpi.func": [{"p_year": 2025, "p_month": 3, ...}, ...], ...}
+    """
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return [
+        _case('file', func_name, func_name, params, source=str(path))
+        for func_name, params_list in data.items()
+        for params in params_list
+    ]
+
+
+def collect_cases(alias='default', months=1, recorded=3, params_file=None, only=None):
+    """Наборы параметров для замера; only - отбор по имени функции или коду"""
+    conn = connections[alias]
+    periods = _last_months(months)
+    cases = _report_cases(conn, periods) + _widget_cases(conn, periods)
+    if recorded:
+        cases += _recorded_cases(sorted({c['func'] for c in cases}), recorded)
+    if params_file:
+        cases += _file_cases(params_file)
+    if only:
+        cases = [c for c in cases if c['func'] in only or c['name'] in only]
+
+    # Одинаковые вызовы (виджеты с общей функцией и параметрами) - один раз
+    unique = {}
+    for case in cases:
+        unique.setdefault(case['key'], case)
+    return list(unique.values())
+
+
+def _explain(conn, case, timeout_ms):
+    """Один вызов: (время выполнения в мс, {буферы})"""
+    query = "EXPLAIN (ANALYZE, BUFFERS, TIMING OFF, FORMAT JSON) SELECT * FROM {}(%s)"
+    query_params = [json.dumps(case['params'], ensure_ascii=False)]
+    query = query.format(case['func'])
+    if case['limit']:
+        query += " LIMIT %s"
+        query_params.append(case['limit'])
+
+    with transaction.atomic(using=conn.alias):
+        with conn.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", [timeout_ms])
+            cursor.execute(query, query_params)
+            result = cursor.fetchone()[0]
+        transaction.set_rollback(True, using=conn.alias)
+
+    if isinstance(result, str):
+        result = json.loads(result)
+    plan = result[0]
+    buffers = {name: plan['Plan'].get(field, 0) for name, field in BUFFER_FIELDS.items()}
+    return plan['Execution Time'], buffers
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def measure(case, alias='default', runs=5, warmup=1, timeout_ms=300000):
+    """Распределение времени и буферы для набора параметров"""
+    conn = connections[alias]
+    for _ in range(warmup):
+        _explain(conn, case, timeout_ms)
+
+    timings, buffers = [], []
+    for _ in range(runs):
+        ms, run_buffers = _explain(conn, case, timeout_ms)
+        timings.append(ms)
+        buffers.append(run_buffers)
+
+    return dict(case, **{
+        'runs': runs,
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(_percentile(timings, 0.95), 2),
+        'max_ms': round(max(timings), 2),
+        'stdev_ms': round(statistics.pstdev(timings), 2),
+        'buffers': {
+            name: int(statistics.median(b[name] for b in buffers)) for name in BUFFER_FIELDS
+        },
+    })
+
+
+def _blocks(result):
+    return result['buffers']['shared_hit'] + result['buffers']['shared_read']
+
+
+def compare(results, baseline, threshold=0.2, min_delta_ms=20):
+    """
+    Сравнение с базовой линией.
+    Возвращает [(результат, базовый результат или None, [причины регрессии])].
+    """
+    base_by_key = {item['key']: item for item in baseline.get('results', [])}
+    comparison = []
+    for result in results:
+        base = base_by_key.get(result['key'])
+        reasons = []
+        if base:
+            delta = result['median_ms'] - base['median_ms']
+            if delta > min_delta_ms and delta > base['median_ms'] * threshold:
+                reasons.append(
+                    f"время {base['median_ms']:.1f} → {result['median_ms']:.1f} мс "
+                    f"(+{delta / max(base['median_ms'], 0.01):.0%})"
+                )
+            base_blocks, blocks = _blocks(base), _blocks(result)
+            if base_blocks and blocks > base_blocks * (1 + threshold):
+                reasons.append(
+                    f"буферы {base_blocks} → {blocks} (+{(blocks - base_blocks) / base_blocks:.0%})"
+                )
+        comparison.append((result, base, reasons))
+    return comparison
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path, results, data_version):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'data_version': data_version,
+            'results': results,
+        }, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,105 @@
+# apps/monitoring/management/commands/benchmark_functions.py
+
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.db_utils import get_data_version
+from apps.monitoring.benchmark import (
+    collect_cases, measure, compare, load_baseline, save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = ('Замеры SQL-функций отчетов и виджетов и сравнение с базовой линией '
+            '(ошибка, если функция стала медленнее порога)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', action='append', default=[], metavar='NAME',
+                            help='Только функция или код отчета/виджета (можно несколько раз)')
+        parser.add_argument('--months', type=int, default=1,
+                            help='Сколько последних месяцев подставлять в параметры')
+        parser.add_argument('--recorded', type=int, default=3,
+                            help='Наборов параметров из медленных вызовов на функцию (0 - не брать)')
+        parser.add_argument('--params-file', help='JSON: {"функция": [{параметры}, ...]}')
+        parser.add_argument('--runs', type=int, default=5, help='Замеров на набор параметров')
+        parser.add_argument('--warmup', type=int, default=1, help='Прогревочных вызовов')
+        parser.add_argument('--timeout-ms', type=int, default=300000,
+                            help='statement_timeout одного вызова')
+        parser.add_argument('--database', default='default', help='БД из DATABASES')
+        parser.add_argument('--baseline', default=str(settings.BENCHMARK_BASELINE_PATH),
+                            help='Файл базовой линии')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Записать результаты как новую базовую линию')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='Допустимый рост медианы времени и буферов (0.2 = 20%%)')
+        parser.add_argument('--min-delta-ms', type=float, default=20,
+                            help='Меньший рост времени не считается регрессией')
+
+    def handle(self, *args, **options):
+        cases = collect_cases(
+            alias=options['database'],
+            months=options['months'],
+            recorded=options['recorded'],
+            params_file=options['params_file'],
+            only=set(options['only']),
+        )
+        if not cases:
+            raise CommandError('Нет функций для замера')
+
+        results, failed = [], []
+        for case in cases:
+            try:
+                result = measure(case, alias=options['database'], runs=options['runs'],
+                                 warmup=options['warmup'], timeout_ms=options['timeout_ms'])
+            except Exception as e:
+                failed.append(case)
+                self.stdout.write(self.style.ERROR(f"❌ {case['name']} ({case['func']}): {e}"))
+                continue
+            results.append(result)
+            self.stdout.write(
+                f"{case['kind']:<8} {case['name']:<30} "
+                f"медиана {result['median_ms']:>9.1f} мс  p95 {result['p95_ms']:>9.1f} мс  "
+                f"буферы {result['buffers']['shared_hit']}+{result['buffers']['shared_read']}"
+            )
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            save_baseline(baseline_path, results, get_data_version())
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Базовая линия сохранена: {baseline_path} ({len(results)} замеров)'
+            ))
+            if failed:
+                raise CommandError(f'Ошибки при выполнении: {len(failed)}')
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(
+                f'Базовой линии нет ({baseline_path}) - запустите с --save-baseline'
+            ))
+            if failed:
+                raise CommandError(f'Ошибки при выполнении: {len(failed)}')
+            return
+
+        baseline = load_baseline(baseline_path)
+        if baseline.get('data_version') != get_data_version():
+            self.stdout.write(self.style.WARNING(
+                f"Базовая линия снята на других данных ({baseline.get('data_version')})"
+            ))
+
+        regressions = []
+        for result, base, reasons in compare(results, baseline, options['threshold'],
+                                             options['min_delta_ms']):
+            if base is None:
+                self.stdout.write(f"  новый набор: {result['name']} {result['params']}")
+            elif reasons:
+                regressions.append(result)
+                self.stdout.write(self.style.ERROR(
+                    f"⚠ {result['name']} ({result['func']}) {result['params']}: {'; '.join(reasons)}"
+                ))
+
+        if regressions or failed:
+            raise CommandError(
+                f'Регрессий: {len(regressions)}, ошибок: {len(failed)} из {len(cases)}'
+            )
+        self.stdout.write(self.style.SUCCESS(f'✅ Регрессий нет ({len(results)} замеров)'))
@@ -0,0 +1,51 @@
+# apps/monitoring/management/commands/index_advisor.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.monitoring.advisor import AdvisorUnavailable, build_report
+
+
+class Command(BaseCommand):
+    help = ('Затратные запросы из pg_stat_statements с привязкой к отчетам и виджетам, '
+            'недостающие и неиспользуемые индексы')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20, help='Сколько запросов показать')
+        parser.add_argument('--order', choices=['total', 'mean'], default='total',
+                            help='Сортировка: суммарное или среднее время')
+        parser.add_argument('--database', action='append',
+                            help='БД из DATABASES (можно несколько; по умолчанию основная и реплики)')
+
+    def handle(self, *args, **options):
+        try:
+            report = build_report(options['database'], options['limit'], options['order'])
+        except AdvisorUnavailable as e:
+            raise CommandError(str(e))
+
+        for database in report['databases']:
+            self.stdout.write(f"{database['alias']}: статистика с {database['stats_reset'] or 'запуска сервера'}")
+        for database in report['skipped']:
+            self.stdout.write(self.style.WARNING(f"{database['alias']}: недоступна ({database['error']})"))
+        self.stdout.write('')
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Самые затратные запросы'))
+        for statement in report['statements']:
+            owners = ', '.join(statement['owners']) or '—'
+            query = ' '.join(statement['query'].split())
+            self.stdout.write(
+                f"{statement['total_ms']:>12.0f} мс всего  {statement['mean_ms']:>9.1f} мс среднее  "
+                f"{statement['calls']:>8} вызовов  {statement['database']}  [{owners}]\n    {query[:200]}"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Таблицы, которые читаются без индекса'))
+        for item in report['missing']:
+            suggestion = item['sql'] or 'колонка не определена'
+            self.stdout.write(
+                f"{item['table']}: {item['rows']} строк, seq_scan {item['seq_scan']}, "
+                f"idx_scan {item['idx_scan']} -> {suggestion}"
+            )
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Неиспользуемые индексы'))
+        for item in report['unused']:
+            suggestion = item['sql'] or 'не все БД доступны, удаление не предлагается'
+            self.stdout.write(f"{item['index']} ({item['size'] // 1024} КБ): {suggestion}")
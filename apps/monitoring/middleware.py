@@ -0,0 +1,125 @@
+# apps/monitoring/middleware.py
+
+"""
+Профилирование отдельного запроса по требованию суперпользователя.
+
+Включается параметром ?_profile=1 или заголовком X-Profile: 1.
+Запрос выполняется под cProfile, время SQL считается через
+execute_wrapper, время шаблонов - по Template.render из профиля.
+Вызовы в пуле потоков (execute_many, в том числе на репликах) профилируются
+в своих потоках и добавляются к профилю (apps.core.request_profile);
+их время SQL суммируется по потокам и может быть больше времени запроса.
+Результат сохраняется в RequestProfile (админка: Мониторинг -> Профили
+запросов), файл .prof открывается в snakeviz / flameprof.
+Без переключателя - только проверка параметра и заголовка.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.template.base import Template
+
+from apps.core.request_profile import end_session, start_session
+
+from .models import RequestProfile
+
+TEMPLATE_RENDER = Template.render.__code__
+
+
+def _is_profile_requested(request):
+    return request.GET.get('_profile') == '1' or request.headers.get('X-Profile') == '1'
+
+
+def _template_seconds(stats):
+    """Время внутри Template.render (рекурсивные вызовы cProfile не суммирует)"""
+    key = (TEMPLATE_RENDER.co_filename, TEMPLATE_RENDER.co_firstlineno, TEMPLATE_RENDER.co_name)
+    entry = stats.stats.get(key)
+    return entry[3] if entry else 0.0
+
+
+def _top_functions(stats, worker_calls=0, limit=30):
+    output = io.StringIO()
+    if worker_calls:
+        output.write(
+            f"Включены вызовы в пуле потоков: {worker_calls} "
+            f"(время в потоках суммируется и может превышать время запроса)\n\n"
+        )
+    stats.stream = output
+    stats.sort_stats('cumulative').print_stats(limit)
+    return output.getvalue()
+
+
+class ProfilingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _is_profile_requested(request):
+            return self.get_response(request)
+        user = getattr(request, 'user', None)
+        if not (user and user.is_superuser):
+            return self.get_response(request)
+
+        return self._profile(request)
+
+    def _profile(self, request):
+        session, token = start_session()
+        profiler = cProfile.Profile()
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            stack.callback(end_session, token)
+            session.wrap_connections(stack)
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+                # Ленивые ответы (TemplateResponse) рендерятся здесь
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+            finally:
+                profiler.disable()
+        total = time.perf_counter() - started
+
+        try:
+            record = self._save(request, response, profiler, session, total)
+            response['X-Profile-Id'] = str(record.pk)
+        except Exception as e:
+            print(f"Ошибка сохранения профиля запроса: {e}")
+        return response
+
+    def _save(self, request, response, profiler, session, total):
+        sql_timer = session.sql_timer
+        stats = pstats.Stats(profiler)
+        for worker_profiler in session.profilers:
+            stats.add(worker_profiler)
+        template_time = _template_seconds(stats)
+        match = request.resolver_match
+
+        record = RequestProfile.objects.create(
+            user=request.user.get_username(),
+            method=request.method,
+            path=request.get_full_path()[:500],
+            view_name=match.view_name if match else '',
+            status_code=response.status_code,
+            total_ms=total * 1000,
+            sql_ms=sql_timer.total * 1000,
+            sql_count=sql_timer.count,
+            template_ms=template_time * 1000,
+            python_ms=max(total - sql_timer.total - template_time, 0) * 1000,
+            top_functions=_top_functions(stats, session.worker_calls),
+            slow_queries='\n\n'.join(
+                f"{duration * 1000:.1f} мс: {sql}" for duration, sql in sql_timer.slowest()
+            ),
+            # Формат файла pstats (Stats.dump_stats)
+            stats_data=marshal.dumps(stats.stats),
+        )
+
+        # Храним только последние профили
+        keep_ids = RequestProfile.objects.values_list('id', flat=True)[:settings.PROFILE_KEEP]
+        RequestProfile.objects.exclude(id__in=list(keep_ids)).delete()
+        return record
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowCall',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+                ('function_name', models.CharField(db_index=True, max_length=200, verbose_name='SQL-функция')),
+                ('params', models.JSONField(default=dict, verbose_name='Параметры')),
+                ('row_limit', models.IntegerField(blank=True, null=True, verbose_name='LIMIT')),
+                ('duration_ms', models.FloatField(verbose_name='Время вызова, мс')),
+                ('threshold_ms', models.IntegerField(verbose_name='Порог, мс')),
+                ('explain_duration_ms', models.FloatField(blank=True, null=True, verbose_name='Время EXPLAIN, мс')),
+                ('database', models.CharField(default='default', max_length=50, verbose_name='БД')),
+                ('data_version', models.CharField(blank=True, max_length=50, verbose_name='Версия данных')),
+                ('plan', models.TextField(blank=True, verbose_name='План (EXPLAIN ANALYZE, BUFFERS)')),
+                ('nested_plans', models.TextField(blank=True, help_text='auto_explain, если расширение доступно', verbose_name='Планы запросов внутри функции')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+            ],
+            options={
+                'verbose_name': 'Медленный вызов',
+                'verbose_name_plural': 'Медленные вызовы',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SlowCallThreshold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('function_name', models.CharField(help_text='sql_function_name отчета или виджета, например kpi.get_plan_fact', max_length=200, unique=True, verbose_name='SQL-функция')),
+                ('threshold_ms', models.IntegerField(verbose_name='Порог, мс')),
+                ('is_enabled', models.BooleanField(default=True, help_text='Выключите, чтобы не снимать EXPLAIN для этой функции', verbose_name='Сохранять планы')),
+                ('comment', models.CharField(blank=True, max_length=255, verbose_name='Комментарий')),
+            ],
+            options={
+                'verbose_name': 'Порог медленного вызова',
+                'verbose_name_plural': 'Пороги медленных вызовов',
+                'ordering': ['function_name'],
+            },
+        ),
+    ]
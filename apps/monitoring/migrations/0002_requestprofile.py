@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата')),
+                ('user', models.CharField(max_length=150, verbose_name='Пользователь')),
+                ('method', models.CharField(max_length=10, verbose_name='Метод')),
+                ('path', models.CharField(max_length=500, verbose_name='Адрес')),
+                ('view_name', models.CharField(blank=True, max_length=200, verbose_name='Представление')),
+                ('status_code', models.IntegerField(null=True, verbose_name='Код ответа')),
+                ('total_ms', models.FloatField(verbose_name='Всего, мс')),
+                ('sql_ms', models.FloatField(verbose_name='SQL, мс')),
+                ('sql_count', models.IntegerField(verbose_name='SQL-запросов')),
+                ('template_ms', models.FloatField(verbose_name='Шаблоны, мс')),
+                ('python_ms', models.FloatField(help_text='Всего за вычетом SQL и шаблонов', verbose_name='Python, мс')),
+                ('top_functions', models.TextField(blank=True, verbose_name='Самые затратные функции')),
+                ('slow_queries', models.TextField(blank=True, verbose_name='Самые долгие SQL-запросы')),
+                ('stats_data', models.BinaryField(verbose_name='Данные cProfile (.prof)')),
+            ],
+            options={
+                'verbose_name': 'Профиль запроса',
+                'verbose_name_plural': 'Профили запросов',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
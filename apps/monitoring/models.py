@@ -0,0 +1,72 @@
+# apps/monitoring/models.py
+
+from django.db import models
+
+class SlowCallThreshold(models.Model):
+    """Порог медленного вызова для SQL-функции отчета или виджета"""
+    function_name = models.CharField(max_length=200, unique=True, verbose_name='SQL-функция',
+                                     help_text='sql_function_name отчета или виджета, например kpi.get_plan_fact')
+    threshold_ms = models.IntegerField(verbose_name='Порог, мс')
+    is_enabled = models.BooleanField(default=True, verbose_name='Сохранять планы',
+                                     help_text='Выключите, чтобы не снимать EXPLAIN для этой функции')
+    comment = models.CharField(max_length=255, blank=True, verbose_name='Комментарий')
+
+    class Meta:
+        ordering = ['function_name']
+        verbose_name = 'Порог медленного вызова'
+        verbose_name_plural = 'Пороги медленных вызовов'
+
+    def __str__(self):
+        return f"{self.function_name} > {self.threshold_ms} мс"
+
+
+class SlowCall(models.Model):
+    """Медленный вызов SQL-функции с планом выполнения"""
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата')
+    function_name = models.CharField(max_length=200, db_index=True, verbose_name='SQL-функция')
+    params = models.JSONField(default=dict, verbose_name='Параметры')
+    row_limit = models.IntegerField(null=True, blank=True, verbose_name='LIMIT')
+    duration_ms = models.FloatField(verbose_name='Время вызова, мс')
+    threshold_ms = models.IntegerField(verbose_name='Порог, мс')
+    explain_duration_ms = models.FloatField(null=True, blank=True, verbose_name='Время EXPLAIN, мс')
+    database = models.CharField(max_length=50, default='default', verbose_name='БД')
+    data_version = models.CharField(max_length=50, blank=True, verbose_name='Версия данных')
+    plan = models.TextField(blank=True, verbose_name='План (EXPLAIN ANALYZE, BUFFERS)')
+    nested_plans = models.TextField(blank=True, verbose_name='Планы запросов внутри функции',
+                                    help_text='auto_explain, если расширение доступно')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Медленный вызов'
+        verbose_name_plural = 'Медленные вызовы'
+
+    def __str__(self):
+        return f"{self.function_name} - {self.duration_ms:.0f} мс ({self.created_at:%d.%m.%Y %H:%M})"
+
+
+class RequestProfile(models.Model):
+    """Профиль одного запроса (?_profile=1 или заголовок X-Profile, только суперпользователь)"""
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата')
+    user = models.CharField(max_length=150, verbose_name='Пользователь')
+    method = models.CharField(max_length=10, verbose_name='Метод')
+    path = models.CharField(max_length=500, verbose_name='Адрес')
+    view_name = models.CharField(max_length=200, blank=True, verbose_name='Представление')
+    status_code = models.IntegerField(null=True, verbose_name='Код ответа')
+    total_ms = models.FloatField(verbose_name='Всего, мс')
+    sql_ms = models.FloatField(verbose_name='SQL, мс')
+    sql_count = models.IntegerField(verbose_name='SQL-запросов')
+    template_ms = models.FloatField(verbose_name='Шаблоны, мс')
+    python_ms = models.FloatField(verbose_name='Python, мс',
+                                  help_text='Всего за вычетом SQL и шаблонов')
+    top_functions = models.TextField(blank=True, verbose_name='Самые затратные функции')
+    slow_queries = models.TextField(blank=True, verbose_name='Самые долгие SQL-запросы')
+    stats_data = models.BinaryField(verbose_name='Данные cProfile (.prof)')
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Профиль запроса'
+        verbose_name_plural = 'Профили запросов'
+
+    def __str__(self):
+        return f"{self.method} {self.path} - {self.total_ms:.0f} мс"
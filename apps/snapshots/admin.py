@@ -0,0 +1,120 @@
+# apps/snapshots/admin.py
+
+from django import forms
+from django.contrib import admin
+from django.contrib import messages
+from django.db.models import Count, Sum
+from django.http import HttpResponseRedirect
+from django.urls import reverse
+
+from apps.core.periods import is_past_month
+
+from .freeze import materialize_period, store_period, unfreeze_period, refreeze_period
+from .models import FrozenPeriod, PeriodSnapshot
+
+
+class FrozenPeriodForm(forms.ModelForm):
+    """Заморозка: форма только проверяет период, вызовы выполняются при сохранении"""
+
+    class Meta:
+        model = FrozenPeriod
+        fields = ['year', 'month', 'comment']
+
+    def clean(self):
+        cleaned_data = super().clean()
+        year, month = cleaned_data.get('year'), cleaned_data.get('month')
+        if self.errors or year is None or month is None:
+            return cleaned_data
+        if not 1 <= month <= 12:
+            raise forms.ValidationError('Месяц должен быть от 1 до 12')
+        if not is_past_month(year, month):
+            raise forms.ValidationError('Заморозить можно только закончившийся месяц')
+        if FrozenPeriod.objects.filter(year=year, month=month).exists():
+            raise forms.ValidationError(f'Период {month:02d}.{year} уже заморожен')
+        return cleaned_data
+
+
+@admin.register(FrozenPeriod)
+class FrozenPeriodAdmin(admin.ModelAdmin):
+    form = FrozenPeriodForm
+    list_display = ['__str__', 'frozen_at', 'frozen_by', 'data_version',
+                    'snapshot_count', 'size_display', 'comment']
+    readonly_fields = ['frozen_at', 'frozen_by', 'data_version']
+    actions = ['refreeze_selected', 'unfreeze_selected']
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            snapshot_total=Count('snapshots'), size_total=Sum('snapshots__size_bytes')
+        )
+
+    def has_change_permission(self, request, obj=None):
+        # Снимки не изменяются: только заморозить заново или разморозить
+        return False
+
+    def save_model(self, request, obj, form, change):
+        # Отчеты и виджеты месяца выполняются один раз - при сохранении, не при проверке формы
+        try:
+            results = materialize_period(obj.year, obj.month)
+        except ValueError as e:
+            messages.error(request, f'❌ Период {obj} не заморожен: {e}')
+            return
+        obj.frozen_by = request.user.get_username()
+        store_period(obj, results)
+        messages.success(request, f'❄️ Период {obj} заморожен: снимков {len(results)}')
+
+    def log_addition(self, request, obj, message):
+        if obj.pk is not None:
+            super().log_addition(request, obj, message)
+
+    def response_add(self, request, obj, post_url_continue=None):
+        # Заморозка не удалась (ошибка уже показана) - обратно к списку периодов
+        if obj.pk is None:
+            return HttpResponseRedirect(reverse('admin:snapshots_frozenperiod_changelist'))
+        return super().response_add(request, obj, post_url_continue)
+
+    def delete_model(self, request, obj):
+        unfreeze_period(obj)
+
+    def delete_queryset(self, request, queryset):
+        for period in queryset:
+            unfreeze_period(period)
+
+    def refreeze_selected(self, request, queryset):
+        for period in queryset:
+            try:
+                period = refreeze_period(period, request.user.get_username())
+                messages.success(request, f'❄️ Период {period} заморожен заново')
+            except ValueError as e:
+                messages.error(request, f'❌ {e}')
+    refreeze_selected.short_description = '🔄 Заморозить заново (пересчитать снимки)'
+
+    def unfreeze_selected(self, request, queryset):
+        count = 0
+        for period in queryset:
+            unfreeze_period(period)
+            count += 1
+        messages.success(request, f'Разморожено периодов: {count}')
+    unfreeze_selected.short_description = '🔥 Разморозить'
+
+    def snapshot_count(self, obj):
+        return obj.snapshot_total
+    snapshot_count.short_description = 'Снимков'
+
+    def size_display(self, obj):
+        return f"{(obj.size_total or 0) / 1024:.0f} КБ"
+    size_display.short_description = 'Размер'
+
+
+@admin.register(PeriodSnapshot)
+class PeriodSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['period', 'function_name', 'source', 'params', 'row_limit',
+                    'row_count', 'size_bytes', 'created_at']
+    list_filter = ['period', 'function_name']
+    search_fields = ['function_name', 'source']
+    exclude = ['data']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,8 @@
+# apps/snapshots/apps.py
+
+from django.apps import AppConfig
+
+class SnapshotsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'snapshots'
+    verbose_name = 'Закрытые периоды'
@@ -0,0 +1,98 @@
+# apps/snapshots/freeze.py
+
+"""
+Заморозка и разморозка закрытых месяцев.
+При заморозке выполняются все активные отчеты (фильтры по умолчанию - только
+год и месяц) и виджеты активного дашборда, результаты сохраняются снимками.
+Остальные сочетания фильтров сохраняются при первом запросе
+(apps.core.period_snapshots.remember_result).
+"""
+
+from django.db import connection, transaction
+
+from apps.core.db_utils import get_data_version
+from apps.core.period_snapshots import reset_frozen_periods, save_snapshot
+from apps.core.periods import is_past_month
+from apps.core.report_runner import execute_many
+from apps.core.widgets import get_active_dashboard, get_dashboard_widgets, plan_widget_calls
+
+from .models import FrozenPeriod
+
+
+def period_calls(year, month):
+    """Вызовы за месяц: [(источник, функция, параметры, limit)]"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT report_code, sql_function_name
+            FROM kpi.reports
+            WHERE is_active = true
+            ORDER BY sort_order
+        """)
+        calls = [
+            (f'отчет {code}', func_name, {'p_year': year, 'p_month': month}, None)
+            for code, func_name in cursor.fetchall()
+        ]
+
+    dashboard = get_active_dashboard()
+    if dashboard:
+        for code, call in plan_widget_calls(get_dashboard_widgets(dashboard[0]), year, month).items():
+            # Годовые вызовы (тепловые карты) к одному месяцу не относятся
+            if len(call) == 3:
+                calls.append((f'виджет {code}', *call))
+    return calls
+
+
+def materialize_period(year, month):
+    """
+    Выполняет вызовы месяца. Возвращает [(источник, функция, параметры, limit, columns, rows)].
+    Если хотя бы один вызов завершился ошибкой - ValueError (неполный снимок не сохраняется).
+    """
+    if not is_past_month(year, month):
+        raise ValueError('Заморозить можно только закончившийся месяц')
+
+    calls = period_calls(year, month)
+    results, errors = [], []
+    outcomes = execute_many([(func_name, params, limit) for _, func_name, params, limit in calls])
+    for (source, func_name, params, limit), outcome in zip(calls, outcomes):
+        if isinstance(outcome, Exception):
+            errors.append(f'{source} ({func_name}): {outcome}')
+        else:
+            results.append((source, func_name, params, limit, *outcome))
+
+    if errors:
+        raise ValueError('Ошибки при выполнении: ' + '; '.join(errors))
+    return results
+
+
+def store_period(period, results):
+    """Сохраняет период и снимки одной транзакцией"""
+    period.data_version = get_data_version()
+    with transaction.atomic():
+        period.save()
+        for source, func_name, params, limit, columns, rows in results:
+            save_snapshot(period.id, func_name, params, limit, columns, rows, source=source)
+    reset_frozen_periods()
+    return period
+
+
+def freeze_period(year, month, user='', comment=''):
+    if FrozenPeriod.objects.filter(year=year, month=month).exists():
+        raise ValueError(f'Период {month:02d}.{year} уже заморожен')
+    results = materialize_period(year, month)
+    return store_period(FrozenPeriod(year=year, month=month, frozen_by=user, comment=comment), results)
+
+
+def unfreeze_period(period):
+    """Удаляет период со снимками: месяц снова считается живыми функциями"""
+    period.delete()
+    reset_frozen_periods()
+
+
+def refreeze_period(period, user=''):
+    """Пересчитывает снимки (например, после исправления функции или данных)"""
+    year, month, comment = period.year, period.month, period.comment
+    unfreeze_period(period)
+    try:
+        return freeze_period(year, month, user, comment)
+    except ValueError as e:
+        raise ValueError(f'{e}. Период {month:02d}.{year} разморожен')
@@ -0,0 +1,41 @@
+# apps/snapshots/management/commands/freeze_period.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from snapshots.freeze import freeze_period, refreeze_period, unfreeze_period
+from snapshots.models import FrozenPeriod
+
+
+class Command(BaseCommand):
+    help = 'Заморозка закрытого месяца: результаты отчетов и виджетов сохраняются снимками'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year', type=int, required=True)
+        parser.add_argument('--month', type=int, required=True)
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument('--unfreeze', action='store_true', help='Разморозить (удалить снимки)')
+        action.add_argument('--refreeze', action='store_true', help='Пересчитать снимки')
+        parser.add_argument('--comment', default='')
+
+    def handle(self, *args, **options):
+        year, month = options['year'], options['month']
+        period = FrozenPeriod.objects.filter(year=year, month=month).first()
+
+        try:
+            if options['unfreeze']:
+                if not period:
+                    raise CommandError(f'Период {month:02d}.{year} не заморожен')
+                unfreeze_period(period)
+                self.stdout.write(self.style.SUCCESS(f'✅ Период {month:02d}.{year} разморожен'))
+                return
+
+            if options['refreeze'] and period:
+                period = refreeze_period(period, 'manage.py')
+            else:
+                period = freeze_period(year, month, 'manage.py', options['comment'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'❄️ Период {period} заморожен: снимков {period.snapshots.count()}'
+        ))
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FrozenPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.IntegerField(verbose_name='Год')),
+                ('month', models.IntegerField(verbose_name='Месяц')),
+                ('frozen_at', models.DateTimeField(auto_now_add=True, verbose_name='Заморожен')),
+                ('frozen_by', models.CharField(blank=True, max_length=150, verbose_name='Кем')),
+                ('data_version', models.CharField(blank=True, max_length=50, verbose_name='Версия данных')),
+                ('comment', models.CharField(blank=True, max_length=255, verbose_name='Комментарий')),
+            ],
+            options={
+                'verbose_name': 'Замороженный период',
+                'verbose_name_plural': 'Замороженные периоды',
+                'ordering': ['-year', '-month'],
+                'unique_together': {('year', 'month')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PeriodSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('function_name', models.CharField(max_length=200, verbose_name='SQL-функция')),
+                ('params_key', models.CharField(max_length=32, verbose_name='Ключ параметров')),
+                ('params', models.JSONField(default=dict, verbose_name='Параметры')),
+                ('row_limit', models.IntegerField(default=0, help_text='0 - без ограничения', verbose_name='LIMIT')),
+                ('source', models.CharField(blank=True, help_text='Отчет или виджет; пусто - сохранен при первом запросе', max_length=200, verbose_name='Источник')),
+                ('row_count', models.IntegerField(default=0, verbose_name='Строк')),
+                ('size_bytes', models.IntegerField(default=0, verbose_name='Размер, байт')),
+                ('data', models.BinaryField(verbose_name='Данные')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Сохранен')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='snapshots.frozenperiod', verbose_name='Период')),
+            ],
+            options={
+                'verbose_name': 'Снимок результата',
+                'verbose_name_plural': 'Снимки результатов',
+                'ordering': ['period', 'function_name'],
+                'unique_together': {('period', 'function_name', 'params_key', 'row_limit')},
+            },
+        ),
+    ]
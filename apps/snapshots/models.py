@@ -0,0 +1,49 @@
+# apps/snapshots/models.py
+
+from django.db import models
+
+class FrozenPeriod(models.Model):
+    """Закрытый месяц: отчеты и виджеты за него отдаются из сохраненных результатов"""
+    year = models.IntegerField(verbose_name='Год')
+    month = models.IntegerField(verbose_name='Месяц')
+    frozen_at = models.DateTimeField(auto_now_add=True, verbose_name='Заморожен')
+    frozen_by = models.CharField(max_length=150, blank=True, verbose_name='Кем')
+    data_version = models.CharField(max_length=50, blank=True, verbose_name='Версия данных')
+    comment = models.CharField(max_length=255, blank=True, verbose_name='Комментарий')
+
+    class Meta:
+        ordering = ['-year', '-month']
+        unique_together = ['year', 'month']
+        verbose_name = 'Замороженный период'
+        verbose_name_plural = 'Замороженные периоды'
+
+    def __str__(self):
+        return f"{self.month:02d}.{self.year}"
+
+
+class PeriodSnapshot(models.Model):
+    """
+    Результат вызова SQL-функции за замороженный месяц (колонки и строки, zlib).
+    Не изменяется: при необходимости период размораживается и замораживается заново.
+    """
+    period = models.ForeignKey(FrozenPeriod, on_delete=models.CASCADE,
+                               related_name='snapshots', verbose_name='Период')
+    function_name = models.CharField(max_length=200, verbose_name='SQL-функция')
+    params_key = models.CharField(max_length=32, verbose_name='Ключ параметров')
+    params = models.JSONField(default=dict, verbose_name='Параметры')
+    row_limit = models.IntegerField(default=0, verbose_name='LIMIT', help_text='0 - без ограничения')
+    source = models.CharField(max_length=200, blank=True, verbose_name='Источник',
+                              help_text='Отчет или виджет; пусто - сохранен при первом запросе')
+    row_count = models.IntegerField(default=0, verbose_name='Строк')
+    size_bytes = models.IntegerField(default=0, verbose_name='Размер, байт')
+    data = models.BinaryField(verbose_name='Данные')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Сохранен')
+
+    class Meta:
+        ordering = ['period', 'function_name']
+        unique_together = ['period', 'function_name', 'params_key', 'row_limit']
+        verbose_name = 'Снимок результата'
+        verbose_name_plural = 'Снимки результатов'
+
+    def __str__(self):
+        return f"{self.function_name} за {self.period}"
@@ -0,0 +1,58 @@
+# apps/sync/admin.py
+
+from django.contrib import admin
+from django.contrib import messages
+
+from .models import SyncTable, SyncRun
+from .engine import start_sync_process, sync_in_progress
+
+
+@admin.register(SyncTable)
+class SyncTableAdmin(admin.ModelAdmin):
+    list_display = ['name', 'source_table', 'target_table', 'watermark_column',
+                    'watermark_value', 'last_synced_at', 'last_row_count', 'is_active']
+    list_editable = ['is_active']
+    search_fields = ['name', 'source_table', 'target_table']
+    readonly_fields = ['last_synced_at', 'last_row_count']
+    actions = ['sync_selected', 'reset_watermark']
+
+    fieldsets = (
+        ('Основная информация', {
+            'fields': ('name', 'sort_order', 'is_active')
+        }),
+        ('Источник и приемник', {
+            'fields': ('source_table', 'target_table', 'columns', 'key_columns'),
+        }),
+        ('Инкрементальная загрузка', {
+            'fields': ('watermark_column', 'watermark_value', 'batch_size',
+                       'last_synced_at', 'last_row_count'),
+        }),
+    )
+
+    def sync_selected(self, request, queryset):
+        # Загрузка идет отдельным процессом (manage.py sync_mis), страница не ждет
+        if sync_in_progress():
+            messages.warning(request, 'Синхронизация уже выполняется (см. Запуски синхронизации)')
+            return
+        try:
+            start_sync_process(list(queryset.values_list('name', flat=True)))
+        except OSError as e:
+            messages.error(request, f'❌ Не удалось запустить синхронизацию: {e}')
+            return
+        messages.success(request, '🔄 Синхронизация запущена в фоне, результат - в разделе «Запуски синхронизации»')
+    sync_selected.short_description = '🔄 Синхронизировать выбранные'
+
+    def reset_watermark(self, request, queryset):
+        queryset.update(watermark_value='')
+        messages.success(request, 'Отметки сброшены: следующая загрузка будет полной')
+    reset_watermark.short_description = '⏮ Сбросить отметку (полная загрузка)'
+
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'finished_at', 'status', 'row_count']
+    list_filter = ['status']
+    readonly_fields = ['started_at', 'finished_at', 'status', 'row_count', 'details']
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,8 @@
+# apps/sync/apps.py
+
+from django.apps import AppConfig
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sync'
+    verbose_name = 'Синхронизация с МИС'
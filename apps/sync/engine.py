@@ -0,0 +1,288 @@
+# apps/sync/engine.py
+
+"""
+Инкрементальная загрузка данных из МИС в KPI.
+
+Для каждой таблицы из SyncTable:
+1. Из МИС выбираются строки с watermark_column >= сохраненной отметки.
+2. Данные передаются между БД через COPY ... TO STDOUT / COPY ... FROM STDIN
+   по каналу (pipe) - в памяти находится только буфер канала.
+3. Строки из временной таблицы переносятся в целевую пакетами
+   (INSERT ... ON CONFLICT DO UPDATE), каждый пакет - отдельная транзакция.
+4. После загрузки всех таблиц одной транзакцией сохраняются новые отметки
+   и успешный запуск SyncRun - время окончания запуска, загрузившего строки,
+   и есть дата импорта (apps.core.db_utils.read_import_date), от нее зависят
+   ключи кэшей. Запуск без новых строк версию данных не меняет.
+
+Данные грузятся отдельным подключением psycopg2 (COPY), а журнал, отметки
+и advisory-блокировка - через подключение Django "default" к той же БД.
+
+Повторная загрузка строк безопасна (upsert), поэтому после сбоя
+синхронизацию достаточно просто запустить заново.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import psycopg2
+from psycopg2 import sql
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from apps.core.replicas import reset_replica_checks
+
+from .models import SyncTable, SyncRun
+
+# Ключ advisory-блокировки: одновременно выполняется только одна синхронизация
+SYNC_LOCK_KEY = 72_001
+STAGE_TABLE = '_sync_stage'
+
+
+def _table_identifier(name):
+    """'schema.table' -> безопасный идентификатор SQL"""
+    return sql.Identifier(*name.split('.'))
+
+
+def _identifiers(names):
+    return sql.SQL(', ').join(sql.Identifier(name) for name in names)
+
+
+def connect(alias=None, dsn=None):
+    """Отдельное подключение psycopg2 (по DSN или по настройкам Django)"""
+    if dsn:
+        return psycopg2.connect(dsn)
+    return psycopg2.connect(**connections[alias].get_connection_params())
+
+
+def _copy_between(mis_conn, kpi_conn, copy_out, copy_in):
+    """
+    Передает данные COPY из МИС в KPI через канал: чтение и запись
+    идут параллельно, объем памяти ограничен буфером канала.
+    """
+    read_fd, write_fd = os.pipe()
+    errors = []
+
+    def produce():
+        try:
+            with os.fdopen(write_fd, 'wb') as writer:
+                with mis_conn.cursor() as cursor:
+                    cursor.copy_expert(copy_out, writer)
+        except Exception as e:
+            errors.append(e)
+
+    producer = threading.Thread(target=produce, name='sync-copy-out', daemon=True)
+    producer.start()
+    try:
+        with os.fdopen(read_fd, 'rb') as reader:
+            with kpi_conn.cursor() as cursor:
+                cursor.copy_expert(copy_in, reader)
+    finally:
+        producer.join()
+
+    # Ошибка чтения из МИС обрывает поток - частичные данные не принимаем
+    if errors:
+        raise errors[0]
+
+
+def sync_table(table, mis_conn, kpi_conn, full=False, log=print):
+    """Загружает одну таблицу. Возвращает число перенесенных строк."""
+    columns = table.get_columns()
+    key_columns = table.get_key_columns()
+    watermark = None if full else (table.watermark_value or None)
+
+    if table.watermark_column not in columns:
+        columns.append(table.watermark_column)
+
+    # 1. Временная таблица с номером строки для пакетной загрузки
+    with kpi_conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(STAGE_TABLE)))
+        cursor.execute(sql.SQL("""
+            CREATE TEMP TABLE {stage} AS
+            SELECT {columns} FROM {target} WITH NO DATA
+        """).format(
+            stage=sql.Identifier(STAGE_TABLE),
+            columns=_identifiers(columns),
+            target=_table_identifier(table.target_table),
+        ))
+        cursor.execute(sql.SQL("ALTER TABLE {} ADD COLUMN _sync_rn bigserial").format(
+            sql.Identifier(STAGE_TABLE)
+        ))
+    kpi_conn.commit()
+
+    # 2. COPY из МИС во временную таблицу
+    query = sql.SQL("SELECT {columns} FROM {source}").format(
+        columns=_identifiers(columns),
+        source=_table_identifier(table.source_table),
+    )
+    if watermark is not None:
+        query = sql.SQL("{query} WHERE {column} >= {value}").format(
+            query=query,
+            column=sql.Identifier(table.watermark_column),
+            value=sql.Literal(watermark),
+        )
+    copy_out = sql.SQL("COPY ({}) TO STDOUT").format(query).as_string(mis_conn)
+    copy_in = sql.SQL("COPY {stage} ({columns}) FROM STDIN").format(
+        stage=sql.Identifier(STAGE_TABLE),
+        columns=_identifiers(columns),
+    ).as_string(kpi_conn)
+
+    _copy_between(mis_conn, kpi_conn, copy_out, copy_in)
+    mis_conn.commit()
+
+    with kpi_conn.cursor() as cursor:
+        cursor.execute(sql.SQL("SELECT count(*), max({column})::text FROM {stage}").format(
+            column=sql.Identifier(table.watermark_column),
+            stage=sql.Identifier(STAGE_TABLE),
+        ))
+        row_count, new_watermark = cursor.fetchone()
+    kpi_conn.commit()
+    log(f"  {table.name}: получено строк - {row_count}")
+
+    # 3. Перенос в целевую таблицу пакетами
+    update_columns = [c for c in columns if c not in key_columns]
+    upsert = sql.SQL("""
+        INSERT INTO {target} ({columns})
+        SELECT {columns} FROM {stage}
+        WHERE _sync_rn > %s AND _sync_rn <= %s
+        ON CONFLICT ({keys}) DO {action}
+    """).format(
+        target=_table_identifier(table.target_table),
+        columns=_identifiers(columns),
+        stage=sql.Identifier(STAGE_TABLE),
+        keys=_identifiers(key_columns),
+        action=sql.SQL("UPDATE SET {}").format(sql.SQL(', ').join(
+            sql.SQL("{column} = EXCLUDED.{column}").format(column=sql.Identifier(c))
+            for c in update_columns
+        )) if update_columns else sql.SQL("NOTHING"),
+    )
+
+    batch_size = max(table.batch_size, 1)
+    for start in range(0, row_count, batch_size):
+        with kpi_conn.cursor() as cursor:
+            cursor.execute(upsert, [start, start + batch_size])
+        kpi_conn.commit()
+
+    with kpi_conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {}").format(sql.Identifier(STAGE_TABLE)))
+    kpi_conn.commit()
+
+    # 4. Новая отметка сохраняется в _finalize вместе с остальными таблицами
+    if new_watermark is not None:
+        table.watermark_value = new_watermark
+    table.last_synced_at = timezone.now()
+    table.last_row_count = row_count
+
+    return row_count
+
+
+def _finalize(run, tables):
+    """Отметки таблиц, успешный запуск и дата импорта - одной транзакцией"""
+    with transaction.atomic():
+        for table in tables:
+            table.save(update_fields=['watermark_value', 'last_synced_at', 'last_row_count'])
+        run.save()
+        # Дополнительная отметка (например, обновление solution_med.import_date()) -
+        # только если данные изменились
+        if settings.MIS_SYNC_FINALIZE_SQL and run.row_count:
+            with connection.cursor() as cursor:
+                cursor.execute(settings.MIS_SYNC_FINALIZE_SQL)
+
+
+def _try_lock():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [SYNC_LOCK_KEY])
+        return cursor.fetchone()[0]
+
+
+def _unlock():
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [SYNC_LOCK_KEY])
+    except Exception as e:
+        # Оборванное подключение уже освободило блокировку
+        print(f"Ошибка снятия блокировки синхронизации: {e}")
+
+
+def run_sync(table_names=None, full=False, mis_dsn=None, log=print):
+    """
+    Синхронизирует активные таблицы (или только table_names).
+    Возвращает запись журнала SyncRun или None, если синхронизация уже идет.
+    """
+    tables = SyncTable.objects.filter(is_active=True)
+    if table_names:
+        tables = tables.filter(name__in=table_names)
+
+    # Блокировка - на подключении Django, как и журнал: sync_in_progress()
+    # проверяет ее там же
+    if not _try_lock():
+        log("Синхронизация уже выполняется, запуск пропущен")
+        return None
+
+    try:
+        mis_conn = connect('mis', mis_dsn)
+        kpi_conn = connect('default')
+        try:
+            run = SyncRun.objects.create()
+            details = []
+            loaded = []
+            try:
+                for table in tables:
+                    log(f"Синхронизация: {table.name}")
+                    run.row_count += sync_table(table, mis_conn, kpi_conn, full=full, log=log)
+                    loaded.append(table)
+                    details.append(f"{table.name}: {table.last_row_count}")
+
+                run.status = 'success'
+                run.finished_at = timezone.now()
+                run.details = '\n'.join(details)
+                _finalize(run, loaded)
+            except Exception as e:
+                mis_conn.rollback()
+                kpi_conn.rollback()
+                run.status = 'failed'
+                run.finished_at = timezone.now()
+                details.append(f"Ошибка: {e}")
+                run.details = '\n'.join(details)
+                run.save()
+                log(f"❌ Ошибка синхронизации: {e}")
+            finally:
+                # Новая версия данных - кэши отчетов перестают использоваться
+                cache.delete('data_version')
+                reset_replica_checks()
+
+            return run
+        finally:
+            mis_conn.close()
+            kpi_conn.close()
+    finally:
+        _unlock()
+
+
+def sync_in_progress():
+    """Синхронизация сейчас выполняется (advisory-блокировка занята)"""
+    locked = _try_lock()
+    if locked:
+        _unlock()
+    return not locked
+
+
+def start_sync_process(table_names=None):
+    """
+    Запускает manage.py sync_mis отдельным процессом и не ждет его:
+    загрузка не ограничена временем запроса и перезапуском веб-процесса.
+    Результат - в журнале SyncRun.
+    """
+    command = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'sync_mis']
+    for name in table_names or []:
+        command += ['--table', name]
+    process = subprocess.Popen(
+        command, cwd=settings.BASE_DIR,
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    # Завершившийся процесс не остается зомби
+    threading.Thread(target=process.wait, name='sync-process', daemon=True).start()
+    return process
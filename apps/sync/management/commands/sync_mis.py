@@ -0,0 +1,40 @@
+# apps/sync/management/commands/sync_mis.py
+
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from sync.engine import run_sync
+
+
+class Command(BaseCommand):
+    help = 'Инкрементальная загрузка данных из МИС в KPI (по таблицам синхронизации)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--table', action='append', dest='tables',
+                            help='Загрузить только указанную таблицу (можно несколько раз)')
+        parser.add_argument('--full', action='store_true',
+                            help='Полная загрузка без учета водяной отметки')
+        parser.add_argument('--loop', type=int, default=0, metavar='SECONDS',
+                            help='Повторять синхронизацию с указанным интервалом')
+        parser.add_argument('--mis-dsn', help='Подключение к МИС (по умолчанию - БД "mis" из .env)')
+
+    def handle(self, *args, **options):
+        while True:
+            run = run_sync(
+                table_names=options['tables'],
+                full=options['full'],
+                mis_dsn=options['mis_dsn'],
+                log=self.stdout.write,
+            )
+
+            if run is not None:
+                if run.status == 'success':
+                    self.stdout.write(self.style.SUCCESS(
+                        f'✅ Синхронизация завершена: {run.row_count} строк'
+                    ))
+                elif not options['loop']:
+                    raise CommandError(f'Синхронизация завершилась с ошибкой:\n{run.details}')
+
+            if not options['loop']:
+                break
+            time.sleep(options['loop'])
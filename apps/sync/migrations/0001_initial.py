@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(auto_now_add=True, verbose_name='Начало')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Окончание')),
+                ('status', models.CharField(choices=[('running', 'Выполняется'), ('success', 'Успешно'), ('failed', 'Ошибка')], default='running', max_length=20, verbose_name='Статус')),
+                ('row_count', models.IntegerField(default=0, verbose_name='Строк загружено')),
+                ('details', models.TextField(blank=True, verbose_name='Подробности')),
+            ],
+            options={
+                'verbose_name': 'Запуск синхронизации',
+                'verbose_name_plural': 'Запуски синхронизации',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncTable',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='Название')),
+                ('source_table', models.CharField(help_text='schema.table', max_length=200, verbose_name='Таблица в МИС')),
+                ('target_table', models.CharField(help_text='schema.table, например solution_med.import_man', max_length=200, verbose_name='Таблица в KPI')),
+                ('columns', models.TextField(help_text='Через запятую, имена одинаковые в обеих БД', verbose_name='Колонки')),
+                ('key_columns', models.CharField(help_text='Через запятую, уникальный ключ в таблице KPI', max_length=200, verbose_name='Ключевые колонки')),
+                ('watermark_column', models.CharField(help_text='Дата изменения или возрастающий номер строки', max_length=100, verbose_name='Колонка изменений')),
+                ('watermark_value', models.CharField(blank=True, default='', help_text='Последнее загруженное значение; пусто - полная загрузка', max_length=100, verbose_name='Водяная отметка')),
+                ('batch_size', models.IntegerField(default=10000, verbose_name='Строк в пакете')),
+                ('sort_order', models.IntegerField(default=0, verbose_name='Порядок')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Активна')),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True, verbose_name='Последняя загрузка')),
+                ('last_row_count', models.IntegerField(default=0, verbose_name='Строк загружено')),
+            ],
+            options={
+                'verbose_name': 'Таблица синхронизации',
+                'verbose_name_plural': 'Таблицы синхронизации',
+                'ordering': ['sort_order', 'name'],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# apps/sync/models.py
+
+from django.db import models
+
+class SyncTable(models.Model):
+    """Таблица, загружаемая из МИС в KPI (инкрементально, по водяной отметке)"""
+    name = models.CharField(max_length=100, unique=True, verbose_name='Название')
+    source_table = models.CharField(max_length=200, verbose_name='Таблица в МИС',
+                                    help_text='schema.table')
+    target_table = models.CharField(max_length=200, verbose_name='Таблица в KPI',
+                                    help_text='schema.table, например solution_med.import_man')
+    columns = models.TextField(verbose_name='Колонки',
+                               help_text='Через запятую, имена одинаковые в обеих БД')
+    key_columns = models.CharField(max_length=200, verbose_name='Ключевые колонки',
+                                   help_text='Через запятую, уникальный ключ в таблице KPI')
+    watermark_column = models.CharField(max_length=100, verbose_name='Колонка изменений',
+                                        help_text='Дата изменения или возрастающий номер строки')
+    watermark_value = models.CharField(max_length=100, blank=True, default='',
+                                       verbose_name='Водяная отметка',
+                                       help_text='Последнее загруженное значение; пусто - полная загрузка')
+    batch_size = models.IntegerField(default=10000, verbose_name='Строк в пакете')
+    sort_order = models.IntegerField(default=0, verbose_name='Порядок')
+    is_active = models.BooleanField(default=True, verbose_name='Активна')
+    last_synced_at = models.DateTimeField(null=True, blank=True, verbose_name='Последняя загрузка')
+    last_row_count = models.IntegerField(default=0, verbose_name='Строк загружено')
+
+    class Meta:
+        ordering = ['sort_order', 'name']
+        verbose_name = 'Таблица синхронизации'
+        verbose_name_plural = 'Таблицы синхронизации'
+
+    def __str__(self):
+        return f"{self.name} ({self.source_table} → {self.target_table})"
+
+    def get_columns(self):
+        return [c.strip() for c in self.columns.split(',') if c.strip()]
+
+    def get_key_columns(self):
+        return [c.strip() for c in self.key_columns.split(',') if c.strip()]
+
+
+class SyncRun(models.Model):
+    """Журнал запусков синхронизации"""
+    STATUS_CHOICES = [
+        ('running', 'Выполняется'),
+        ('success', 'Успешно'),
+        ('failed', 'Ошибка'),
+    ]
+
+    started_at = models.DateTimeField(auto_now_add=True, verbose_name='Начало')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Окончание')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running',
+                              verbose_name='Статус')
+    row_count = models.IntegerField(default=0, verbose_name='Строк загружено')
+    details = models.TextField(blank=True, verbose_name='Подробности')
+
+    class Meta:
+        ordering = ['-started_at']
+        verbose_name = 'Запуск синхронизации'
+        verbose_name_plural = 'Запуски синхронизации'
+
+    def __str__(self):
+        return f"{self.started_at:%d.%m.%Y %H:%M} - {self.get_status_display()}"
@@ -1 +1,7 @@
 ﻿# This file is required to make Python treat directories as packages
+
+# Приложение celery загружается вместе с Django, чтобы shared_task
+# (apps/jobs/tasks.py) отправлялись через брокер из настроек
+from .celery import app as celery_app
+
+__all__ = ('celery_app',)
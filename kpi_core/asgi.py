@@ -1,8 +1,44 @@
 #asgi.py
+# Запуск под ASGI: python main.py с WEB_ASGI=1 (нужен для потока событий apps/dashboard/events.py)
+import asyncio
 import os
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kpi_core.settings')
 
+
+class SyncRequestLimit:
+    """
+    Не больше limit одновременных HTTP-запросов в процессе (остальные ждут).
+    Синхронное представление под ASGI выполняется в отдельном потоке на каждый
+    запрос (asgiref, ThreadSensitiveContext), поэтому без ограничения число
+    потоков и подключений к БД растет с числом одновременных запросов.
+    Поток событий синхронизации асинхронный и подключение не держит -
+    в ограничение не входит.
+    """
+
+    def __init__(self, app, limit, unlimited_paths):
+        self.app = app
+        self.limit = limit
+        self.unlimited_paths = tuple(unlimited_paths)
+        self.semaphore = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'].startswith(self.unlimited_paths):
+            return await self.app(scope, receive, send)
+        # Семафор создается в цикле событий процесса (приложение загружается до fork)
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.limit)
+        async with self.semaphore:
+            await self.app(scope, receive, send)
+
+
 application = get_asgi_application()
+
+# WEB_THREADS задает main.py: столько же запросов, сколько потоков у gthread
+_limit = int(os.environ.get('WEB_THREADS') or 0)
+if _limit > 0:
+    from django.urls import reverse
+
+    application = SyncRequestLimit(application, _limit, [reverse('sync_events')])
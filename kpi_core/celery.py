@@ -0,0 +1,19 @@
+#kpi_core/celery.py
+
+"""
+Celery для фоновых отчетов (apps/jobs).
+Брокер - CELERY_BROKER_URL в .env, например redis://localhost:6379/2.
+Запуск исполнителя:
+    celery -A kpi_core worker --concurrency 2
+Без брокера задания выполняются в потоках веб-процесса.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kpi_core.settings')
+
+app = Celery('kpi_core')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -14,24 +14,30 @@ class ConfigManager:
         return env_file.exists() and env_file.stat().st_size > 0
     
     @staticmethod
-    def get_django_databases():
-        """Возвращает настройки БД для Django из .env"""
-        if not ConfigManager.is_configured():
-            raise ImproperlyConfigured(
-                "Система не настроена. Создайте файл .env в корне проекта."
-            )
-        
-        # Читаем .env файл
+    def read_env():
+        """Простой парсинг .env (словарь ключ -> значение)"""
         env_file = Path(__file__).resolve().parent.parent / '.env'
-        
-        # Простой парсинг .env
         config = {}
+        if not env_file.exists():
+            return config
+        
         with open(env_file, 'r', encoding='utf-8') as f:
             for line in f:
                 line = line.strip()
                 if line and not line.startswith('#') and '=' in line:
                     key, value = line.split('=', 1)
                     config[key.strip()] = value.strip()
+        return config
+    
+    @staticmethod
+    def get_django_databases():
+        """Возвращает настройки БД для Django из .env"""
+        if not ConfigManager.is_configured():
+            raise ImproperlyConfigured(
+                "Система не настроена. Создайте файл .env в корне проекта."
+            )
+        
+        config = ConfigManager.read_env()
         
         databases = {
             'default': {
@@ -41,6 +47,8 @@ class ConfigManager:
                 'PASSWORD': config.get('DB_PASSWORD', ''),
                 'HOST': config.get('DB_HOST', 'localhost'),
                 'PORT': config.get('DB_PORT', '5432'),
+                # Повторное использование подключений между запросами (секунды)
+                'CONN_MAX_AGE': int(config.get('DB_CONN_MAX_AGE', '0')),
                 'OPTIONS': {
                     'connect_timeout': 10,
                 }
@@ -59,4 +67,55 @@ class ConfigManager:
                 'PORT': config.get('MIS_DB_PORT', '5432'),
             }
         
-        return databases
\ No newline at end of file
+        # Реплики основной БД для чтения отчетов (опционально, хосты через запятую)
+        replica_hosts = [h.strip() for h in config.get('REPLICA_DB_HOST', '').split(',') if h.strip()]
+        for number, replica_host in enumerate(replica_hosts, 1):
+            databases[f'replica_{number}'] = {
+                'ENGINE': 'django.db.backends.postgresql',
+                'NAME': config.get('REPLICA_DB_NAME') or databases['default']['NAME'],
+                'USER': config.get('REPLICA_DB_USER') or databases['default']['USER'],
+                'PASSWORD': config.get('REPLICA_DB_PASSWORD') or databases['default']['PASSWORD'],
+                'HOST': replica_host,
+                'PORT': config.get('REPLICA_DB_PORT') or databases['default']['PORT'],
+                'CONN_MAX_AGE': databases['default']['CONN_MAX_AGE'],
+                'OPTIONS': {
+                    'connect_timeout': 3,  # недоступная реплика не должна задерживать отчет
+                },
+                'TEST': {'MIRROR': 'default'},
+            }
+        
+        return databases
+    
+    @staticmethod
+    def get_django_caches():
+        """
+        Настройки кэша из .env:
+            CACHE_REDIS_URL - общий кэш в Redis (для нескольких процессов)
+            CACHE_MAX_MB - бюджет кэша в памяти процесса, если Redis не задан
+        """
+        config = ConfigManager.read_env()
+        redis_url = config.get('CACHE_REDIS_URL')
+        
+        if redis_url:
+            return {
+                'default': {
+                    'BACKEND': 'apps.core.cache_backends.CompressedRedisCache',
+                    'LOCATION': redis_url,
+                    'TIMEOUT': 300,  # 5 минут
+                }
+            }
+        
+        try:
+            max_mb = int(config.get('CACHE_MAX_MB', '64'))
+        except ValueError:
+            max_mb = 64
+        
+        return {
+            'default': {
+                'BACKEND': 'apps.core.cache_backends.CompressedLRUCache',
+                'TIMEOUT': 300,  # 5 минут
+                'OPTIONS': {
+                    'MAX_BYTES': max_mb * 1024 * 1024,
+                },
+            }
+        }
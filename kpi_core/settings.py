@@ -56,6 +56,10 @@ if IS_CONFIGURED:
     'plans',
     'setup',
     'references.apps.ReferencesConfig',
+    'sync.apps.SyncConfig',
+    'monitoring.apps.MonitoringConfig',
+    'snapshots.apps.SnapshotsConfig',
+    'jobs.apps.JobsConfig',
     
     # Сторонние
     'rest_framework',
@@ -102,6 +106,8 @@ else:
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # Статика из приложения: сжатые варианты и долгое кэширование
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -112,6 +118,8 @@ MIDDLEWARE = [
 # В режиме мастера убираем AuthenticationMiddleware
 if IS_CONFIGURED:
     MIDDLEWARE.insert(4, 'django.contrib.auth.middleware.AuthenticationMiddleware')
+    # Профилирование запроса по ?_profile=1 (только суперпользователь)
+    MIDDLEWARE.append('monitoring.middleware.ProfilingMiddleware')
 
 TEMPLATES = [
     {
@@ -163,6 +171,20 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Статика (python manage.py collectstatic, python main.py выполняет его сам):
+# имена с хэшем содержимого, заранее сжатые .gz/.br (brotli) и кэширование
+# в браузере на год (immutable). Пока статика не собрана, ссылки ведут
+# на исходные имена (kpi_core/static_storage.py), а не падают с ошибкой.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'kpi_core.static_storage.StaticStorage',
+    },
+}
+WHITENOISE_MAX_AGE = 3600  # файлы без хэша в имени (favicon и т.п.)
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework только в режиме работы
@@ -173,10 +195,74 @@ if IS_CONFIGURED:
         ]
     }
 
+# REST API отчетов (/api/v1/)
+API_PAGE_SIZE = 500  # строк на страницу по умолчанию
+API_MAX_PAGE_SIZE = 5000  # максимум строк на страницу
+
 # Кэширование
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',  # самый простой, в памяти
-        'TIMEOUT': 300,  # 5 минут
-    }
-}
\ No newline at end of file
+# Кэш: Redis (CACHE_REDIS_URL) или память процесса с бюджетом CACHE_MAX_MB
+CACHES = ConfigManager.get_django_caches()
+
+# Отчеты и виджеты
+REPORT_PARALLEL_WORKERS = 4  # потоков для параллельного выполнения SQL-функций
+REPORT_BATCH_MAX_ITEMS = 20  # максимум элементов в одном пакетном запросе
+FILTER_PANEL_CACHE_TIMEOUT = 3600  # кэш HTML панели фильтров (секунды)
+PERIOD_RANGE_MAX_MONTHS = 24  # максимум месяцев в отчете за диапазон
+PERIOD_CACHE_TIMEOUT = 7 * 24 * 3600  # кэш результатов закрытых месяцев (секунды)
+PERIOD_CLOSE_GRACE_DAYS = 10  # месяц считается закрытым через N дней после окончания (исправления из МИС)
+# Итоги за диапазон: колонки с этими словами не суммируются
+PERIOD_NON_ADDITIVE_MARKERS = ('%', 'процент', 'доля', 'средн', 'коэф')
+# Доли, которые пересчитываются из сумм: {колонка: (числитель, знаменатель, множитель)},
+# например {'% выполнения': ('Факт', 'План', 100)}
+PERIOD_RATIO_COLUMNS = {}
+
+# Автодополнение в фильтрах с большими списками (врачи, услуги)
+AUTOCOMPLETE_MIN_OPTIONS = 200  # больше вариантов - поле поиска вместо выпадающего списка
+AUTOCOMPLETE_LIMIT = 20  # вариантов в подсказке по умолчанию
+AUTOCOMPLETE_MAX_LIMIT = 100  # максимум вариантов за запрос
+
+# Объединение одинаковых вызовов SQL-функций и ограничение нагрузки
+REPORT_CONCURRENCY_LIMITS = {
+    'default': 4,  # одновременных выполнений одной функции
+    # 'kpi.some_heavy_function': 1,
+}
+REPORT_QUEUE_WAIT = 10  # секунд ожидания свободного слота
+REPORT_LOCK_TIMEOUT = 120  # TTL блокировки и слотов в кэше (продлевается, пока вызов работает)
+REPORT_SHARED_RESULT_TIMEOUT = 30  # сколько хранится общий результат вызова
+REPORT_RETRY_AFTER = 5  # подсказка клиенту (Retry-After), секунд
+
+# Фоновые отчеты (apps/jobs): celery при CELERY_BROKER_URL в .env, иначе потоки веб-процесса
+CELERY_BROKER_URL = ConfigManager.read_env().get('CELERY_BROKER_URL', '')
+CELERY_TASK_ACKS_LATE = True  # задача не теряется при падении исполнителя
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1  # долгие задачи - не брать впрок
+REPORT_BACKGROUND_THRESHOLD_MS = 20000  # ожидаемое время, с которого отчет уходит в фон
+REPORT_JOB_LOCAL_WORKERS = 2  # потоков для заданий без celery
+REPORT_JOB_TIMEOUT = 3600  # задание дольше этого считается прерванным (секунды)
+REPORT_JOB_KEEP_HOURS = 24  # сколько хранятся результаты заданий
+REPORT_JOB_POLL_INTERVAL = 3  # как часто страница опрашивает статус (секунды)
+
+# События синхронизации для открытых дашбордов (apps/dashboard/events.py)
+SYNC_EVENTS_POLL_INTERVAL = 5  # как часто проверять дату импорта (секунды)
+SYNC_EVENTS_HEARTBEAT = 25  # комментарий в поток, чтобы прокси не закрывал соединение (секунды)
+SYNC_EVENTS_RETRY = 5  # переподключение браузера после обрыва потока (секунды)
+SYNC_EVENTS_WSGI_RETRY = 30  # без ASGI: как часто страница спрашивает о синхронизации (секунды)
+
+# Реплики БД для чтения (REPLICA_DB_HOST в .env)
+REPLICA_CHECK_INTERVAL = 30  # как часто проверять доступность и отставание реплики (секунды)
+
+# Планы медленных вызовов SQL-функций (Мониторинг -> Медленные вызовы)
+SLOW_CALL_THRESHOLD_MS = 3000  # порог по умолчанию; для отдельных функций - в админке
+SLOW_CALL_SAMPLE_RATE = 0.2  # доля медленных вызовов, для которых снимается план
+SLOW_CALL_EXPLAIN_INTERVAL = 600  # не чаще одного плана на функцию за интервал (секунды)
+SLOW_CALL_EXPLAIN_TIMEOUT_MS = 120000  # statement_timeout для EXPLAIN ANALYZE
+SLOW_CALL_MAX_PENDING = 4  # максимум планов в очереди
+PROFILE_KEEP = 50  # сколько последних профилей запросов хранить
+BENCHMARK_BASELINE_PATH = BASE_DIR / 'benchmarks' / 'kpi_functions.json'  # manage.py benchmark_functions
+INDEX_ADVISOR_SCHEMAS = ['kpi', 'solution_med']  # схемы для советов по индексам
+INDEX_ADVISOR_MIN_ROWS = 10000  # таблицы меньше этого не проверяются на нехватку индексов
+
+# Синхронизация с МИС (manage.py sync_mis)
+# Дата импорта - окончание последней успешной синхронизации, загрузившей строки (sync_syncrun).
+# Дополнительный SQL в той же транзакции (только если строки загружены),
+# если нужно обновить и solution_med.import_date()
+MIS_SYNC_FINALIZE_SQL = None
@@ -0,0 +1,23 @@
+# kpi_core/static_storage.py
+
+"""
+Хранилище статики: имена с хэшем и сжатые копии (WhiteNoise) после
+collectstatic. python main.py выполняет collectstatic при каждом запуске;
+если статика еще не собрана (manage.py runserver с DEBUG=False, новый файл
+после сборки), {% static %} дает ссылку на исходное имя вместо ошибки 500.
+"""
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticStorage(CompressedManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        # Manifest нет - collectstatic не выполнялся
+        if not self.hashed_files:
+            return name
+        try:
+            return super().stored_name(name)
+        except ValueError as e:
+            print(f"Файл статики не собран ({e}): выполните python manage.py collectstatic")
+            return name
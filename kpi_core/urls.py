@@ -10,7 +10,15 @@ from apps.dashboard.views import (
     unified_plan_fact, # единая страница план-факт
     smart_redirect, # умный редирект
     dynamic_dashboard,
+    widget_data,
+    batch_data,
+    report_rows,
+    report_job_status,
+    export_report,
+    filter_options,
 )
+from apps.dashboard.events import sync_events
+from apps.dashboard.api import ReportListView, ReportDataView
 
 urlpatterns = [
     #администрирование
@@ -31,8 +39,28 @@ urlpatterns = [
         path('', dashboard_home, name='dashboard_home'),
         # Единая страница сравнения план-факт
         path('plan-fact/', unified_plan_fact, name='plan_fact'),
+        # Строки отчета компактным JSON (виртуальная таблица)
+        path('plan-fact/rows/', report_rows, name='report_rows'),
+        # Статус фонового выполнения долгого отчета
+        path('plan-fact/jobs/<int:job_id>/', report_job_status, name='report_job_status'),
+        # Поиск по вариантам фильтра (автодополнение)
+        path('filters/<str:filter_code>/options/', filter_options, name='filter_options'),
+        # Выгрузка отчета в Parquet / Arrow
+        path('plan-fact/export/', export_report, name='export_report'),
         # Новый динамический дашборд
         path('dynamic/', dynamic_dashboard, name='dynamic_dashboard'),
+        # Данные отдельного виджета (подгружаются страницей дашборда)
+        path('dynamic/widgets/<str:code>/', widget_data, name='widget_data'),
+        # События синхронизации с МИС (Server-Sent Events)
+        path('events/', sync_events, name='sync_events'),
+        # Несколько отчетов/виджетов за один запрос
+        path('api/batch/', batch_data, name='batch_data'),
+    ])),
+
+    # REST API отчетов
+    path('api/v1/', include([
+        path('reports/', ReportListView.as_view(), name='api_reports'),
+        path('reports/<int:report_id>/data/', ReportDataView.as_view(), name='api_report_data'),
     ])),
 
     # Настройка БД
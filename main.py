@@ -0,0 +1,283 @@
+#main.py
+
+"""
+Запуск KPI System в рабочем режиме.
+
+    python main.py                 - сервер (Linux: gunicorn, Windows: waitress)
+    python main.py reload          - плавный перезапуск с новым кодом (gunicorn)
+    python main.py --print-config  - показать рассчитанные параметры
+
+Число процессов считается по ядрам процессора (2 * CPU + 1) и ограничивается
+пулом подключений к БД: каждый процесс держит по подключению на поток запросов,
+на поток параллельных SQL-функций (REPORT_PARALLEL_WORKERS) и на запись
+медленных вызовов. Приложение загружается в главном процессе до fork
+(preload), процессы перезапускаются после WEB_MAX_REQUESTS запросов.
+
+Параметры (.env или переменные окружения, окружение важнее):
+    WEB_BIND            адрес и порт, по умолчанию 0.0.0.0:8000
+    WEB_WORKERS         число процессов, пусто - авто
+    WEB_THREADS         потоков в процессе, по умолчанию 4 (под ASGI - одновременных
+                        запросов в процессе, кроме потока событий)
+    WEB_MAX_REQUESTS    перезапуск процесса после N запросов (0 - не перезапускать)
+    WEB_TIMEOUT         секунд на запрос до перезапуска зависшего процесса
+    DB_MAX_CONNECTIONS  подключений к основной БД, доступных серверу
+    WEB_ASGI            1 - асинхронные процессы uvicorn (kpi_core/asgi.py): события
+                        синхронизации приходят на дашборды сразу, а не опросом
+
+Перед запуском выполняется collectstatic (хэшированные и сжатые файлы статики).
+
+Если .env нет, запускается мастер настройки (один процесс); после сохранения
+настроек сервер сам перезапускается в рабочем режиме.
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+PID_FILE = BASE_DIR / 'kpi.pid'
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'kpi_core.settings')
+sys.path.insert(0, str(BASE_DIR))
+
+from kpi_core.config import ConfigManager
+
+DEFAULT_BIND = '0.0.0.0:8000'
+DEFAULT_THREADS = 4
+DEFAULT_MAX_REQUESTS = 1000
+DEFAULT_DB_CONNECTIONS = 80  # max_connections PostgreSQL (100) минус резерв
+SETUP_POLL_SECONDS = 2
+ASGI_WORKER = 'uvicorn_worker.UvicornWorker'
+
+
+def _env():
+    env = ConfigManager.read_env()
+    env.update({key: value for key, value in os.environ.items() if key.startswith(('WEB_', 'DB_'))})
+    return env
+
+
+def _int(env, key, default):
+    value = str(env.get(key, '')).strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Некорректное значение {key}={value}, используется {default}")
+        return default
+
+
+def _flag(env, key):
+    return str(env.get(key, '')).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def server_options():
+    """Параметры gunicorn по .env, числу ядер и пулу подключений к БД"""
+    from django.conf import settings
+
+    env = _env()
+    cpu = os.cpu_count() or 1
+    threads = max(1, _int(env, 'WEB_THREADS', DEFAULT_THREADS))
+    asgi = _flag(env, 'WEB_ASGI')
+    connections_per_worker = threads + settings.REPORT_PARALLEL_WORKERS + 1
+    if asgi:
+        # Наблюдатель синхронизации (apps/dashboard/events.py) читает БД
+        # в пуле потоков цикла событий
+        connections_per_worker += 1
+    db_connections = _int(env, 'DB_MAX_CONNECTIONS', DEFAULT_DB_CONNECTIONS)
+
+    workers = _int(env, 'WEB_WORKERS', 0)
+    if workers <= 0:
+        workers = max(1, min(2 * cpu + 1, db_connections // connections_per_worker))
+
+    max_requests = max(0, _int(env, 'WEB_MAX_REQUESTS', DEFAULT_MAX_REQUESTS))
+    options = {
+        'bind': env.get('WEB_BIND') or DEFAULT_BIND,
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': threads,
+        'preload_app': True,
+        'max_requests': max_requests,
+        # Разброс, чтобы процессы не перезапускались одновременно
+        'max_requests_jitter': max_requests // 10,
+        # Отчет может выполняться до REPORT_LOCK_TIMEOUT
+        'timeout': _int(env, 'WEB_TIMEOUT', settings.REPORT_LOCK_TIMEOUT + 30),
+        'graceful_timeout': 30,
+        'keepalive': 5,
+        'pidfile': str(PID_FILE),
+        'proc_name': 'kpi',
+        'accesslog': '-',
+        'errorlog': '-',
+    }
+    # Под ASGI каждое синхронное представление получает свой поток (asgiref),
+    # и параметр threads uvicorn не ограничивает. Число одновременных запросов
+    # в процессе ограничивает kpi_core/asgi.py (SyncRequestLimit) по WEB_THREADS -
+    # тогда подключений к БД столько же, сколько у gthread, плюс наблюдатель
+    if asgi:
+        options['worker_class'] = ASGI_WORKER
+        os.environ['WEB_THREADS'] = str(threads)
+    # Heartbeat процессов в памяти, а не на диске
+    if os.path.isdir('/dev/shm'):
+        options['worker_tmp_dir'] = '/dev/shm'
+    return options
+
+
+def load_application(asgi=False):
+    """WSGI- или ASGI-приложение с заранее загруженными URL, представлениями и админкой"""
+    from django.db import connections
+    from django.urls import get_resolver
+
+    if asgi:
+        from kpi_core.asgi import application
+    else:
+        from django.core.wsgi import get_wsgi_application
+        application = get_wsgi_application()
+    get_resolver().url_patterns
+    # Подключения главного процесса не должны достаться процессам после fork
+    connections.close_all()
+    return application
+
+
+def collect_static():
+    """collectstatic перед запуском: новые файлы получают хэш и сжатые копии"""
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    try:
+        call_command('collectstatic', interactive=False, verbosity=0)
+    except Exception as e:
+        sys.exit(f"Ошибка collectstatic, сервер не запущен: {e}")
+
+
+def run_gunicorn(options):
+    from gunicorn.app.base import BaseApplication
+
+    class KPIServer(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return load_application(asgi=options['worker_class'] == ASGI_WORKER)
+
+    KPIServer().run()
+
+
+def run_waitress(options):
+    """Windows: один процесс, только потоки"""
+    from waitress import serve
+
+    print("gunicorn недоступен: запуск waitress в одном процессе")
+    if options['worker_class'] == ASGI_WORKER:
+        print("waitress не поддерживает ASGI: события синхронизации - опросом")
+    serve(
+        load_application(),
+        listen=options['bind'],
+        threads=options['threads'] * options['workers'],
+    )
+
+
+def run_production():
+    collect_static()
+    options = server_options()
+    print(
+        f"KPI System: {options['bind']}, процессов {options['workers']}, "
+        f"потоков {options['threads']}, перезапуск после {options['max_requests']} запросов"
+        + (", ASGI" if options['worker_class'] == ASGI_WORKER else "")
+    )
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        run_waitress(options)
+    else:
+        run_gunicorn(options)
+
+
+def run_setup_wizard():
+    """Мастер настройки без БД; после появления .env - перезапуск в рабочем режиме"""
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIServer, make_server
+    from django.core.wsgi import get_wsgi_application
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    host, port = (_env().get('WEB_BIND') or DEFAULT_BIND).rsplit(':', 1)
+    server = make_server(host, int(port), get_wsgi_application(), server_class=ThreadingWSGIServer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Система не настроена: мастер настройки на http://{host}:{port}/")
+
+    try:
+        while not ConfigManager.is_configured():
+            time.sleep(SETUP_POLL_SECONDS)
+    except KeyboardInterrupt:
+        return
+
+    # Даем мастеру отдать ответ на сохранение настроек
+    time.sleep(SETUP_POLL_SECONDS)
+    server.shutdown()
+    server.server_close()
+    print("Настройки сохранены, перезапуск в рабочем режиме")
+    os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def _read_pid(path=None):
+    try:
+        return int((path or PID_FILE).read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def reload_server(wait_seconds=60):
+    """
+    Плавный перезапуск: USR2 запускает новый главный процесс с новым кодом
+    (HUP с preload код не перечитывает), затем старый получает TERM
+    и завершается после обработки текущих запросов.
+    Новый процесс пишет kpi.pid.2 и переименовывает его в kpi.pid,
+    когда старый завершится.
+    """
+    old_pid = _read_pid()
+    if not old_pid:
+        print(f"Сервер не запущен (нет {PID_FILE})")
+        return 1
+
+    new_pid_file = PID_FILE.with_name(PID_FILE.name + '.2')
+    os.kill(old_pid, signal.SIGUSR2)
+    deadline = time.monotonic() + wait_seconds
+    while time.monotonic() < deadline:
+        new_pid = _read_pid(new_pid_file)
+        if new_pid:
+            # Новые процессы успевают загрузиться до остановки старых
+            time.sleep(SETUP_POLL_SECONDS)
+            os.kill(old_pid, signal.SIGTERM)
+            print(f"Перезапущено: {old_pid} -> {new_pid}")
+            return 0
+        time.sleep(0.5)
+
+    print("Новый процесс не запустился, работает прежний (см. лог сервера)")
+    return 1
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ['reload']:
+        sys.exit(reload_server())
+
+    if not ConfigManager.is_configured():
+        run_setup_wizard()
+        return
+
+    if '--print-config' in args:
+        for key, value in server_options().items():
+            print(f"{key} = {value}")
+        return
+
+    run_production()
+
+
+if __name__ == '__main__':
+    main()
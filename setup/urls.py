@@ -8,4 +8,5 @@ urlpatterns = [
     path('test/', views.test_connection, name='test_connection'),  # /setup/test/
     path('save/', views.save_configuration, name='save_configuration'),  # /setup/save/
     path('admin/', views.admin_settings, name='admin_settings'),  # /setup/admin/
+    path('cache/', views.cache_stats, name='cache_stats'),  # /setup/cache/
 ]
\ No newline at end of file
@@ -176,7 +176,32 @@ def admin_settings(request):
             else:
                 form_data['MIS_DB_PASSWORD'] = settings.get('MIS_DB_PASSWORD', '')
             
+            # Реплики для чтения отчетов
+            form_data['REPLICA_DB_HOST'] = request.POST.get('replica_host', '').strip()
+            form_data['REPLICA_DB_PORT'] = request.POST.get('replica_port', '').strip()
+            form_data['REPLICA_DB_NAME'] = request.POST.get('replica_name', '').strip()
+            form_data['REPLICA_DB_USER'] = request.POST.get('replica_user', '').strip()
+            replica_password = request.POST.get('replica_password', '').strip()
+            if replica_password:
+                form_data['REPLICA_DB_PASSWORD'] = replica_password
+            else:
+                form_data['REPLICA_DB_PASSWORD'] = settings.get('REPLICA_DB_PASSWORD', '')
+            
+            # Кэш
+            form_data['CACHE_REDIS_URL'] = request.POST.get('cache_redis_url', '').strip()
+            form_data['CACHE_MAX_MB'] = request.POST.get('cache_max_mb', '64').strip() or '64'
+            
+            # Сервер (main.py): пустые значения - расчет по CPU и пулу БД
+            form_data['WEB_BIND'] = request.POST.get('web_bind', '').strip() or '0.0.0.0:8000'
+            form_data['WEB_WORKERS'] = request.POST.get('web_workers', '').strip()
+            form_data['WEB_THREADS'] = request.POST.get('web_threads', '').strip()
+            form_data['WEB_MAX_REQUESTS'] = request.POST.get('web_max_requests', '').strip()
+            form_data['DB_MAX_CONNECTIONS'] = request.POST.get('db_max_connections', '').strip()
+            form_data['WEB_ASGI'] = '1' if request.POST.get('web_asgi') else ''
+            form_data['CELERY_BROKER_URL'] = request.POST.get('celery_broker_url', '').strip()
+            
             # Сохраняем другие настройки
+            form_data['DB_CONN_MAX_AGE'] = settings.get('DB_CONN_MAX_AGE', '0')
             form_data['DEBUG'] = settings.get('DEBUG', 'False')
             form_data['SECRET_KEY'] = settings.get('SECRET_KEY', '')
             form_data['ALLOWED_HOSTS'] = settings.get('ALLOWED_HOSTS', 'localhost,127.0.0.1')
@@ -191,6 +216,7 @@ def admin_settings(request):
             env_content.append(f"DB_PASSWORD={form_data['DB_PASSWORD']}")
             env_content.append(f"DB_HOST={form_data['DB_HOST']}")
             env_content.append(f"DB_PORT={form_data['DB_PORT']}")
+            env_content.append(f"DB_CONN_MAX_AGE={form_data['DB_CONN_MAX_AGE']}")
             env_content.append("")
             
             # Секция МИС БД - ВСЕГДА добавляем
@@ -203,6 +229,32 @@ def admin_settings(request):
             env_content.append(f"MIS_DB_PORT={form_data['MIS_DB_PORT']}")
             env_content.append("")
             
+            # Секция реплик
+            env_content.append("# ==== РЕПЛИКИ KPI ДЛЯ ЧТЕНИЯ ОТЧЕТОВ (опционально) ====")
+            env_content.append(f"REPLICA_DB_HOST={form_data['REPLICA_DB_HOST']}")
+            env_content.append(f"REPLICA_DB_PORT={form_data['REPLICA_DB_PORT']}")
+            env_content.append(f"REPLICA_DB_NAME={form_data['REPLICA_DB_NAME']}")
+            env_content.append(f"REPLICA_DB_USER={form_data['REPLICA_DB_USER']}")
+            env_content.append(f"REPLICA_DB_PASSWORD={form_data['REPLICA_DB_PASSWORD']}")
+            env_content.append("")
+            
+            # Секция кэша
+            env_content.append("# ==== КЭШ (Redis или память процесса) ====")
+            env_content.append(f"CACHE_REDIS_URL={form_data['CACHE_REDIS_URL']}")
+            env_content.append(f"CACHE_MAX_MB={form_data['CACHE_MAX_MB']}")
+            env_content.append("")
+            
+            # Секция сервера
+            env_content.append("# ==== СЕРВЕР (python main.py) ====")
+            env_content.append(f"WEB_BIND={form_data['WEB_BIND']}")
+            env_content.append(f"WEB_WORKERS={form_data['WEB_WORKERS']}")
+            env_content.append(f"WEB_THREADS={form_data['WEB_THREADS']}")
+            env_content.append(f"WEB_MAX_REQUESTS={form_data['WEB_MAX_REQUESTS']}")
+            env_content.append(f"DB_MAX_CONNECTIONS={form_data['DB_MAX_CONNECTIONS']}")
+            env_content.append(f"WEB_ASGI={form_data['WEB_ASGI']}")
+            env_content.append(f"CELERY_BROKER_URL={form_data['CELERY_BROKER_URL']}")
+            env_content.append("")
+            
             # Секция безопасности
             env_content.append("# ==== НАСТРОЙКИ БЕЗОПАСНОСТИ DJANGO ====")
             env_content.append(f"SECRET_KEY={form_data['SECRET_KEY']}")
@@ -233,10 +285,59 @@ def admin_settings(request):
         'mis_name': settings.get('MIS_DB_NAME', ''),
         'mis_user': settings.get('MIS_DB_USER', ''),
         'mis_password': settings.get('MIS_DB_PASSWORD', ''),
+        'replica_host': settings.get('REPLICA_DB_HOST', ''),
+        'replica_port': settings.get('REPLICA_DB_PORT', ''),
+        'replica_name': settings.get('REPLICA_DB_NAME', ''),
+        'replica_user': settings.get('REPLICA_DB_USER', ''),
+        'replica_password': settings.get('REPLICA_DB_PASSWORD', ''),
+        'cache_redis_url': settings.get('CACHE_REDIS_URL', ''),
+        'cache_max_mb': settings.get('CACHE_MAX_MB', '64'),
+        'web_bind': settings.get('WEB_BIND', '0.0.0.0:8000'),
+        'web_workers': settings.get('WEB_WORKERS', ''),
+        'web_threads': settings.get('WEB_THREADS', ''),
+        'web_max_requests': settings.get('WEB_MAX_REQUESTS', ''),
+        'db_max_connections': settings.get('DB_MAX_CONNECTIONS', ''),
+        'web_asgi': settings.get('WEB_ASGI', ''),
+        'celery_broker_url': settings.get('CELERY_BROKER_URL', ''),
     }
     
     return render(request, 'setup/admin_settings.html', {
         'settings': defaults,
         'saved': saved,
         'error': error,
-    })
\ No newline at end of file
+    })
+
+
+@login_required
+@user_passes_test(lambda u: u.is_superuser or u.is_staff)
+def cache_stats(request):
+    """Статистика кэша: попадания, занятый объем, вытеснения"""
+    from django.core.cache import cache
+    from django.conf import settings as django_settings
+    
+    cleared = False
+    if request.method == 'POST' and request.POST.get('action') == 'clear':
+        cache.clear()
+        cleared = True
+    
+    stats = None
+    error = None
+    if hasattr(cache, 'get_stats'):
+        try:
+            stats = cache.get_stats()
+        except Exception as e:
+            error = str(e)
+    else:
+        error = f"Бэкенд {django_settings.CACHES['default']['BACKEND']} не отдает статистику"
+    
+    if stats:
+        stats['mb_used'] = round(stats['bytes_used'] / 1024 / 1024, 2)
+        if stats.get('max_bytes'):
+            stats['mb_max'] = round(stats['max_bytes'] / 1024 / 1024, 2)
+            stats['fill_percent'] = round(100 * stats['bytes_used'] / stats['max_bytes'], 1)
+    
+    return render(request, 'setup/cache_stats.html', {
+        'stats': stats,
+        'error': error,
+        'cleared': cleared,
+    })
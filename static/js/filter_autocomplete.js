@@ -0,0 +1,129 @@
+// static/js/filter_autocomplete.js
+// Поле поиска для фильтров с большим списком значений (врачи, услуги).
+// Разметка: .filter-autocomplete[data-url] со скрытым input[name] (значение),
+// текстовым полем (подпись) и .list-group для подсказок.
+// Варианты ищет сервер: GET data-url?q=...; подпись выбранного - ?value=...
+
+(function(window) {
+    'use strict';
+
+    const DEBOUNCE_MS = 150;  // пауза после ввода перед запросом
+
+    function FilterAutocomplete(root) {
+        this.root = root;
+        this.url = root.dataset.url;
+        this.hidden = root.querySelector('input[type="hidden"]');
+        this.input = root.querySelector('input[type="text"]');
+        this.list = root.querySelector('.list-group');
+        this.items = [];
+        this.active = -1;
+        this.timer = null;
+        this.controller = null;
+
+        this.input.addEventListener('input', this.onInput.bind(this));
+        this.input.addEventListener('keydown', this.onKeydown.bind(this));
+        this.input.addEventListener('focus', this.onInput.bind(this));
+        this.input.addEventListener('blur', () => setTimeout(() => this.hide(), 150));
+
+        if (this.hidden.value) this.loadLabel(this.hidden.value);
+    }
+
+    FilterAutocomplete.prototype.fetch = function(params) {
+        if (this.controller) this.controller.abort();
+        this.controller = new AbortController();
+        return fetch(this.url + '?' + new URLSearchParams(params), {signal: this.controller.signal})
+            .then(response => response.json())
+            .then(data => data.results || []);
+    };
+
+    FilterAutocomplete.prototype.loadLabel = function(value) {
+        this.fetch({value: value})
+            .then(results => {
+                if (!results.length) return;
+                this.hidden.dataset.text = results[0].text;
+                this.input.value = results[0].text;
+            })
+            .catch(() => {});
+    };
+
+    FilterAutocomplete.prototype.onInput = function() {
+        // Текст изменен вручную - выбранное значение больше не действует
+        if (this.hidden.value && this.input.value !== this.hidden.dataset.text) {
+            this.hidden.value = '';
+        }
+        clearTimeout(this.timer);
+        this.timer = setTimeout(() => {
+            this.fetch({q: this.input.value})
+                .then(results => this.show(results))
+                .catch(error => {
+                    if (error.name !== 'AbortError') this.hide();
+                });
+        }, DEBOUNCE_MS);
+    };
+
+    FilterAutocomplete.prototype.onKeydown = function(event) {
+        if (this.list.classList.contains('d-none') || !this.items.length) {
+            if (event.key === 'Escape') this.hide();
+            return;
+        }
+        if (event.key === 'ArrowDown' || event.key === 'ArrowUp') {
+            event.preventDefault();
+            const step = event.key === 'ArrowDown' ? 1 : -1;
+            this.setActive((this.active + step + this.items.length) % this.items.length);
+        } else if (event.key === 'Enter' && this.active >= 0) {
+            event.preventDefault();
+            this.select(this.items[this.active]);
+        } else if (event.key === 'Escape') {
+            this.hide();
+        }
+    };
+
+    FilterAutocomplete.prototype.show = function(results) {
+        this.items = results;
+        this.active = -1;
+        this.list.innerHTML = '';
+        if (!results.length) {
+            const empty = document.createElement('div');
+            empty.className = 'list-group-item small text-muted';
+            empty.textContent = 'Ничего не найдено';
+            this.list.appendChild(empty);
+        }
+        results.forEach(option => {
+            const item = document.createElement('button');
+            item.type = 'button';
+            item.className = 'list-group-item list-group-item-action small py-1';
+            item.textContent = option.text;
+            item.addEventListener('mousedown', event => {
+                event.preventDefault();
+                this.select(option);
+            });
+            this.list.appendChild(item);
+        });
+        this.list.classList.remove('d-none');
+    };
+
+    FilterAutocomplete.prototype.setActive = function(index) {
+        const buttons = this.list.querySelectorAll('button');
+        buttons.forEach((button, i) => button.classList.toggle('active', i === index));
+        if (buttons[index]) buttons[index].scrollIntoView({block: 'nearest'});
+        this.active = index;
+    };
+
+    FilterAutocomplete.prototype.select = function(option) {
+        this.hidden.value = option.value;
+        this.hidden.dataset.text = option.text;
+        this.input.value = option.text;
+        this.hide();
+    };
+
+    FilterAutocomplete.prototype.hide = function() {
+        this.list.classList.add('d-none');
+        this.active = -1;
+    };
+
+    window.FilterAutocomplete = FilterAutocomplete;
+
+    document.addEventListener('DOMContentLoaded', function() {
+        document.querySelectorAll('.filter-autocomplete').forEach(root => new FilterAutocomplete(root));
+    });
+})(window);
@@ -0,0 +1,230 @@
+// static/js/virtual_table.js
+// Виртуальная таблица отчета: данные приходят компактным JSON
+// ({columns, rows, total, offset}) постранично, в DOM строятся только
+// видимые строки. Сортировка - по клику на заголовок колонки.
+// Итоги за диапазон месяцев (totals_columns, totals) - таблицей под отчетом.
+
+(function(window) {
+    'use strict';
+
+    const ROW_HEIGHT = 31;   // высота строки, px
+    const OVERSCAN = 10;     // запас строк выше и ниже видимой области
+    const PAGE_SIZE = 5000;  // строк в одной порции загрузки
+
+    function formatValue(value) {
+        if (value === null || value === undefined) return '';
+        if (typeof value === 'number') {
+            return Number.isInteger(value) ? String(value) : value.toFixed(2);
+        }
+        return String(value);
+    }
+
+    function compareValues(a, b) {
+        if (a === b) return 0;
+        if (a === null || a === undefined) return 1;
+        if (b === null || b === undefined) return -1;
+        if (typeof a === 'number' && typeof b === 'number') return a - b;
+        return String(a).localeCompare(String(b), 'ru', {numeric: true});
+    }
+
+    function VirtualTable(container, url) {
+        this.container = container;
+        this.url = url;
+        this.columns = [];
+        this.rows = [];
+        this.order = [];      // индексы строк в порядке отображения
+        this.total = 0;
+        this.sortColumn = null;
+        this.sortDesc = false;
+        this.build();
+        this.load(0);
+    }
+
+    VirtualTable.prototype.build = function() {
+        this.status = document.createElement('div');
+        this.status.className = 'text-muted small mb-2';
+        this.status.textContent = 'Загрузка...';
+
+        this.scroller = document.createElement('div');
+        this.scroller.className = 'table-responsive';
+        this.scroller.style.height = 'calc(100% - 2rem)';
+        this.scroller.style.overflow = 'auto';
+
+        this.table = document.createElement('table');
+        this.table.className = 'table table-striped table-hover table-sm';
+        this.table.style.tableLayout = 'fixed';
+        this.thead = this.table.createTHead();
+        this.thead.className = 'table-light';
+        this.thead.style.cssText = 'position: sticky; top: 0; z-index: 1;';
+        this.tbody = this.table.createTBody();
+
+        this.scroller.appendChild(this.table);
+        this.container.appendChild(this.status);
+        this.container.appendChild(this.scroller);
+
+        const self = this;
+        let scheduled = false;
+        this.scroller.addEventListener('scroll', function() {
+            if (scheduled) return;
+            scheduled = true;
+            window.requestAnimationFrame(function() {
+                scheduled = false;
+                self.render();
+            });
+        });
+    };
+
+    VirtualTable.prototype.load = function(offset) {
+        const self = this;
+        const separator = this.url.indexOf('?') === -1 ? '?' : '&';
+        fetch(this.url + separator + 'offset=' + offset + '&limit=' + PAGE_SIZE,
+              {credentials: 'same-origin'})
+            .then(function(response) { return response.json(); })
+            .then(function(page) {
+                if (page.busy) {
+                    // Сервер занят - повторяем ту же страницу позже
+                    self.status.textContent = '⏳ Сервер занят, повтор через ' + page.retry_after + ' сек.';
+                    setTimeout(function() { self.load(offset); }, page.retry_after * 1000);
+                    return;
+                }
+                if (!page.success) {
+                    self.status.textContent = '⚠️ Ошибка загрузки отчета';
+                    return;
+                }
+                if (offset === 0) {
+                    self.columns = page.columns;
+                    self.total = page.total;
+                    self.renderHeader();
+                    self.renderTotals(page.totals_columns || [], page.totals || []);
+                }
+                const start = self.rows.length;
+                Array.prototype.push.apply(self.rows, page.rows);
+                for (let i = start; i < self.rows.length; i++) self.order.push(i);
+                if (self.sortColumn !== null) self.sort();
+
+                self.updateStatus();
+                self.render();
+
+                if (self.rows.length < self.total && page.rows.length) {
+                    self.load(self.rows.length);
+                }
+            })
+            .catch(function() {
+                self.status.textContent = '⚠️ Ошибка загрузки отчета';
+            });
+    };
+
+    VirtualTable.prototype.updateStatus = function() {
+        if (!this.total) {
+            this.status.textContent = '📊 Для выбранных фильтров данные отсутствуют.';
+        } else if (this.rows.length < this.total) {
+            this.status.textContent = 'Загружено ' + this.rows.length + ' из ' + this.total + ' строк';
+        } else {
+            this.status.textContent = 'Строк: ' + this.total;
+        }
+    };
+
+    VirtualTable.prototype.renderHeader = function() {
+        const self = this;
+        const row = this.thead.insertRow();
+        this.columns.forEach(function(column, index) {
+            const th = document.createElement('th');
+            th.textContent = column;
+            th.style.cursor = 'pointer';
+            th.title = 'Сортировать';
+            th.addEventListener('click', function() { self.sortBy(index); });
+            row.appendChild(th);
+        });
+    };
+
+    VirtualTable.prototype.renderTotals = function(columns, rows) {
+        if (!rows.length) return;
+        const card = document.createElement('div');
+        card.className = 'mt-3';
+        const title = document.createElement('h6');
+        title.textContent = 'Итого за диапазон';
+        const table = document.createElement('table');
+        table.className = 'table table-striped table-hover table-sm';
+        const header = table.createTHead();
+        header.className = 'table-light';
+        const headerRow = header.insertRow();
+        columns.forEach(function(column) {
+            const th = document.createElement('th');
+            th.textContent = column;
+            headerRow.appendChild(th);
+        });
+        const body = table.createTBody();
+        rows.forEach(function(data) {
+            const tr = body.insertRow();
+            data.forEach(function(value) {
+                tr.insertCell().textContent = formatValue(value);
+            });
+        });
+        card.appendChild(title);
+        card.appendChild(table);
+        // Под контейнером: его высота занята прокручиваемыми строками
+        this.container.parentNode.insertBefore(card, this.container.nextSibling);
+    };
+
+    VirtualTable.prototype.sortBy = function(index) {
+        this.sortDesc = this.sortColumn === index ? !this.sortDesc : false;
+        this.sortColumn = index;
+
+        const cells = this.thead.rows[0].cells;
+        for (let i = 0; i < cells.length; i++) {
+            cells[i].textContent = this.columns[i] +
+                (i === index ? (this.sortDesc ? ' ▼' : ' ▲') : '');
+        }
+        this.sort();
+        this.render();
+    };
+
+    VirtualTable.prototype.sort = function() {
+        const rows = this.rows;
+        const column = this.sortColumn;
+        const direction = this.sortDesc ? -1 : 1;
+        this.order.sort(function(a, b) {
+            return direction * compareValues(rows[a][column], rows[b][column]) || a - b;
+        });
+    };
+
+    function spacerRow(height, span) {
+        const tr = document.createElement('tr');
+        const td = document.createElement('td');
+        td.colSpan = span;
+        td.style.cssText = 'padding: 0; border: 0; height: ' + height + 'px;';
+        tr.appendChild(td);
+        return tr;
+    }
+
+    VirtualTable.prototype.render = function() {
+        const count = this.order.length;
+        const visible = Math.ceil(this.scroller.clientHeight / ROW_HEIGHT);
+        let first = Math.max(0, Math.floor(this.scroller.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        first -= first % 2;  // сохраняем чередование полос table-striped
+        const last = Math.min(count, first + visible + 2 * OVERSCAN);
+        const span = Math.max(this.columns.length, 1);
+
+        const fragment = document.createDocumentFragment();
+        fragment.appendChild(spacerRow(first * ROW_HEIGHT, span));
+        for (let i = first; i < last; i++) {
+            const data = this.rows[this.order[i]];
+            const tr = document.createElement('tr');
+            tr.style.height = ROW_HEIGHT + 'px';
+            for (let j = 0; j < data.length; j++) {
+                const td = document.createElement('td');
+                td.textContent = formatValue(data[j]);
+                td.style.whiteSpace = 'nowrap';
+                td.style.overflow = 'hidden';
+                td.style.textOverflow = 'ellipsis';
+                tr.appendChild(td);
+            }
+            fragment.appendChild(tr);
+        }
+        fragment.appendChild(spacerRow((count - last) * ROW_HEIGHT, span));
+
+        this.tbody.replaceChildren(fragment);
+    };
+
+    window.VirtualTable = VirtualTable;
+})(window);